@@ -1,24 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app import schemas, models
 from app.utils import get_current_user
+from app.utils.response_cache import KEYWORDS, model_list_response, response_cache
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.KeywordResponse])
 def get_keywords(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    keywords = db.query(models.Keyword).filter(
-        models.Keyword.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return keywords
+    return response_cache.respond(request, current_user.id, KEYWORDS, lambda: model_list_response(
+        schemas.KeywordResponse,
+        db.query(models.Keyword).filter(
+            models.Keyword.user_id == current_user.id
+        ).offset(skip).limit(limit).all()
+    ))
 
 @router.post("/", response_model=schemas.KeywordResponse)
 def create_keyword(
@@ -30,13 +34,14 @@ def create_keyword(
     db.add(db_keyword)
     db.commit()
     db.refresh(db_keyword)
+    response_cache.invalidate(current_user.id, KEYWORDS)
     return db_keyword
 
 @router.get("/{keyword_id}", response_model=schemas.KeywordResponse)
 def get_keyword(
     keyword_id: int,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     keyword = db.query(models.Keyword).filter(
         models.Keyword.id == keyword_id,
@@ -66,6 +71,7 @@ def update_keyword(
     
     db.commit()
     db.refresh(db_keyword)
+    response_cache.invalidate(current_user.id, KEYWORDS)
     return db_keyword
 
 @router.delete("/{keyword_id}")
@@ -83,4 +89,5 @@ def delete_keyword(
     
     db.delete(keyword)
     db.commit()
+    response_cache.invalidate(current_user.id, KEYWORDS)
     return {"message": "Keyword deleted successfully"}
\ No newline at end of file
@@ -1,58 +1,233 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import base64
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import Select, select, tuple_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple
 
-from app.database import get_db
+from app.database import ReadSessionLocal, get_read_db
 from app import schemas, models
 from app.utils import get_current_user
+from app.utils.excel_exporter import EXPORT_COLUMNS, EXPORT_FORMATS
+from app.utils.response_cache import RESULTS, response_cache
+from app.utils.search_index import search_results
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.CrawlResultResponse])
+# 下一页的游标放在响应头里，响应体仍然是结果列表
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 500
+# 列表接口可以选择的字段，content较大，默认不返回
+RESULT_FIELDS = tuple(schemas.CrawlResultResponse.model_fields)
+CURSOR_FIELDS = ("id", "crawled_at")
+DEFAULT_FIELDS = tuple(field for field in RESULT_FIELDS if field != "content")
+# 导出时每次从数据库游标取出的行数
+EXPORT_BATCH_SIZE = 1000
+
+def encode_cursor(result: models.CrawlResult) -> str:
+    """
+    把一页最后一条结果的(crawled_at, id)编码成不透明的游标
+    """
+    raw = f"{result.crawled_at.isoformat()}|{result.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        crawled_at, result_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(crawled_at), int(result_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def result_filters(
+    user_id: int,
+    task_id: Optional[int] = None,
+    site_id: Optional[int] = None,
+    keyword: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> List[Any]:
+    """
+    当前用户结果的查询条件，等值条件都能命中(user_id, ..., crawled_at)组合索引
+    """
+    conditions = [models.CrawlResult.user_id == user_id]
+    if task_id is not None:
+        conditions.append(models.CrawlResult.task_id == task_id)
+    if site_id is not None:
+        conditions.append(models.CrawlResult.site_id == site_id)
+    if keyword is not None:
+        conditions.append(models.CrawlResult.keyword_matched == keyword)
+    if since is not None:
+        conditions.append(models.CrawlResult.crawled_at >= since)
+    if until is not None:
+        conditions.append(models.CrawlResult.crawled_at < until)
+    return conditions
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    解析fields=参数，默认返回除content以外的字段；id和crawled_at是分页游标需要的，总会返回
+    """
+    if not fields:
+        return list(DEFAULT_FIELDS)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in RESULT_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown fields: {', '.join(unknown)}")
+    return [field for field in RESULT_FIELDS if field in requested or field in CURSOR_FIELDS]
+
+def page_statement(conditions: List[Any], selected: List[str], cursor: Optional[str], limit: int) -> Select:
+    """
+    按(crawled_at, id)倒序做游标分页的查询，只查询选中的列，多取一条用来判断是否还有下一页
+    """
+    statement = select(*[getattr(models.CrawlResult, field) for field in selected]).where(*conditions)
+    if cursor:
+        crawled_at, result_id = decode_cursor(cursor)
+        # crawled_at <= 游标 是索引上的范围条件，行值比较只用来排除同一时间里已经返回过的结果
+        statement = statement.where(
+            models.CrawlResult.crawled_at <= crawled_at,
+            tuple_(models.CrawlResult.crawled_at, models.CrawlResult.id) < (crawled_at, result_id)
+        )
+    return statement.order_by(
+        models.CrawlResult.crawled_at.desc(), models.CrawlResult.id.desc()
+    ).limit(limit + 1)
+
+def _json_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def page_response(rows: List[Any], selected: List[str], limit: int) -> Response:
+    """
+    直接由行数据生成JSON，不构造ORM对象也不经过响应模型校验；还有下一页时在响应头里返回游标
+    """
+    headers = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers = {NEXT_CURSOR_HEADER: encode_cursor(rows[-1])}
+    body = [{field: _json_value(value) for field, value in zip(selected, row)} for row in rows]
+    return JSONResponse(body, headers=headers)
+
+def list_results(db: Session, conditions: List[Any], cursor: Optional[str], limit: int,
+                 fields: Optional[str]) -> Response:
+    selected = parse_fields(fields)
+    rows = db.execute(page_statement(conditions, selected, cursor, limit)).all()
+    return page_response(rows, selected, limit)
+
+@router.get("/", response_model=List[schemas.CrawlResultListItem])
 def get_results(
-    skip: int = 0, 
-    limit: int = 100, 
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    task_id: Optional[int] = None,
+    site_id: Optional[int] = None,
+    keyword: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    results = db.query(models.CrawlResult).filter(
-        models.CrawlResult.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return results
+    conditions = result_filters(current_user.id, task_id=task_id, site_id=site_id, keyword=keyword,
+                                since=since, until=until)
+    return response_cache.respond(request, current_user.id, RESULTS, lambda: list_results(db, conditions, cursor, limit, fields))
 
-@router.get("/task/{task_id}", response_model=List[schemas.CrawlResultResponse])
+@router.get("/task/{task_id}", response_model=List[schemas.CrawlResultListItem])
 def get_results_by_task(
     task_id: int,
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    results = db.query(models.CrawlResult).filter(
-        models.CrawlResult.task_id == task_id,
-        models.CrawlResult.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return results
+    conditions = result_filters(current_user.id, task_id=task_id, since=since, until=until)
+    return response_cache.respond(request, current_user.id, RESULTS, lambda: list_results(db, conditions, cursor, limit, fields))
 
-@router.get("/keyword/{keyword}", response_model=List[schemas.CrawlResultResponse])
+@router.get("/site/{site_id}", response_model=List[schemas.CrawlResultListItem])
+def get_results_by_site(
+    site_id: int,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    conditions = result_filters(current_user.id, site_id=site_id, since=since, until=until)
+    return response_cache.respond(request, current_user.id, RESULTS, lambda: list_results(db, conditions, cursor, limit, fields))
+
+@router.get("/keyword/{keyword}", response_model=List[schemas.CrawlResultListItem])
 def get_results_by_keyword(
     keyword: str,
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    results = db.query(models.CrawlResult).filter(
-        models.CrawlResult.keyword_matched == keyword,
-        models.CrawlResult.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return results
+    conditions = result_filters(current_user.id, keyword=keyword, since=since, until=until)
+    return response_cache.respond(request, current_user.id, RESULTS, lambda: list_results(db, conditions, cursor, limit, fields))
+
+@router.get("/search", response_model=List[schemas.CrawlResultSearchHit])
+def search(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    task_id: Optional[int] = None,
+    site_id: Optional[int] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    return search_results(db, current_user.id, q, limit=limit, task_id=task_id, site_id=site_id)
+
+def iter_export_rows(user_id: int, filters: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    用服务端游标分批读取导出的行，只取导出需要的列，不构造ORM对象
+    响应发送完之后依赖注入的会话可能已经关闭，这里自己管理会话
+    """
+    db = ReadSessionLocal()
+    try:
+        columns = [getattr(models.CrawlResult, field) for field, _, _ in EXPORT_COLUMNS]
+        statement = select(*columns).where(*result_filters(user_id, **filters)).order_by(
+            models.CrawlResult.crawled_at.desc(), models.CrawlResult.id.desc()
+        ).execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+        for row in db.execute(statement):
+            yield row._asdict()
+    finally:
+        db.close()
+
+@router.get("/export")
+def export_results(
+    export_format: Literal["csv", "ndjson", "xlsx"] = Query("csv", alias="format"),
+    task_id: Optional[int] = None,
+    site_id: Optional[int] = None,
+    keyword: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    流式导出当前用户的结果，CSV和NDJSON边读边发送
+    """
+    filters = dict(task_id=task_id, site_id=site_id, keyword=keyword, since=since, until=until)
+    writer, media_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"crawl_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return StreamingResponse(
+        writer(iter_export_rows(current_user.id, filters)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @router.get("/{result_id}", response_model=schemas.CrawlResultResponse)
 def get_result(
     result_id: int,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     result = db.query(models.CrawlResult).filter(
         models.CrawlResult.id == result_id,
@@ -60,4 +235,4 @@ def get_result(
     ).first()
     if not result:
         raise HTTPException(status_code=404, detail="Result not found")
-    return result
\ No newline at end of file
+    return result
@@ -1,24 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app import schemas, models
 from app.utils import get_current_user
+from app.utils.response_cache import SITES, model_list_response, response_cache
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.MonitoredSiteResponse])
 def get_sites(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    sites = db.query(models.MonitoredSite).filter(
-        models.MonitoredSite.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return sites
+    return response_cache.respond(request, current_user.id, SITES, lambda: model_list_response(
+        schemas.MonitoredSiteResponse,
+        db.query(models.MonitoredSite).filter(
+            models.MonitoredSite.user_id == current_user.id
+        ).offset(skip).limit(limit).all()
+    ))
 
 @router.post("/", response_model=schemas.MonitoredSiteResponse)
 def create_site(
@@ -30,13 +34,14 @@ def create_site(
     db.add(db_site)
     db.commit()
     db.refresh(db_site)
+    response_cache.invalidate(current_user.id, SITES)
     return db_site
 
 @router.get("/{site_id}", response_model=schemas.MonitoredSiteResponse)
 def get_site(
     site_id: int,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     site = db.query(models.MonitoredSite).filter(
         models.MonitoredSite.id == site_id,
@@ -66,6 +71,7 @@ def update_site(
     
     db.commit()
     db.refresh(db_site)
+    response_cache.invalidate(current_user.id, SITES)
     return db_site
 
 @router.delete("/{site_id}")
@@ -83,4 +89,5 @@ def delete_site(
     
     db.delete(site)
     db.commit()
+    response_cache.invalidate(current_user.id, SITES)
     return {"message": "Site deleted successfully"}
\ No newline at end of file
@@ -1,24 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app import schemas, models
 from app.utils import get_current_user
+from app.utils.response_cache import TASKS, model_list_response, response_cache
+from app.crawler.scheduler import scheduler_service
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.CrawlTaskResponse])
 def get_tasks(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    tasks = db.query(models.CrawlTask).filter(
-        models.CrawlTask.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return tasks
+    return response_cache.respond(request, current_user.id, TASKS, lambda: model_list_response(
+        schemas.CrawlTaskResponse,
+        db.query(models.CrawlTask).filter(
+            models.CrawlTask.user_id == current_user.id
+        ).offset(skip).limit(limit).all()
+    ))
 
 @router.post("/", response_model=schemas.CrawlTaskResponse)
 def create_task(
@@ -44,13 +49,15 @@ def create_task(
 
     db.commit()
     db.refresh(db_task)
+    response_cache.invalidate(current_user.id, TASKS)
+    scheduler_service.notify_task_changed(db_task.id)
     return db_task
 
 @router.get("/{task_id}", response_model=schemas.CrawlTaskResponse)
 def get_task(
     task_id: int,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     task = db.query(models.CrawlTask).filter(
         models.CrawlTask.id == task_id,
@@ -99,6 +106,8 @@ def update_task(
 
     db.commit()
     db.refresh(db_task)
+    response_cache.invalidate(current_user.id, TASKS)
+    scheduler_service.notify_task_changed(task_id)
     return db_task
 
 @router.delete("/{task_id}")
@@ -120,4 +129,6 @@ def delete_task(
     
     db.delete(task)
     db.commit()
+    response_cache.invalidate(current_user.id, TASKS)
+    scheduler_service.notify_task_changed(task_id)
     return {"message": "Task deleted successfully"}
\ No newline at end of file
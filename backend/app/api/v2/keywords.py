@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.database import get_async_db, get_async_read_db
+from app import schemas, models
+from app.utils import get_current_user_async
+from app.utils.response_cache import KEYWORDS, model_list_response, response_cache
+
+router = APIRouter()
+
+async def _get_user_keyword(db: AsyncSession, keyword_id: int, user_id: int) -> models.Keyword:
+    keyword = (await db.execute(select(models.Keyword).where(
+        models.Keyword.id == keyword_id,
+        models.Keyword.user_id == user_id
+    ))).scalars().first()
+    if not keyword:
+        raise HTTPException(status_code=404, detail="Keyword not found")
+    return keyword
+
+@router.get("/", response_model=List[schemas.KeywordResponse])
+async def get_keywords(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    async def build():
+        keywords = (await db.execute(select(models.Keyword).where(
+            models.Keyword.user_id == current_user.id
+        ).offset(skip).limit(limit))).scalars().all()
+        return model_list_response(schemas.KeywordResponse, keywords)
+    return await response_cache.respond_async(request, current_user.id, KEYWORDS, build)
+
+@router.post("/", response_model=schemas.KeywordResponse)
+async def create_keyword(
+    keyword: schemas.KeywordCreate,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_keyword = models.Keyword(**keyword.dict(), user_id=current_user.id)
+    db.add(db_keyword)
+    await db.commit()
+    await db.refresh(db_keyword)
+    response_cache.invalidate(current_user.id, KEYWORDS)
+    return db_keyword
+
+@router.get("/{keyword_id}", response_model=schemas.KeywordResponse)
+async def get_keyword(
+    keyword_id: int,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    return await _get_user_keyword(db, keyword_id, current_user.id)
+
+@router.put("/{keyword_id}", response_model=schemas.KeywordResponse)
+async def update_keyword(
+    keyword_id: int,
+    keyword: schemas.KeywordUpdate,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_keyword = await _get_user_keyword(db, keyword_id, current_user.id)
+    for field, value in keyword.dict(exclude_unset=True).items():
+        setattr(db_keyword, field, value)
+
+    await db.commit()
+    await db.refresh(db_keyword)
+    response_cache.invalidate(current_user.id, KEYWORDS)
+    return db_keyword
+
+@router.delete("/{keyword_id}")
+async def delete_keyword(
+    keyword_id: int,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    keyword = await _get_user_keyword(db, keyword_id, current_user.id)
+    await db.delete(keyword)
+    await db.commit()
+    response_cache.invalidate(current_user.id, KEYWORDS)
+    return {"message": "Keyword deleted successfully"}
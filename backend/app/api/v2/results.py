@@ -0,0 +1,103 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, Optional
+
+from app.database import get_async_read_db
+from app import schemas, models
+from app.api.results import MAX_PAGE_SIZE, page_response, page_statement, parse_fields, result_filters
+from app.utils import get_current_user_async
+from app.utils.response_cache import RESULTS, response_cache
+
+router = APIRouter()
+
+# 全文检索和导出仍使用/api/v1的同步实现
+
+async def list_results(request: Request, user_id: int, db: AsyncSession, conditions: List[Any],
+                       cursor: Optional[str], limit: int, fields: Optional[str]) -> Response:
+    """
+    与/api/v1相同的游标分页和字段投影，查询通过异步会话执行
+    """
+    async def build():
+        selected = parse_fields(fields)
+        rows = (await db.execute(page_statement(conditions, selected, cursor, limit))).all()
+        return page_response(rows, selected, limit)
+    return await response_cache.respond_async(request, user_id, RESULTS, build)
+
+@router.get("/", response_model=List[schemas.CrawlResultListItem])
+async def get_results(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    task_id: Optional[int] = None,
+    site_id: Optional[int] = None,
+    keyword: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    conditions = result_filters(current_user.id, task_id=task_id, site_id=site_id, keyword=keyword,
+                                since=since, until=until)
+    return await list_results(request, current_user.id, db, conditions, cursor, limit, fields)
+
+@router.get("/task/{task_id}", response_model=List[schemas.CrawlResultListItem])
+async def get_results_by_task(
+    task_id: int,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    conditions = result_filters(current_user.id, task_id=task_id, since=since, until=until)
+    return await list_results(request, current_user.id, db, conditions, cursor, limit, fields)
+
+@router.get("/site/{site_id}", response_model=List[schemas.CrawlResultListItem])
+async def get_results_by_site(
+    site_id: int,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    conditions = result_filters(current_user.id, site_id=site_id, since=since, until=until)
+    return await list_results(request, current_user.id, db, conditions, cursor, limit, fields)
+
+@router.get("/keyword/{keyword}", response_model=List[schemas.CrawlResultListItem])
+async def get_results_by_keyword(
+    keyword: str,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    conditions = result_filters(current_user.id, keyword=keyword, since=since, until=until)
+    return await list_results(request, current_user.id, db, conditions, cursor, limit, fields)
+
+@router.get("/{result_id}", response_model=schemas.CrawlResultResponse)
+async def get_result(
+    result_id: int,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    result = (await db.execute(select(models.CrawlResult).where(
+        models.CrawlResult.id == result_id,
+        models.CrawlResult.user_id == current_user.id
+    ))).scalars().first()
+    if not result:
+        raise HTTPException(status_code=404, detail="Result not found")
+    return result
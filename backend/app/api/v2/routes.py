@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from app.api.v2 import sites, keywords, tasks, results
+
+router = APIRouter()
+
+# 异步版本的路由，与/api/v1的同步路由并行提供；认证接口仍使用/api/v1/auth
+router.include_router(sites.router, tags=["sites-v2"], prefix="/sites")
+router.include_router(keywords.router, tags=["keywords-v2"], prefix="/keywords")
+router.include_router(tasks.router, tags=["tasks-v2"], prefix="/tasks")
+router.include_router(results.router, tags=["results-v2"], prefix="/results")
\ No newline at end of file
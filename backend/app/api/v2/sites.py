@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.database import get_async_db, get_async_read_db
+from app import schemas, models
+from app.utils import get_current_user_async
+from app.utils.response_cache import SITES, model_list_response, response_cache
+
+router = APIRouter()
+
+async def _get_user_site(db: AsyncSession, site_id: int, user_id: int) -> models.MonitoredSite:
+    site = (await db.execute(select(models.MonitoredSite).where(
+        models.MonitoredSite.id == site_id,
+        models.MonitoredSite.user_id == user_id
+    ))).scalars().first()
+    if not site:
+        raise HTTPException(status_code=404, detail="Site not found")
+    return site
+
+@router.get("/", response_model=List[schemas.MonitoredSiteResponse])
+async def get_sites(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    async def build():
+        sites = (await db.execute(select(models.MonitoredSite).where(
+            models.MonitoredSite.user_id == current_user.id
+        ).offset(skip).limit(limit))).scalars().all()
+        return model_list_response(schemas.MonitoredSiteResponse, sites)
+    return await response_cache.respond_async(request, current_user.id, SITES, build)
+
+@router.post("/", response_model=schemas.MonitoredSiteResponse)
+async def create_site(
+    site: schemas.MonitoredSiteCreate,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_site = models.MonitoredSite(**site.dict(), user_id=current_user.id)
+    db.add(db_site)
+    await db.commit()
+    await db.refresh(db_site)
+    response_cache.invalidate(current_user.id, SITES)
+    return db_site
+
+@router.get("/{site_id}", response_model=schemas.MonitoredSiteResponse)
+async def get_site(
+    site_id: int,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    return await _get_user_site(db, site_id, current_user.id)
+
+@router.put("/{site_id}", response_model=schemas.MonitoredSiteResponse)
+async def update_site(
+    site_id: int,
+    site: schemas.MonitoredSiteUpdate,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_site = await _get_user_site(db, site_id, current_user.id)
+    for field, value in site.dict(exclude_unset=True).items():
+        setattr(db_site, field, value)
+
+    await db.commit()
+    await db.refresh(db_site)
+    response_cache.invalidate(current_user.id, SITES)
+    return db_site
+
+@router.delete("/{site_id}")
+async def delete_site(
+    site_id: int,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    site = await _get_user_site(db, site_id, current_user.id)
+    await db.delete(site)
+    await db.commit()
+    response_cache.invalidate(current_user.id, SITES)
+    return {"message": "Site deleted successfully"}
@@ -0,0 +1,110 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.database import get_async_db, get_async_read_db
+from app import schemas, models
+from app.utils import get_current_user_async
+from app.utils.response_cache import TASKS, model_list_response, response_cache
+from app.crawler.scheduler import scheduler_service
+
+router = APIRouter()
+
+async def _get_user_task(db: AsyncSession, task_id: int, user_id: int) -> models.CrawlTask:
+    task = (await db.execute(select(models.CrawlTask).where(
+        models.CrawlTask.id == task_id,
+        models.CrawlTask.user_id == user_id
+    ))).scalars().first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+@router.get("/", response_model=List[schemas.CrawlTaskResponse])
+async def get_tasks(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    async def build():
+        tasks = (await db.execute(select(models.CrawlTask).where(
+            models.CrawlTask.user_id == current_user.id
+        ).offset(skip).limit(limit))).scalars().all()
+        return model_list_response(schemas.CrawlTaskResponse, tasks)
+    return await response_cache.respond_async(request, current_user.id, TASKS, build)
+
+@router.post("/", response_model=schemas.CrawlTaskResponse)
+async def create_task(
+    task: schemas.CrawlTaskCreate,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # 创建任务
+    db_task = models.CrawlTask(**task.dict(exclude={'site_ids', 'keyword_ids'}), user_id=current_user.id)
+    db.add(db_task)
+    await db.flush()  # 获取任务ID但不提交事务
+
+    # 创建任务与网站、关键词的关联
+    db.add_all([models.TaskSite(task_id=db_task.id, site_id=site_id) for site_id in task.site_ids])
+    db.add_all([models.TaskKeyword(task_id=db_task.id, keyword_id=keyword_id) for keyword_id in task.keyword_ids])
+
+    await db.commit()
+    await db.refresh(db_task)
+    response_cache.invalidate(current_user.id, TASKS)
+    scheduler_service.notify_task_changed(db_task.id)
+    return db_task
+
+@router.get("/{task_id}", response_model=schemas.CrawlTaskResponse)
+async def get_task(
+    task_id: int,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    return await _get_user_task(db, task_id, current_user.id)
+
+@router.put("/{task_id}", response_model=schemas.CrawlTaskResponse)
+async def update_task(
+    task_id: int,
+    task: schemas.CrawlTaskUpdate,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_task = await _get_user_task(db, task_id, current_user.id)
+
+    # 更新任务基本信息
+    for field, value in task.dict(exclude={'site_ids', 'keyword_ids'}, exclude_unset=True).items():
+        setattr(db_task, field, value)
+
+    # 提供了新的site_ids或keyword_ids时，先删除旧关联，再创建新关联
+    if task.site_ids is not None:
+        await db.execute(delete(models.TaskSite).where(models.TaskSite.task_id == task_id))
+        db.add_all([models.TaskSite(task_id=task_id, site_id=site_id) for site_id in task.site_ids])
+    if task.keyword_ids is not None:
+        await db.execute(delete(models.TaskKeyword).where(models.TaskKeyword.task_id == task_id))
+        db.add_all([models.TaskKeyword(task_id=task_id, keyword_id=keyword_id) for keyword_id in task.keyword_ids])
+
+    await db.commit()
+    await db.refresh(db_task)
+    response_cache.invalidate(current_user.id, TASKS)
+    scheduler_service.notify_task_changed(task_id)
+    return db_task
+
+@router.delete("/{task_id}")
+async def delete_task(
+    task_id: int,
+    current_user: models.User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    task = await _get_user_task(db, task_id, current_user.id)
+
+    # 删除关联表记录
+    await db.execute(delete(models.TaskSite).where(models.TaskSite.task_id == task_id))
+    await db.execute(delete(models.TaskKeyword).where(models.TaskKeyword.task_id == task_id))
+
+    await db.delete(task)
+    await db.commit()
+    response_cache.invalidate(current_user.id, TASKS)
+    scheduler_service.notify_task_changed(task_id)
+    return {"message": "Task deleted successfully"}
@@ -0,0 +1,101 @@
+from typing import Dict, Optional
+
+from pydantic_settings import BaseSettings
+
+class Settings(BaseSettings):
+    database_url: str = "sqlite:///./crawler_monitor.db"
+    async_database_url: Optional[str] = None  # 异步路由使用的地址，不设置时由database_url换成异步驱动得到
+    async_pool_size: int = 20  # 异步引擎的连接池大小
+    database_read_url: Optional[str] = None  # API只读查询使用的地址，不设置时与database_url相同
+    read_pool_size: int = 10  # 只读连接池大小
+    async_database_read_url: Optional[str] = None  # 异步路由只读查询使用的地址，不设置时由database_read_url换成异步驱动得到
+    sqlite_busy_timeout: int = 5000  # 等待写锁的时间（毫秒）
+    sqlite_synchronous: str = "NORMAL"
+    db_writer_max_batch: int = 64  # 爬虫写入队列一次提交合并的写操作数上限
+
+    # 爬虫抓取配置
+    crawler_max_concurrency: int = 20  # 全局并发请求上限
+    crawler_per_host_concurrency: int = 2  # 单个主机的并发请求上限
+    crawler_timeout: float = 10  # 单个请求超时（秒）
+    crawler_queue_size: int = 100  # 流水线各阶段之间的队列长度
+    crawler_batch_size: int = 50  # 每批写入数据库的结果数
+    crawler_trace_memory: bool = False  # 诊断开关：用tracemalloc统计运行期间的峰值内存，会拖慢进程内所有内存分配（含API请求），多个任务同时运行时得到的是共享峰值
+    crawler_parser_backend: str = "auto"  # HTML解析后端：auto, selectolax, lxml, html.parser
+    crawler_detail_max_bytes: int = 2 * 1024 * 1024  # 详情页响应体读取上限（字节）
+    crawler_content_max_chars: int = 5000  # 每篇文章保存的正文字符数
+    crawler_site_mode: str = "html"  # 网站未单独配置时的抓取方式：html 解析列表页，feed 读取RSS/Atom/sitemap，auto 发现feed后使用feed
+    crawler_feed_max_bytes: int = 5 * 1024 * 1024  # feed/sitemap响应体读取上限（字节）
+    crawler_sitemap_max_children: int = 3  # sitemap索引最多读取的子sitemap数
+    crawler_max_depth: int = 2  # 从首页出发跟随链接的最大深度，分页链接与所在页面同一深度；0 只抓取首页，分页也不跟随
+    crawler_max_pages: int = 50  # 每个网站最多抓取的列表页数（含首页）；内容未变的网站每次运行仍对每个列表页发一次条件请求，返回304的页面用缓存中记录的链接扩展队列，不再解析
+    crawler_same_domain: bool = True  # 只跟随同一域名（含子域名）下的链接
+    crawler_exclude_pattern: str = r"\.(jpe?g|png|gif|svg|webp|ico|css|js|pdf|zip|rar|gz|exe|apk|mp3|mp4|avi|docx?|xlsx?|pptx?)(\?|$)|/(login|logout|register|signup)\b"  # 不跟随的链接
+    crawler_frontier_capacity: int = 100000  # 每个网站去重过滤器的容量（URL数）
+    crawler_frontier_max_queue: int = 10000  # 每个网站待抓取队列的最大长度
+    crawler_extractor: str = "readability"  # 详情页正文提取：readability 按文字/链接密度定位正文块，body 取整个body的文本
+
+    # 礼貌抓取：按主机限速并遵守robots.txt
+    crawler_respect_robots: bool = True
+    crawler_default_rate: float = 1.0  # 每个主机默认每秒请求数
+    crawler_rate_burst: int = 2  # 令牌桶容量
+    crawler_host_rates: Dict[str, float] = {}  # 按域名配置的速率，如 {"news.example.com": 5}
+    robots_cache_ttl: int = 3600  # robots.txt缓存时间（秒）
+    crawler_robots_user_agent: str = "CrawlerMonitor"  # 匹配robots.txt中User-agent分组使用的产品标识
+
+    # 任务调度
+    scheduler_max_workers: int = 4  # 同时运行的任务数上限
+    scheduler_retry_base: float = 30  # 任务运行失败后首次重试的等待时间（秒），连续失败时逐次翻倍
+    scheduler_retry_max: float = 3600  # 失败重试等待时间上限（秒）
+
+    # 分布式抓取：local 在调度进程内抓取，distributed 将 任务×网站 工作项发布到队列由worker进程消费
+    crawl_mode: str = "local"
+    redis_url: str = "redis://localhost:6379/0"  # 设为 memory:// 时使用进程内队列，由调度进程内启动的worker消费
+    work_queue_name: str = "crawler:work"
+    work_visibility_timeout: int = 300  # 工作项租约时长（秒），超时未确认则重新入队
+    work_max_attempts: int = 3  # 最大尝试次数，超过后进入死信队列
+    worker_concurrency: int = 4  # 每个worker进程同时处理的工作项数
+
+    # HTTP条件请求缓存（ETag/Last-Modified）
+    http_cache_enabled: bool = True
+    http_cache_path: str = "./http_cache.db"
+    http_cache_max_bytes: int = 256 * 1024 * 1024
+
+    # 文本摘要：配置了OPENAI_API_KEY时调用chat/completions接口，否则使用本地启发式摘要
+    openai_api_key: Optional[str] = None
+    openai_base_url: str = "https://api.openai.com/v1"
+    summary_model: str = "gpt-3.5-turbo"
+    summary_timeout: float = 30  # 单次请求超时（秒）
+    summary_max_concurrency: int = 4  # 同时进行的摘要请求数
+    summary_batch_size: int = 8  # 每次请求合并的文本数
+    summary_max_retries: int = 3  # 暂时性错误的重试次数
+    summary_cache_enabled: bool = True
+    summary_cache_path: str = "./summary_cache.db"
+    summary_cache_max_entries: int = 100000
+
+    # 后台摘要：结果先以pending状态入库，由后台工作池分批生成摘要，与抓取互不阻塞
+    summary_enrich_enabled: bool = True
+    summary_enrich_batch_size: int = 32  # 每次领取的结果数
+    summary_enrich_concurrency: int = 2  # 同时处理的批次数
+    summary_enrich_queue_size: int = 4  # 已领取待处理的批次上限，摘要跟不上时停止领取
+    summary_enrich_poll_interval: float = 30  # 没有新结果通知时重新扫描的间隔（秒）
+    summary_enrich_max_attempts: int = 3  # 同一结果处理失败的次数上限，超过后标记为failed并使用本地摘要
+    summary_enrich_retry_base: float = 30  # 处理失败后首次重试的等待时间（秒），连续失败时逐次翻倍
+    summary_enrich_retry_max: float = 600  # 失败重试等待时间上限（秒）
+
+    # 访问令牌缓存：已验证的令牌在ttl内不再查询用户
+    auth_cache_ttl: int = 60  # 秒
+    auth_cache_max_entries: int = 10000
+
+    # API响应缓存：memory 进程内LRU，redis 多进程共享（使用redis_url），off 关闭
+    response_cache_backend: str = "memory"
+    response_cache_ttl: int = 300  # 缓存条目最长保留时间（秒）
+    response_cache_max_entries: int = 1024  # 进程内缓存的条目数上限
+
+    # 监控指标：在/metrics按Prometheus文本格式输出抓取各阶段和API请求的耗时、计数
+    metrics_enabled: bool = True
+    
+    class Config:
+        env_file = ".env"
+
+def get_settings():
+    return Settings()
@@ -1,160 +1,653 @@
 import asyncio
 import aiohttp
-import pandas as pd
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set, Tuple, Union
 from urllib.parse import urljoin, urlparse
-import re
-from bs4 import BeautifulSoup
-import requests
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 import os
 
-from app.models import CrawlResult, MonitoredSite, Keyword, CrawlTask, TaskSite, TaskKeyword
+from app.config import get_settings
+from app.models import CrawlResult, MonitoredSite, Keyword, CrawlTask, TaskSite, TaskKeyword, SUMMARY_DONE, SUMMARY_PENDING
 from app.database import get_db
+from app.crawler.fetcher import AsyncFetcher, FetchResult
+from app.crawler.politeness import RobotsDisallowed, get_politeness
+from app.crawler.matcher import matcher_cache
+from app.crawler.parser import ParsedPage, parse_html, resolve_backend
+from app.crawler.extractor import extract_article, parse_date
+from app.crawler.feeds import SITEMAP_PATHS, FeedItem, discover_feed_links, is_feed_content, iter_feed_items
+from app.crawler.frontier import CrawlFrontier, PageLinks
+from app.crawler.http_cache import HttpCache, get_http_cache
+from app.crawler.dedup import SeenUrlIndex, insert_results_ignore_duplicates
+from app.crawler.pipeline import RunStats
+from app.crawler.db_writer import get_db_writer
+from app.crawler.enrichment import get_summary_enricher
 from app.utils.text_summarizer import summarizer
 from app.utils.excel_exporter import ExcelExporter
+from app.utils.metrics import (
+    EXPORT_SECONDS, MATCH_SECONDS, PARSE_SECONDS, QUEUE_DEPTH, RESULTS_SAVED, RUNNING_TASKS
+)
+from app.utils.response_cache import RESULTS, SITES, TASKS, response_cache
+
+# 每个链接保留的链接文字长度，用于判断分页链接
+LINK_TEXT_CHARS = 32
 
 class Crawler:
     def __init__(self, db: Session):
         self.db = db
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.settings = get_settings()
+        # 当前任务已保存过的 (url, 关键词) 索引
+        self._seen_urls = SeenUrlIndex()
+        # 本次运行中列表页抓取或解析失败的网站
+        self._failed_sites = set()
+
+    def _create_fetcher(self) -> AsyncFetcher:
+        return AsyncFetcher(
+            max_concurrency=self.settings.crawler_max_concurrency,
+            per_host_concurrency=self.settings.crawler_per_host_concurrency,
+            timeout=self.settings.crawler_timeout,
+            cache=self._get_http_cache(),
+            politeness=get_politeness(self.settings)
+        )
+
+    def _get_http_cache(self) -> Optional[HttpCache]:
+        if not self.settings.http_cache_enabled:
+            return None
+        return get_http_cache(self.settings.http_cache_path, self.settings.http_cache_max_bytes)
 
-    async def crawl_task(self, task_id: int):
+    async def crawl_task(self, task_id: int, site_ids: Optional[List[int]] = None, export_excel: bool = True):
         """
         执行一个爬虫任务
+        指定site_ids时只抓取其中属于该任务的网站（分布式模式下每个工作项只负责一个网站）
         """
-        task = self.db.query(CrawlTask).filter(CrawlTask.id == task_id).first()
-        if not task:
+        # 同步查询放到线程中执行：写入线程持有SQLite锁时查询最多等待busy_timeout，
+        # 不能卡住调度器上并发运行的其他任务
+        loaded = await asyncio.to_thread(self._load_task, task_id, site_ids)
+        if loaded is None:
             print(f"Task {task_id} not found")
             return
-
-        # 获取任务关联的网站和关键词
-        site_ids = [ts.site_id for ts in self.db.query(TaskSite).filter(TaskSite.task_id == task_id).all()]
-        keyword_ids = [tk.keyword_id for tk in self.db.query(TaskKeyword).filter(TaskKeyword.task_id == task_id).all()]
+        task, sites, keywords, last_result_id = loaded
+        self._failed_sites = set()
         
-        sites = self.db.query(MonitoredSite).filter(MonitoredSite.id.in_(site_ids)).all()
-        keywords = self.db.query(Keyword).filter(Keyword.id.in_(keyword_ids)).all()
-        
-        all_results = []
-        for site in sites:
-            for keyword in keywords:
-                results = self.crawl_site_for_keyword(site, keyword)
-                
-                # 为每个结果生成摘要
-                for result in results:
-                    if result['content']:
-                        result['summary'] = summarizer.summarize_text(result['content'])
-                    else:
-                        result['summary'] = summarizer.summarize_text(result['title'])
-                
-                all_results.extend(results)
-        
-        # 保存结果到数据库
-        for result in all_results:
-            crawl_result = CrawlResult(
-                title=result['title'],
-                url=result['url'],
-                content=result['content'],
-                summary=result.get('summary', ''),
-                published_at=result.get('published_at'),
-                keyword_matched=result['keyword_matched'],
-                site_id=result['site_id'],
-                task_id=task_id,  # 修复：使用传入的task_id
-                user_id=result['user_id']
-            )
-            self.db.add(crawl_result)
+        stats = RunStats(task_id, trace_memory=self.settings.crawler_trace_memory)
+        stats.start()
+        
+        # 流水线：抓取/解析/匹配 -> 入库，两个阶段之间用有界队列连接实现背压；
+        # 摘要不在抓取路径上，结果以pending状态入库后由后台摘要工作池生成
+        result_queue: asyncio.Queue = asyncio.Queue(maxsize=self.settings.crawler_queue_size)
+        persist_stage = asyncio.create_task(self._persist_stage(result_queue, task_id, stats))
+        
+        async def crawl_and_emit(fetcher: AsyncFetcher, site: MonitoredSite):
+            for result in await self.crawl_site(fetcher, site, keywords, task_id=task_id):
+                await result_queue.put(result)
+                QUEUE_DEPTH.labels('results').inc()
+            stats.sites += 1
+        
+        async def crawl_stage():
+            # 每个网站只抓取、解析一次，所有网站并发执行，由抓取器统一限制全局与单主机并发
+            async with self._create_fetcher() as fetcher:
+                await asyncio.gather(*[crawl_and_emit(fetcher, site) for site in sites])
+            stats.bytes_downloaded = fetcher.bytes_downloaded
+            stats.bytes_saved = fetcher.bytes_saved
+            stats.pages_rejected = fetcher.rejected
+            stats.sites_failed = len(self._failed_sites)
+            await result_queue.put(None)
         
-        self.db.commit()
+        RUNNING_TASKS.inc()
+        crawl = asyncio.create_task(crawl_stage())
+        try:
+            # 入库阶段出错后不再有人消费队列，抓取协程会阻塞在满队列上；
+            # 任一阶段出错就立即取消另一个阶段并抛出错误
+            done, _ = await asyncio.wait({crawl, persist_stage}, return_when=asyncio.FIRST_EXCEPTION)
+            for stage in (persist_stage, crawl):
+                if stage in done and stage.exception() is not None:
+                    raise stage.exception()
+            await persist_stage
+        finally:
+            crawl.cancel()
+            persist_stage.cancel()
+            await asyncio.gather(crawl, persist_stage, return_exceptions=True)
+            # 出错时队列中剩下的结果不会再入库
+            while not result_queue.empty():
+                if result_queue.get_nowait() is not None:
+                    QUEUE_DEPTH.labels('results').dec()
+            RUNNING_TASKS.dec()
+            stats.finish()
         
         # 更新任务的最后运行时间
-        task.last_run = datetime.utcnow()
-        self.db.commit()
+        last_run = datetime.utcnow()
+        await get_db_writer().run(
+            lambda db: db.query(CrawlTask).filter(CrawlTask.id == task_id).update({CrawlTask.last_run: last_run})
+        )
+        response_cache.invalidate(task.user_id, TASKS)
+        stats.report()
         
-        # 将结果保存到Excel文件
-        if all_results:
+        # 将本次新增的结果保存到Excel文件
+        if export_excel and stats.rows_written:
             keyword_str = "_".join([kw.keyword for kw in keywords[:3]])  # 使用前3个关键词作为文件名标识
-            self.save_results_to_excel(all_results, keyword=keyword_str)
+            await asyncio.to_thread(self._export_run_results, task_id, last_result_id, keyword_str)
         
-        return all_results
+        return stats.to_dict()
 
-    def crawl_site_for_keyword(self, site: MonitoredSite, keyword: Keyword) -> List[Dict[str, Any]]:
+    async def _persist_stage(self, persist_queue: asyncio.Queue, task_id: int, stats: RunStats):
         """
-        在指定网站搜索关键词并返回结果
+        入库阶段：每攒够一批结果写入一次数据库并提交，进程中途退出时已提交的批次不会丢失
+        关闭后台摘要时没有工作池处理pending结果，直接用本地摘要以done状态入库
+        """
+        enrich = self.settings.summary_enrich_enabled
+        batch = []
+        while True:
+            result = await persist_queue.get()
+            if result is not None:
+                QUEUE_DEPTH.labels('results').dec()
+                stats.results += 1
+                batch.append({
+                    'title': result['title'],
+                    'url': result['url'],
+                    'content': result['content'],
+                    'summary': None if enrich else summarizer.summarize_text(result['content'] or result['title']),
+                    'summary_status': SUMMARY_PENDING if enrich else SUMMARY_DONE,
+                    'published_at': result.get('published_at'),
+                    'keyword_matched': result['keyword_matched'],
+                    'site_id': result['site_id'],
+                    'task_id': task_id,  # 修复：使用传入的task_id
+                    'user_id': result['user_id']
+                })
+            if batch and (result is None or len(batch) >= self.settings.crawler_batch_size):
+                stats.rows_written += await self._write_batch(batch)
+                stats.batches += 1
+                batch = []
+            if result is None:
+                return
+
+    async def _write_batch(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        交给写入线程写入一批结果，和其他任务的写操作合并提交
+        """
+        # 重复的 (task_id, url, keyword_matched) 被忽略
+        inserted = await get_db_writer().run(lambda db: insert_results_ignore_duplicates(db, rows))
+        RESULTS_SAVED.inc(inserted)
+        if inserted:
+            for user_id in {row['user_id'] for row in rows}:
+                response_cache.invalidate(user_id, RESULTS)
+            get_summary_enricher().notify()
+        return inserted
+
+    def _load_task(self, task_id: int, site_ids: Optional[List[int]]) -> Optional[Tuple[CrawlTask, List[MonitoredSite], List[Keyword], int]]:
+        """
+        读取任务关联的网站、关键词和已保存的文章，返回 (任务, 网站, 关键词, 运行前的最大结果ID)，任务不存在时返回None
+        """
+        task = self.db.query(CrawlTask).filter(CrawlTask.id == task_id).first()
+        if not task:
+            return None
+
+        task_site_ids = [ts.site_id for ts in self.db.query(TaskSite).filter(TaskSite.task_id == task_id).all()]
+        if site_ids is not None:
+            task_site_ids = [site_id for site_id in task_site_ids if site_id in site_ids]
+        keyword_ids = [tk.keyword_id for tk in self.db.query(TaskKeyword).filter(TaskKeyword.task_id == task_id).all()]
+
+        sites = self.db.query(MonitoredSite).filter(MonitoredSite.id.in_(task_site_ids)).all()
+        keywords = self.db.query(Keyword).filter(
+            Keyword.id.in_(keyword_ids),
+            Keyword.is_active == True
+        ).all()
+
+        # 加载任务已保存的文章，已知文章不再抓取详情页
+        self._seen_urls = SeenUrlIndex.load(self.db, task_id, site_ids=task_site_ids if site_ids is not None else None)
+        # 记录运行前的最大结果ID，用于导出本次新增的结果
+        last_result_id = self.db.query(func.max(CrawlResult.id)).scalar() or 0
+        return task, sites, keywords, last_result_id
+
+    def _export_run_results(self, task_id: int, after_id: int, keyword_str: str):
+        self.save_results_to_excel(self._load_run_results(task_id, after_id), keyword=keyword_str)
+
+    def _load_run_results(self, task_id: int, after_id: int) -> List[Dict[str, Any]]:
+        """
+        读取本次运行写入的结果，用于导出
+        """
+        rows = self.db.query(CrawlResult).filter(
+            CrawlResult.task_id == task_id,
+            CrawlResult.id > after_id
+        ).order_by(CrawlResult.id).all()
+        return [
+            {
+                'title': row.title,
+                'url': row.url,
+                'content': row.content or '',
+                'summary': self._export_summary(row),
+                'published_at': row.published_at,
+                'crawled_at': row.crawled_at,
+                'keyword_matched': row.keyword_matched
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _export_summary(row: CrawlResult) -> str:
+        # 后台摘要还没完成的结果用本地启发式摘要导出
+        if row.summary_status == SUMMARY_PENDING:
+            return summarizer.summarize_text(row.content or row.title)
+        return row.summary or ''
+
+    async def crawl_site(self, fetcher: AsyncFetcher, site: MonitoredSite, keywords: List[Keyword], task_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        抓取网站一次，用同一份内容匹配所有关键词并返回结果
+        feed模式读取RSS/Atom/sitemap条目，直接在条目的标题和描述上匹配关键词，只有没有描述的条目才抓取详情页；
+        html模式抓取并解析列表页；auto模式在列表页或/sitemap.xml中发现feed后改用feed模式
         """
         results = []
         try:
-            response = self.session.get(site.url, timeout=10)
-            response.raise_for_status()
+            if fetcher.politeness:
+                fetcher.politeness.set_site_rate(site.url, site.crawl_rate)
+            # 处理范围：本任务+关键词集合，内容未变且已在此范围处理过时无需再解析
+            scope = f"task:{task_id}:{matcher_cache.get(keywords).signature}" if task_id is not None else None
+            mode = self._site_mode(site)
+            parser_backend = self._parser_backend(site)
+
+            if mode != 'html' and site.feed_url:
+                try:
+                    response, items = await self._fetch_feed_items(fetcher, site.feed_url)
+                    return await self._crawl_feed_items(fetcher, site, site.feed_url, response, items, keywords, scope, parser_backend)
+                except RobotsDisallowed:
+                    raise
+                except Exception as e:
+                    if mode == 'feed':
+                        raise
+                    print(f"Error reading feed {site.feed_url}, falling back to HTML: {str(e)}")
+
+            response = await fetcher.fetch(site.url)
+            processed, stored_links = await self._processed_links(fetcher, site.url, response, scope)
+            frontier = self._create_frontier(site)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # 首页返回304且本任务已用相同关键词处理过这份内容，又不需要跟随链接时，到此为止
+            if processed and frontier.max_depth == 0:
+                return results
             
-            # 查找包含关键词的内容（简化版，实际可能需要更复杂的逻辑）
-            elements = soup.find_all(string=re.compile(keyword.keyword, re.IGNORECASE))
+            # 处理过的页面用记录的链接扩展队列，无需解析；否则解析放到线程中执行，避免阻塞事件循环上其他站点的抓取
+            if stored_links is not None:
+                page = stored_links
+            else:
+                page = await asyncio.to_thread(self._parse_page, response.content, parser_backend)
+
+            if mode != 'html' and not site.feed_url and not processed:
+                discovered = await self._discover_feed(fetcher, site, page)
+                if discovered is not None:
+                    feed_url, feed_response, items = discovered
+                    return await self._crawl_feed_items(fetcher, site, feed_url, feed_response, items, keywords, scope,
+                                                        parser_backend)
             
-            for element in elements:
-                # 找到包含关键词的元素的父级链接
-                parent_link = element.parent.find_parent('a', href=True)
-                
-                if parent_link:
-                    link_url = urljoin(site.url, parent_link['href'])
-                    
-                    # 获取页面详情
-                    try:
-                        detail_response = self.session.get(link_url, timeout=10)
-                        detail_response.raise_for_status()
-                        
-                        detail_soup = BeautifulSoup(detail_response.content, 'html.parser')
-                        
-                        # 尝试提取标题
-                        title_elem = detail_soup.find(['h1', 'h2', 'h3', 'title'])
-                        title = title_elem.get_text().strip() if title_elem else 'Untitled'
-                        
-                        # 尝试提取发布日期（简化处理）
-                        date_elem = detail_soup.find(['time', 'span'], class_=re.compile(r'date|time|published', re.IGNORECASE))
-                        published_at = None
-                        if date_elem:
-                            date_text = date_elem.get_text().strip()
-                            # 这里可以添加日期解析逻辑
-                            try:
-                                published_at = datetime.fromisoformat(date_text.replace('Z', '+00:00'))
-                            except:
-                                published_at = datetime.utcnow()
-                        
-                        # 提取全文内容
-                        content_elem = detail_soup.find('body')
-                        content = content_elem.get_text().strip() if content_elem else ''
-                        
-                        # 创建结果对象
-                        result = {
-                            'title': title,
-                            'url': link_url,
-                            'content': content[:5000],  # 限制内容长度
-                            'published_at': published_at,
-                            'keyword_matched': keyword.keyword,
-                            'site_id': site.id,
-                            'task_id': 0,  # 将在保存时设置
-                            'user_id': site.user_id
-                        }
-                        
-                        results.append(result)
-                        
-                        # 为了简单起见，我们只获取第一个匹配项
-                        # 在实际应用中，你可能需要遍历更多元素
-                        break
-                        
-                    except Exception as e:
-                        print(f"Error crawling link {link_url}: {str(e)}")
-                        continue
+            # 从首页出发按优先级抓取分页、栏目等列表页，收集每个关键词命中的链接（按抓取顺序）
+            candidate_links, page_candidates, page_links = await self._crawl_list_pages(
+                fetcher, frontier, site, response, page, processed, keywords, scope, parser_backend
+            )
+            
+            # 同一详情页被多个关键词命中时只抓取、解析一次；缓存只在本网站范围内有效，内存随网站释放
+            detail_pages: Dict[str, asyncio.Future] = {}
+            failed_links: Set[str] = set()
+            keyword_results = await asyncio.gather(*[
+                self._crawl_details(fetcher, site, keyword, candidate_links[keyword.id], detail_pages, parser_backend,
+                                    failed_links)
+                for keyword in keywords
+            ])
+            results = [result for keyword_result in keyword_results for result in keyword_result]
+            await self._mark_processed(fetcher, scope, page_candidates, failed_links, page_links)
                         
+        except RobotsDisallowed as e:
+            print(f"Skipping site {site.url}: {str(e)}")
         except Exception as e:
             print(f"Error crawling site {site.url}: {str(e)}")
+            self._failed_sites.add(site.id)
+        
+        return results
+
+    async def _is_processed(self, fetcher: AsyncFetcher, url: str, response: FetchResult, scope: Optional[str]) -> bool:
+        """
+        页面返回304且本任务已用相同关键词处理过这份内容
+        """
+        if not (response.not_modified and scope and fetcher.cache):
+            return False
+        return await asyncio.to_thread(fetcher.cache.is_processed, url, scope)
+
+    async def _processed_links(self, fetcher: AsyncFetcher, url: str, response: FetchResult,
+                               scope: Optional[str]) -> Tuple[bool, Optional[PageLinks]]:
+        """
+        同_is_processed，并返回处理时记录的页面链接；旧版本缓存中没有记录链接时为None
+        """
+        if not (response.not_modified and scope and fetcher.cache):
+            return False, None
+        processed, links = await asyncio.to_thread(fetcher.cache.processed_links, url, scope)
+        return processed, PageLinks.from_json(links) if links is not None else None
+
+    async def _mark_processed(self, fetcher: AsyncFetcher, scope: Optional[str], page_candidates: Dict[str, Set[str]],
+                              failed_links: Set[str], page_links: Optional[Dict[str, PageLinks]] = None):
+        """
+        页面上命中的链接都成功取到结果后，才把这个页面记为已处理，失败的下次仍会重试
+        列表页同时记录页面上的链接；之前已处理、但还没有记录链接的页面补上链接
+        """
+        if not scope or not fetcher.cache:
+            return
+        page_links = page_links or {}
+        for url in set(page_candidates) | set(page_links):
+            links = page_candidates.get(url)
+            if links is None or links.isdisjoint(failed_links):
+                stored = page_links.get(url)
+                await asyncio.to_thread(fetcher.cache.mark_processed, url, scope, stored.to_json() if stored else None)
+
+    def _create_frontier(self, site: MonitoredSite) -> CrawlFrontier:
+        """
+        网站单独配置的深度、页数和链接范围优先，否则使用全局配置
+        """
+        return CrawlFrontier(
+            site.url,
+            max_depth=site.max_depth if site.max_depth is not None else self.settings.crawler_max_depth,
+            max_pages=site.max_pages or self.settings.crawler_max_pages,
+            link_pattern=site.link_pattern,
+            exclude_pattern=self.settings.crawler_exclude_pattern,
+            same_domain=self.settings.crawler_same_domain,
+            capacity=self.settings.crawler_frontier_capacity,
+            max_queue=self.settings.crawler_frontier_max_queue
+        )
+
+    async def _crawl_list_pages(self, fetcher: AsyncFetcher, frontier: CrawlFrontier, site: MonitoredSite,
+                                response: FetchResult, page: ParsedPage, processed: bool, keywords: List[Keyword],
+                                scope: Optional[str], parser_backend: str
+                                ) -> Tuple[Dict[int, List[str]], Dict[str, Set[str]], Dict[str, PageLinks]]:
+        """
+        从首页出发，每轮从队列中取出若干个列表页并发抓取，匹配关键词后把页面上的其他链接加入队列
+        返回 关键词ID -> 命中的链接列表，列表页URL -> 该页命中的链接集合（用于记录已处理），
+        以及 解析过的列表页URL -> 页面上的链接（与已处理标记一起保存）
+        已处理过且内容未变的列表页不再匹配关键词，只用来发现更深的页面：记录过链接的直接用记录的链接，不再解析
+        """
+        candidate_links: Dict[int, List[str]] = {keyword.id: [] for keyword in keywords}
+        page_candidates: Dict[str, Set[str]] = {}
+        page_links: Dict[str, PageLinks] = {}
+        current = [(site.url, response, page, processed, 0)]
+        while current:
+            for url, response, page, processed, depth in current:
+                frontier.add_visited(response.url)
+                if isinstance(page, PageLinks):
+                    frontier.push_page(page, depth)
+                    continue
+                matched_links, page_links[url] = await asyncio.to_thread(
+                    self._expand_frontier, frontier, page, url, depth, keywords
+                )
+                if not processed:
+                    page_candidates[url] = set()
+                    for keyword_id, link_urls in matched_links.items():
+                        candidate_links[keyword_id].extend(link_urls)
+                        page_candidates[url].update(link_urls)
+            current = await self._fetch_list_pages(fetcher, frontier.pop_many(self.settings.crawler_per_host_concurrency),
+                                                   scope, parser_backend)
+        return candidate_links, page_candidates, page_links
+
+    def _expand_frontier(self, frontier: CrawlFrontier, page: ParsedPage, url: str, depth: int,
+                         keywords: List[Keyword]) -> Tuple[Dict[int, List[str]], PageLinks]:
+        """
+        匹配列表页上的关键词，把其他链接加入队列，返回 关键词ID -> 命中的链接列表，以及页面上的链接
+        """
+        with MATCH_SECONDS.time():
+            matched_links, links = self._scan_page(page, url, keywords)
+        # 命中关键词的链接是详情页，不作为列表页抓取
+        details = dict.fromkeys(link_url for link_urls in matched_links.values() for link_url in link_urls)
+        page_links = PageLinks({link_url: text for link_url, text in links.items() if link_url not in details}, list(details))
+        frontier.push_page(page_links, depth)
+        return matched_links, page_links
+
+    async def _fetch_list_pages(self, fetcher: AsyncFetcher, batch: List[Tuple[str, int]], scope: Optional[str],
+                                parser_backend: str) -> List[Tuple[str, FetchResult, Union[ParsedPage, PageLinks], bool, int]]:
+        """
+        并发抓取并解析一批列表页，失败的页面直接跳过
+        """
+        responses = await asyncio.gather(*[
+            fetcher.fetch(url, max_bytes=self.settings.crawler_detail_max_bytes, html_only=True)
+            for url, _ in batch
+        ], return_exceptions=True)
+        pages = []
+        for (url, depth), response in zip(batch, responses):
+            if isinstance(response, Exception):
+                print(f"Error crawling page {url}: {str(response)}")
+                continue
+            processed, page = await self._processed_links(fetcher, url, response, scope)
+            if page is None:
+                page = await asyncio.to_thread(self._parse_page, response.content, parser_backend)
+            pages.append((url, response, page, processed, depth))
+        return pages
+
+    def _site_mode(self, site: MonitoredSite) -> str:
+        """
+        网站单独配置的抓取方式优先，否则使用全局配置
+        """
+        return site.crawl_mode or self.settings.crawler_site_mode
+
+    async def _fetch_feed_items(self, fetcher: AsyncFetcher, feed_url: str) -> Tuple[FetchResult, List[FeedItem]]:
+        """
+        抓取并流式解析feed或sitemap；sitemap索引按lastmod从新到旧读取前几个子sitemap
+        """
+        response = await fetcher.fetch(feed_url, max_bytes=self.settings.crawler_feed_max_bytes)
+        if not is_feed_content(response.headers.get('Content-Type'), response.content):
+            raise ValueError(f"{feed_url} is not a feed or sitemap")
+        entries = await asyncio.to_thread(self._parse_feed, response.content, feed_url)
+
+        items = [entry for entry in entries if not entry.is_sitemap]
+        sitemaps = sorted(
+            (entry for entry in entries if entry.is_sitemap),
+            key=lambda entry: entry.published_at or datetime.min,
+            reverse=True
+        )
+        for sitemap in sitemaps[:self.settings.crawler_sitemap_max_children]:
+            try:
+                child = await fetcher.fetch(sitemap.url, max_bytes=self.settings.crawler_feed_max_bytes)
+                child_entries = await asyncio.to_thread(self._parse_feed, child.content, sitemap.url)
+                items.extend(entry for entry in child_entries if not entry.is_sitemap)
+            except Exception as e:
+                print(f"Error reading sitemap {sitemap.url}: {str(e)}")
+        return response, items
+
+    async def _discover_feed(self, fetcher: AsyncFetcher, site: MonitoredSite,
+                             page: ParsedPage) -> Optional[Tuple[str, FetchResult, List[FeedItem]]]:
+        """
+        依次尝试列表页<link rel="alternate">声明的feed和/sitemap.xml，找到带标题的条目时保存为网站的feed_url
+        只有链接没有标题的普通sitemap无法在条目上匹配关键词，不采用
+        """
+        candidates = discover_feed_links(page, site.url) + [urljoin(site.url, path) for path in SITEMAP_PATHS]
+        for feed_url in candidates:
+            try:
+                response, items = await self._fetch_feed_items(fetcher, feed_url)
+            except Exception as e:
+                print(f"No feed at {feed_url}: {str(e)}")
+                continue
+            if not any(item.title for item in items):
+                continue
+            await get_db_writer().run(
+                lambda db: db.query(MonitoredSite).filter(MonitoredSite.id == site.id).update({MonitoredSite.feed_url: feed_url})
+            )
+            response_cache.invalidate(site.user_id, SITES)
+            print(f"Discovered feed {feed_url} for site {site.url}")
+            return feed_url, response, items
+        return None
+
+    async def _crawl_feed_items(self, fetcher: AsyncFetcher, site: MonitoredSite, feed_url: str, response: FetchResult,
+                                items: List[FeedItem], keywords: List[Keyword], scope: Optional[str],
+                                parser_backend: str) -> List[Dict[str, Any]]:
+        """
+        在feed条目的标题和描述上匹配关键词，返回每个关键词命中的所有新条目
+        """
+        if await self._is_processed(fetcher, feed_url, response, scope):
+            return []
+
+        matcher = matcher_cache.get(keywords)
+        candidate_items: Dict[int, List[FeedItem]] = {keyword.id: [] for keyword in keywords}
+        with MATCH_SECONDS.time():
+            for item in items:
+                for keyword_id in matcher.find(item.text):
+                    candidate_items[keyword_id].append(item)
+
+        detail_pages: Dict[str, asyncio.Future] = {}
+        failed_links: Set[str] = set()
+        keyword_results = await asyncio.gather(*[
+            self._feed_results(fetcher, site, keyword, candidate_items[keyword.id], detail_pages, parser_backend, failed_links)
+            for keyword in keywords
+        ])
+        page_candidates = {feed_url: {item.url for matched in candidate_items.values() for item in matched}}
+        await self._mark_processed(fetcher, scope, page_candidates, failed_links)
+        return [result for keyword_result in keyword_results for result in keyword_result]
+
+    async def _feed_results(self, fetcher: AsyncFetcher, site: MonitoredSite, keyword: Keyword, items: List[FeedItem],
+                            detail_pages: Dict[str, asyncio.Future], parser_backend: str,
+                            failed_links: Set[str]) -> List[Dict[str, Any]]:
+        """
+        条目带描述时直接用描述作为正文，不抓取详情页；没有描述（如新闻sitemap）时才抓取详情页
+        """
+        items = [item for item in items if not self._seen_urls.contains(item.url, keyword.keyword)]
+        detail_items = [item for item in items if not item.description]
+        pages = await asyncio.gather(*[
+            self._get_detail_page(fetcher, item.url, detail_pages, parser_backend) for item in detail_items
+        ], return_exceptions=True)
+        detail_results = {item.url: page for item, page in zip(detail_items, pages)}
+
+        results = []
+        for item in items:
+            if item.description:
+                page = {'title': item.title, 'content': item.description[:self.settings.crawler_content_max_chars],
+                        'published_at': item.published_at}
+            else:
+                page = detail_results[item.url]
+                if isinstance(page, Exception):
+                    print(f"Error crawling link {item.url}: {str(page)}")
+                    failed_links.add(item.url)
+                    continue
+                page = dict(page, title=item.title or page['title'], published_at=item.published_at or page['published_at'])
+            self._seen_urls.add(item.url, keyword.keyword)
+            results.append(self._build_result(page, item.url, site, keyword))
+        return results
+
+    async def crawl_site_for_keyword(self, fetcher: AsyncFetcher, site: MonitoredSite, keyword: Keyword) -> List[Dict[str, Any]]:
+        """
+        在指定网站搜索关键词并返回结果
+        """
+        return await self.crawl_site(fetcher, site, [keyword])
+
+    def _parser_backend(self, site: MonitoredSite) -> str:
+        """
+        网站单独配置的解析后端优先，否则使用全局配置
+        """
+        return resolve_backend(site.parser_backend or self.settings.crawler_parser_backend)
+
+    def _scan_page(self, page: ParsedPage, base_url: str, keywords: List[Keyword]) -> Tuple[Dict[int, List[str]], Dict[str, str]]:
+        """
+        遍历一次文本节点，返回 关键词ID -> 命中文本所在链接列表，以及页面上所有链接 -> 链接文字
+        """
+        matcher = matcher_cache.get(keywords)
+        candidate_links = {keyword.id: [] for keyword in keywords}
+        links: Dict[str, str] = {}
+    
+        for text, href in page.text_links():
+            if not href:
+                continue
+            link_url = urljoin(base_url, href)
+            if link_url not in links or len(links[link_url]) < LINK_TEXT_CHARS:
+                links[link_url] = (links.get(link_url, '') + text.strip())[:LINK_TEXT_CHARS]
+        
+            # 包含关键词的文本所在的链接
+            for keyword_id in matcher.find(text):
+                candidate_links[keyword_id].append(link_url)
+    
+        return candidate_links, links
+
+    async def _crawl_details(self, fetcher: AsyncFetcher, site: MonitoredSite, keyword: Keyword, link_urls: List[str],
+                             detail_pages: Dict[str, asyncio.Future], parser_backend: str,
+                             failed_links: Set[str]) -> List[Dict[str, Any]]:
+        """
+        抓取关键词命中的所有新链接，按链接顺序返回成功抓取的详情页结果，失败的链接记入failed_links
+        """
+        # 本任务已保存过的文章，跳过详情页抓取
+        link_urls = [
+            link_url for link_url in dict.fromkeys(link_urls)
+            if not self._seen_urls.contains(link_url, keyword.keyword)
+        ]
+        pages = await asyncio.gather(*[
+            self._get_detail_page(fetcher, link_url, detail_pages, parser_backend) for link_url in link_urls
+        ], return_exceptions=True)
+        
+        results = []
+        for link_url, page in zip(link_urls, pages):
+            if isinstance(page, Exception):
+                print(f"Error crawling link {link_url}: {str(page)}")
+                failed_links.add(link_url)
+                continue
+            self._seen_urls.add(link_url, keyword.keyword)
+            results.append(self._build_result(page, link_url, site, keyword))
         
         return results
 
+    def _get_detail_page(self, fetcher: AsyncFetcher, link_url: str, detail_pages: Dict[str, asyncio.Future],
+                         parser_backend: str) -> "asyncio.Future":
+        """
+        获取详情页解析结果，同一URL只抓取、解析一次
+        """
+        future = detail_pages.get(link_url)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_detail_page(fetcher, link_url, parser_backend))
+            detail_pages[link_url] = future
+        return future
+
+    async def _fetch_detail_page(self, fetcher: AsyncFetcher, link_url: str, parser_backend: str) -> Dict[str, Any]:
+        # 详情页限制读取字节数，非HTML响应在下载响应体之前就被拒绝
+        detail_response = await fetcher.fetch(
+            link_url,
+            max_bytes=self.settings.crawler_detail_max_bytes,
+            html_only=True
+        )
+        return await asyncio.to_thread(self._parse_detail_page, detail_response.content, parser_backend)
+
+    @staticmethod
+    def _parse_page(content: bytes, parser_backend: str) -> ParsedPage:
+        with PARSE_SECONDS.time():
+            return parse_html(content, parser_backend)
+
+    @staticmethod
+    def _parse_feed(content: bytes, feed_url: str) -> List[FeedItem]:
+        with PARSE_SECONDS.time():
+            return list(iter_feed_items(content, feed_url))
+
+    def _parse_detail_page(self, content: bytes, parser_backend: str) -> Dict[str, Any]:
+        """
+        从详情页中提取标题、发布日期和正文
+        """
+        detail_page = self._parse_page(content, parser_backend)
+        limit = self.settings.crawler_content_max_chars
+
+        if self.settings.crawler_extractor == 'readability':
+            # 只保留正文块的文本，标题和发布时间优先取meta、h1和time标签
+            article = extract_article(detail_page, limit=limit)
+            return {
+                'title': article.title or 'Untitled',
+                'content': article.content,
+                'published_at': article.published_at
+            }
+
+        # body：第一个标题元素、class包含date的元素和整个body的文本，收集到足够字符后即停止
+        return {
+            'title': detail_page.title() or 'Untitled',
+            'content': detail_page.body_text(limit=limit),
+            'published_at': parse_date(detail_page.published_text())
+        }
+
+    def _build_result(self, page: Dict[str, Any], link_url: str, site: MonitoredSite, keyword: Keyword) -> Dict[str, Any]:
+        """
+        由详情页内容和命中的关键词创建结果对象
+        """
+        return {
+            'title': page['title'],
+            'url': link_url,
+            'content': page['content'],
+            'published_at': page['published_at'],
+            'keyword_matched': keyword.keyword,
+            'site_id': site.id,
+            'task_id': 0,  # 将在保存时设置
+            'user_id': site.user_id
+        }
+
     def save_results_to_excel(self, results: List[Dict[str, Any]], filename: str = None, keyword: str = None):
         """
         将爬取结果保存到Excel文件
@@ -165,7 +658,8 @@ class Crawler:
         
         exporter = ExcelExporter(output_dir="exports")
         try:
-            filepath = exporter.export_crawl_results(results, filename, keyword)
+            with EXPORT_SECONDS.time():
+                filepath = exporter.export_crawl_results(results, filename, keyword)
             print(f"Saved {len(results)} results to {filepath}")
             return filepath
         except Exception as e:
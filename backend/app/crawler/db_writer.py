@@ -0,0 +1,117 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.utils.metrics import DB_WRITE_SECONDS, QUEUE_DEPTH
+
+WriteJob = Callable[[Session], Any]
+
+class DatabaseWriter:
+    """
+    爬虫的单一写入线程
+    所有写操作排队交给同一个线程和会话执行，排队中的多个写操作合并成一次提交；
+    同一进程内不再有写事务互相争用SQLite的写锁，API的读请求在WAL下也不会被提交阻塞
+    """
+
+    def __init__(self, session_factory=SessionLocal, max_batch: int = 64):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[Tuple[WriteJob, Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # 写入统计：提交次数和执行的写操作数
+        self.commits = 0
+        self.jobs = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        处理完已排队的写操作后停止写入线程
+        """
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def queue_size(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, job: WriteJob) -> Future:
+        """
+        提交一个写操作，job接收写入线程的会话，不需要自己提交；返回的Future在提交成功后得到job的返回值
+        """
+        self.start()
+        future: Future = Future()
+        self._queue.put((job, future))
+        return future
+
+    async def run(self, job: WriteJob) -> Any:
+        return await asyncio.wrap_future(self.submit(job))
+
+    def _run(self):
+        db = self.session_factory()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                group = [item]
+                # 把已经在排队的写操作一起取出，合并成一个事务
+                while len(group) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._queue.put(None)
+                        break
+                    group.append(item)
+                with DB_WRITE_SECONDS.time():
+                    self._commit_group(db, group)
+        finally:
+            db.close()
+
+    def _commit_group(self, db: Session, group: List[Tuple[WriteJob, Future]]):
+        try:
+            results = [job(db) for job, _ in group]
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            if len(group) == 1:
+                group[0][1].set_exception(e)
+                return
+            # 合并的事务失败时逐个重试，只让出错的写操作失败
+            for job, future in group:
+                self._commit_group(db, [(job, future)])
+            return
+        self.commits += 1
+        self.jobs += len(group)
+        for (_, future), result in zip(group, results):
+            future.set_result(result)
+
+_db_writer: Optional[DatabaseWriter] = None
+_db_writer_lock = threading.Lock()
+
+def get_db_writer() -> DatabaseWriter:
+    """
+    获取进程内共享的写入线程
+    """
+    global _db_writer
+    with _db_writer_lock:
+        if _db_writer is None:
+            _db_writer = DatabaseWriter(max_batch=get_settings().db_writer_max_batch)
+            QUEUE_DEPTH.labels('db_writer').set_function(_db_writer.queue_size)
+        return _db_writer
@@ -0,0 +1,79 @@
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import CrawlResult
+
+class SeenUrlIndex:
+    """
+    任务级已抓取文章索引
+    任务开始时从crawl_results加载该任务已有的 (url, 关键词) 组合，
+    以8字节哈希存放在集合中，已知文章在抓取详情页之前就被跳过
+    """
+
+    def __init__(self):
+        self._seen = set()
+
+    @staticmethod
+    def _key(url: str, keyword: str) -> int:
+        digest = hashlib.blake2b(f"{url}\x00{keyword}".encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big')
+
+    @classmethod
+    def load(cls, db: Session, task_id: int, site_ids: Optional[List[int]] = None) -> "SeenUrlIndex":
+        index = cls()
+        query = db.query(CrawlResult.url, CrawlResult.keyword_matched).filter(
+            CrawlResult.task_id == task_id
+        )
+        if site_ids is not None:
+            query = query.filter(CrawlResult.site_id.in_(site_ids))
+        rows = query.yield_per(1000)
+        for url, keyword in rows:
+            index.add(url, keyword)
+        return index
+
+    def add(self, url: str, keyword: str):
+        self._seen.add(self._key(url, keyword))
+
+    def contains(self, url: str, keyword: str) -> bool:
+        return self._key(url, keyword) in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+def insert_results_ignore_duplicates(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """
+    批量写入抓取结果，已存在的 (task_id, url, keyword_matched) 直接忽略
+    返回实际插入的行数
+    """
+    if not rows:
+        return 0
+
+    dialect = db.get_bind().dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        dialect_insert = None
+
+    if dialect_insert is not None:
+        stmt = dialect_insert(CrawlResult).on_conflict_do_nothing(
+            index_elements=['task_id', 'url', 'keyword_matched']
+        )
+        return max(db.connection().execute(stmt, rows).rowcount, 0)
+
+    # 其他数据库：逐行检查后插入
+    inserted = 0
+    for row in rows:
+        exists = db.query(CrawlResult.id).filter(
+            CrawlResult.task_id == row['task_id'],
+            CrawlResult.url == row['url'],
+            CrawlResult.keyword_matched == row['keyword_matched']
+        ).first()
+        if not exists:
+            db.connection().execute(insert(CrawlResult), [row])
+            inserted += 1
+    return inserted
@@ -0,0 +1,295 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import CrawlResult, SUMMARY_DONE, SUMMARY_FAILED, SUMMARY_PENDING
+from app.crawler.db_writer import get_db_writer
+from app.utils.metrics import QUEUE_DEPTH, SUMMARIZE_SECONDS
+from app.utils.response_cache import RESULTS, response_cache
+from app.utils.text_summarizer import SummaryService, summarizer
+
+# (id, user_id, 正文或标题)
+PendingRow = Tuple[int, int, str]
+
+class EnrichmentStats:
+    """
+    后台摘要的累计统计，与抓取任务的RunStats分开
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        # 多次失败后标记为failed的结果数
+        self.failed = 0
+        self.busy_time = 0.0
+        # 摘要服务的请求数、缓存命中数和接口调用失败的条数
+        self.summary_requests = 0
+        self.summary_cache_hits = 0
+        self.summary_failures = 0
+
+    def update_from(self, service: SummaryService):
+        self.summary_requests = service.requests
+        self.summary_cache_hits = service.cache_hits
+        self.summary_failures = service.failures
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'rows': self.rows,
+            'batches': self.batches,
+            'errors': self.errors,
+            'failed': self.failed,
+            'busy_time': round(self.busy_time, 3),
+            'summary_requests': self.summary_requests,
+            'summary_cache_hits': self.summary_cache_hits,
+            'summary_failures': self.summary_failures
+        }
+
+    def report(self, pending: int):
+        rate = self.rows / self.busy_time if self.busy_time else 0.0
+        print(
+            f"Summary enrichment: {self.rows} rows in {self.batches} batches ({rate:.1f} rows/s per worker), "
+            f"{self.summary_requests} summary requests ({self.summary_cache_hits} cache hits, "
+            f"{self.summary_failures} failed), {self.errors} errors, {self.failed} rows given up, {pending} pending"
+        )
+
+class SummaryEnricher:
+    """
+    后台摘要工作池
+    抓取任务只把结果以pending状态入库；本工作池在自己的线程和事件循环里按id顺序分批领取pending结果，
+    交给concurrency个协程生成摘要，再通过写入线程回写。领取到的批次放入有界队列，
+    摘要跟不上时领取协程在队列上等待，不会把积压的结果全部读进内存。
+    抓取延迟（crawler_*）和摘要吞吐（summary_*）分别配置、分别统计。
+    摘要接口调用失败或处理出错的结果按各自的失败次数指数退避，退避期间不再领取；
+    失败max_attempts次后写入本地摘要并标记为failed。
+    """
+
+    def __init__(self, session_factory=SessionLocal, service_factory=SummaryService.from_settings,
+                 batch_size: int = 32, concurrency: int = 2, queue_size: int = 4, poll_interval: float = 30, max_attempts: int = 3,
+                 retry_base: float = 30, retry_max: float = 600):
+        self.session_factory = session_factory
+        self.service_factory = service_factory
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.stats = EnrichmentStats()
+        self.is_running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        # 已领取但还没回写的结果，重新扫描时跳过
+        self._claimed: Set[int] = set()
+        # 每条结果的失败次数和最早重试时间（time.monotonic），处理成功或标记为failed后清除
+        self._attempts: Dict[int, int] = {}
+        self._retry_at: Dict[int, float] = {}
+
+    def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name='summary-enricher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 10):
+        if not self.is_running:
+            return
+        self.is_running = False
+        self._loop.call_soon_threadsafe(self._wake)
+        self._thread.join(timeout)
+
+    def notify(self):
+        """有新的pending结果入库后调用，立即唤醒领取协程"""
+        if self.is_running:
+            self._loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._main())
+        finally:
+            self._loop.close()
+
+    async def _main(self):
+        self._wakeup = asyncio.Event()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        # 队列中每项是一批结果
+        QUEUE_DEPTH.labels('summary').set_function(queue.qsize)
+        async with self.service_factory() as service:
+            workers = [asyncio.create_task(self._worker(service, queue)) for _ in range(self.concurrency)]
+            try:
+                await self._claim_loop(queue)
+                # 停止时处理完已领取的批次
+                await queue.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _claim_loop(self, queue: asyncio.Queue):
+        last_id = 0
+        reported = True
+        while self.is_running:
+            self._wakeup.clear()
+            rows = self._load_pending(last_id)
+            if rows:
+                last_id = rows[-1][0]
+                self._claimed.update(row[0] for row in rows)
+                await queue.put(rows)
+                reported = False
+                continue
+            if last_id:
+                # 扫描到末尾后从头再扫一遍，接上扫描期间插入到前面的结果
+                last_id = 0
+                continue
+            if not reported and queue.empty():
+                await queue.join()
+                self.stats.report(self.pending_count())
+                reported = True
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._next_scan_delay())
+            except asyncio.TimeoutError:
+                pass
+
+    def _next_scan_delay(self) -> float:
+        # 有退避中的结果时在最早的重试时间重新扫描
+        if not self._retry_at:
+            return self.poll_interval
+        return max(min(min(self._retry_at.values()) - time.monotonic(), self.poll_interval), 0)
+
+    def _skipped_ids(self) -> Set[int]:
+        """
+        已领取或还在退避期内的结果，扫描时跳过
+        """
+        now = time.monotonic()
+        return self._claimed | {result_id for result_id, retry_at in self._retry_at.items() if retry_at > now}
+
+    def _load_pending(self, after_id: int) -> List[PendingRow]:
+        skipped = self._skipped_ids()
+        db = self.session_factory()
+        try:
+            query = db.query(CrawlResult.id, CrawlResult.user_id, CrawlResult.content, CrawlResult.title).filter(
+                CrawlResult.summary_status == SUMMARY_PENDING,
+                CrawlResult.id > after_id
+            )
+            if skipped:
+                query = query.filter(CrawlResult.id.notin_(skipped))
+            rows = query.order_by(CrawlResult.id).limit(self.batch_size).all()
+        finally:
+            db.close()
+        return [(row.id, row.user_id, row.content or row.title) for row in rows]
+
+    def pending_count(self) -> int:
+        db = self.session_factory()
+        try:
+            return db.query(CrawlResult.id).filter(CrawlResult.summary_status == SUMMARY_PENDING).count()
+        finally:
+            db.close()
+
+    async def _worker(self, service: SummaryService, queue: asyncio.Queue):
+        while True:
+            rows = await queue.get()
+            started = time.perf_counter()
+            try:
+                await self._summarize(service, rows)
+            except Exception as e:
+                # 结果保持pending，退避后重试
+                self.stats.errors += 1
+                print(f"Error enriching results {rows[0][0]}-{rows[-1][0]}: {str(e)}")
+                await self._record_failure(rows)
+            finally:
+                self._claimed.difference_update(row[0] for row in rows)
+                self.stats.busy_time += time.perf_counter() - started
+                queue.task_done()
+
+    async def _summarize(self, service: SummaryService, rows: List[PendingRow]):
+        """
+        生成并回写一批摘要；接口调用失败的结果不回退到本地摘要，保持pending按退避重试
+        """
+        with SUMMARIZE_SECONDS.time():
+            summaries = await service.summarize_many([row[2] for row in rows], fallback=False)
+        self.stats.update_from(service)
+        done = [(row, summary) for row, summary in zip(rows, summaries) if summary is not None]
+        failed = [row for row, summary in zip(rows, summaries) if summary is None]
+        if done:
+            updates = [{'id': row[0], 'summary': summary, 'summary_status': SUMMARY_DONE} for row, summary in done]
+            await get_db_writer().run(lambda db: db.bulk_update_mappings(CrawlResult, updates))
+            self.stats.rows += len(done)
+            self._forget([row for row, _ in done])
+            for user_id in {row[1] for row, _ in done}:
+                response_cache.invalidate(user_id, RESULTS)
+        self.stats.batches += 1
+        if failed:
+            self.stats.errors += 1
+            print(f"Summary API failed for {len(failed)} of {len(rows)} results, retrying later")
+            await self._record_failure(failed)
+
+    def _forget(self, rows: List[PendingRow]):
+        for row in rows:
+            self._attempts.pop(row[0], None)
+            self._retry_at.pop(row[0], None)
+
+    async def _record_failure(self, rows: List[PendingRow]):
+        """
+        记录批次中每条结果的失败次数：未到上限的按次数指数退避，到达上限的用本地摘要标记为failed
+        """
+        now = time.monotonic()
+        exhausted = []
+        for row in rows:
+            attempts = self._attempts.get(row[0], 0) + 1
+            self._attempts[row[0]] = attempts
+            if attempts >= self.max_attempts:
+                exhausted.append(row)
+            else:
+                self._retry_at[row[0]] = now + min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+        if not exhausted:
+            return
+        updates = [
+            {'id': row[0], 'summary': summarizer.summarize_text(row[2]), 'summary_status': SUMMARY_FAILED}
+            for row in exhausted
+        ]
+        try:
+            await get_db_writer().run(lambda db: db.bulk_update_mappings(CrawlResult, updates))
+        except Exception as e:
+            # 连标记也失败时按最长间隔退避，之后再试
+            print(f"Error marking {len(exhausted)} results as failed: {str(e)}")
+            for row in exhausted:
+                self._retry_at[row[0]] = now + self.retry_max
+            return
+        self.stats.failed += len(exhausted)
+        self._forget(exhausted)
+        for user_id in {row[1] for row in exhausted}:
+            response_cache.invalidate(user_id, RESULTS)
+
+_summary_enricher: Optional[SummaryEnricher] = None
+_summary_enricher_lock = threading.Lock()
+
+def get_summary_enricher() -> SummaryEnricher:
+    """
+    获取进程内共享的后台摘要工作池
+    """
+    global _summary_enricher
+    with _summary_enricher_lock:
+        if _summary_enricher is None:
+            settings = get_settings()
+            _summary_enricher = SummaryEnricher(
+                batch_size=settings.summary_enrich_batch_size,
+                concurrency=settings.summary_enrich_concurrency,
+                queue_size=settings.summary_enrich_queue_size,
+                poll_interval=settings.summary_enrich_poll_interval,
+                max_attempts=settings.summary_enrich_max_attempts,
+                retry_base=settings.summary_enrich_retry_base,
+                retry_max=settings.summary_enrich_retry_max
+            )
+        return _summary_enricher
@@ -0,0 +1,354 @@
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.crawler.parser import START, TEXT, ParsedPage, DATE_CLASS_PATTERN
+
+# 连同子树整个跳过的标签
+SKIP_TAGS = frozenset([
+    'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe', 'object', 'embed',
+    'nav', 'button', 'select', 'option', 'textarea', 'input'
+])
+# 块级标签，前后换行
+BLOCK_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'figcaption', 'figure',
+    'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'ol', 'p', 'pre',
+    'section', 'table', 'td', 'th', 'tr', 'ul'
+])
+# 作为段落计分的标签
+PARAGRAPH_TAGS = frozenset(['p', 'pre', 'td', 'blockquote', 'li'])
+# 不包含块级子元素时也作为段落计分
+CONTAINER_TAGS = frozenset(['div', 'section', 'article'])
+# 按标签给候选块的初始分
+TAG_WEIGHTS = {
+    'article': 10, 'main': 10, 'div': 5, 'section': 3, 'pre': 3, 'td': 3, 'blockquote': 3,
+    'address': -3, 'ol': -3, 'ul': -3, 'dl': -3, 'dd': -3, 'dt': -3, 'li': -3, 'form': -3,
+    'th': -5, 'h1': -5, 'h2': -5, 'h3': -5, 'h4': -5, 'h5': -5, 'h6': -5
+}
+# 正文块内部出现这些标签时整体剔除
+PRUNE_TAGS = frozenset(['aside', 'footer', 'header', 'form', 'figure'])
+
+POSITIVE_PATTERN = re.compile(
+    r'article|body|content|entry|main|page|post|text|blog|story|detail|正文|内容', re.IGNORECASE
+)
+NEGATIVE_PATTERN = re.compile(
+    r'comment|footer|foot|sidebar|side|sponsor|share|social|related|recommend|advert|ad-|promo|menu|nav|'
+    r'breadcrumb|masthead|header|banner|widget|popup|modal|copyright|tags?\b|meta|hidden',
+    re.IGNORECASE
+)
+COMMA_PATTERN = re.compile(r'[,，、;；。]')
+WHITESPACE_PATTERN = re.compile(r'[ \t\r\f\v 　]+')
+NEWLINES_PATTERN = re.compile(r'\s*\n\s*')
+# 标题中网站名常用的分隔符，如 "文章标题 - 网站名"、"文章标题_频道_网站名"
+TITLE_SEPARATOR_PATTERN = re.compile(r'\s+[-|–—·]\s+|\s*[_|｜]\s*')
+
+# 发布时间的meta，按可靠程度排序
+DATE_META_NAMES = (
+    'article:published_time', 'og:published_time', 'og:release_date', 'datepublished', 'pubdate',
+    'publishdate', 'publish_date', 'publication_date', 'sailthru.date', 'dc.date.issued', 'dc.date',
+    'date', 'parsely-pub-date', 'weibo:article:create_at'
+)
+TITLE_META_NAMES = ('og:title', 'twitter:title')
+DATE_PATTERN = re.compile(
+    r'(?P<year>(?:19|20)\d{2})\s*[-/.年]\s*(?P<month>\d{1,2})\s*[-/.月]\s*(?P<day>\d{1,2})\s*日?'
+    r'(?:[T\s]+(?P<hour>\d{1,2})\s*[:时]\s*(?P<minute>\d{2})(?:\s*[:分]\s*(?P<second>\d{2}))?)?'
+)
+# 正文块至少需要的段落分，低于此值时退回到整个body
+MIN_CANDIDATE_SCORE = 5
+
+class ExtractedArticle:
+    """
+    从详情页提取出的标题、正文和发布时间
+    """
+
+    def __init__(self, title: str, content: str, published_at: Optional[datetime]):
+        self.title = title
+        self.content = content
+        self.published_at = published_at
+
+class _Block:
+    """
+    遍历时为每个元素记录的统计信息
+    """
+
+    __slots__ = ('tag', 'parent', 'weight', 'text_chars', 'link_chars', 'commas', 'tags', 'score',
+                 'has_blocks', 'first_chunk', 'last_chunk')
+
+    def __init__(self, tag: str, parent: int, weight: int, first_chunk: int):
+        self.tag = tag
+        self.parent = parent
+        self.weight = weight
+        self.text_chars = 0
+        self.link_chars = 0
+        self.commas = 0
+        self.tags = 1
+        self.score = 0.0
+        # 是否包含块级子元素，只有不含块级子元素的div/section才当作段落
+        self.has_blocks = False
+        self.first_chunk = first_chunk
+        self.last_chunk = first_chunk
+
+    @property
+    def link_density(self) -> float:
+        return self.link_chars / self.text_chars if self.text_chars else 0.0
+
+    @property
+    def text_density(self) -> float:
+        # 每个标签平均承载的非链接文字数，导航、按钮条等碎片块很低
+        return (self.text_chars - self.link_chars) / self.tags
+
+def _attr(attrs: Dict[str, Any], name: str) -> str:
+    value = attrs.get(name)
+    if value is None:
+        return ''
+    # BeautifulSoup把class等多值属性解析成列表
+    return ' '.join(value) if isinstance(value, list) else value
+
+def _class_weight(attrs: Dict[str, Any]) -> int:
+    weight = 0
+    for name in ('class', 'id'):
+        value = _attr(attrs, name)
+        if not value:
+            continue
+        if NEGATIVE_PATTERN.search(value):
+            weight -= 25
+        if POSITIVE_PATTERN.search(value):
+            weight += 25
+    return weight
+
+def parse_date(text: Optional[str]) -> Optional[datetime]:
+    """
+    解析常见的日期写法：ISO 8601、2024-01-02 03:04、2024/1/2、2024年1月2日 等，
+    带时区的时间转换成UTC；无法识别时返回None
+    """
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        match = DATE_PATTERN.search(text)
+        if not match:
+            return None
+        parts = {key: int(value) for key, value in match.groupdict().items() if value}
+        try:
+            return datetime(parts['year'], parts['month'], parts['day'], parts.get('hour', 0),
+                            parts.get('minute', 0), parts.get('second', 0))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def clean_title(title: str, heading: Optional[str] = None) -> str:
+    """
+    去掉<title>里的网站名后缀；页面上的h1与<title>一致时优先用h1
+    """
+    title = WHITESPACE_PATTERN.sub(' ', title).strip()
+    if heading and heading in title:
+        return heading
+    parts = [part.strip() for part in TITLE_SEPARATOR_PATTERN.split(title) if part.strip()]
+    if len(parts) > 1:
+        # 取最长的一段，通常是文章标题本身
+        longest = max(parts, key=len)
+        if len(longest) >= 4:
+            return longest
+    return title
+
+def _normalize(chunks: List[str]) -> str:
+    text = WHITESPACE_PATTERN.sub(' ', ''.join(chunks))
+    return NEWLINES_PATTERN.sub('\n', text).strip()
+
+def extract_article(page: ParsedPage, limit: Optional[int] = None) -> ExtractedArticle:
+    """
+    Readability风格的正文提取，只遍历一次解析树：
+    遍历时为每个元素累计文字数、链接文字数、逗号数和标签数，段落结束时按长度和逗号数给父元素和祖父元素加分；
+    遍历结束后按 (段落分 + 标签分 + class/id分) * (1 - 链接密度) 选出正文块，
+    再剔除正文块内部链接密度高、文字密度低或class/id为负面的子块。
+    script/style/nav等标签连同子树在遍历时直接跳过
+    """
+    chunks: List[str] = []
+    # 每个文本片段所属的元素
+    owners: List[int] = []
+    blocks: List[_Block] = [_Block('#root', -1, 0, 0)]
+    stack = [0]
+    link_depth = 0
+    title_text: List[str] = []
+    in_title = False
+    headings: List[str] = []
+    heading_parts: Optional[List[str]] = None
+    heading_end_chunk: Optional[int] = None
+    meta: Dict[str, str] = {}
+    date_candidates: List[str] = []
+    date_element_depth: Optional[int] = None
+    date_element_text: List[str] = []
+
+    for event, value, attrs in page.walk(SKIP_TAGS):
+        if event == TEXT:
+            if in_title:
+                title_text.append(value)
+                continue
+            if heading_parts is not None:
+                heading_parts.append(value)
+            if date_element_depth is not None:
+                date_element_text.append(value)
+            stripped_chars = len(value.strip())
+            current = stack[-1]
+            chunks.append(value)
+            owners.append(current)
+            if stripped_chars:
+                commas = len(COMMA_PATTERN.findall(value))
+                for index in stack:
+                    block = blocks[index]
+                    block.text_chars += stripped_chars
+                    block.commas += commas
+                    if link_depth:
+                        block.link_chars += stripped_chars
+            continue
+
+        tag = value
+        if event == START:
+            if tag == 'title':
+                in_title = not title_text
+                continue
+            if tag == 'meta':
+                key = (_attr(attrs, 'property') or _attr(attrs, 'name') or _attr(attrs, 'itemprop')).lower()
+                content = _attr(attrs, 'content')
+                if key and content and key not in meta:
+                    meta[key] = content
+                continue
+            if tag == 'head':
+                continue
+            if tag in BLOCK_TAGS:
+                chunks.append('\n')
+                owners.append(stack[-1])
+                if tag not in ('br', 'hr'):
+                    blocks[stack[-1]].has_blocks = True
+            index = len(blocks)
+            blocks.append(_Block(tag, stack[-1], _class_weight(attrs), len(chunks)))
+            for parent in stack:
+                blocks[parent].tags += 1
+            stack.append(index)
+            if tag == 'a':
+                link_depth += 1
+            elif tag in ('h1', 'h2') and heading_parts is None and len(headings) < 5:
+                heading_parts = []
+            if tag == 'time' and _attr(attrs, 'datetime'):
+                date_candidates.append(_attr(attrs, 'datetime'))
+            elif _attr(attrs, 'itemprop').lower() == 'datepublished':
+                date_candidates.append(_attr(attrs, 'content') or _attr(attrs, 'datetime'))
+            if (date_element_depth is None and not date_element_text and tag in ('time', 'span', 'div', 'p', 'em', 'small', 'i')
+                    and DATE_CLASS_PATTERN.search(_attr(attrs, 'class'))):
+                date_element_depth = len(stack)
+        else:
+            if tag == 'title':
+                in_title = False
+                continue
+            if tag in ('meta', 'head') or len(stack) == 1:
+                continue
+            index = stack.pop()
+            block = blocks[index]
+            block.last_chunk = len(chunks)
+            if tag in BLOCK_TAGS:
+                chunks.append('\n')
+                owners.append(stack[-1])
+            if tag == 'a':
+                link_depth = max(link_depth - 1, 0)
+            elif tag in ('h1', 'h2') and heading_parts is not None:
+                headings.append((tag, _normalize(heading_parts)))
+                heading_parts = None
+                if heading_end_chunk is None and tag == 'h1':
+                    heading_end_chunk = len(chunks)
+            if date_element_depth is not None and len(stack) < date_element_depth:
+                date_element_depth = None
+            # 段落结束：按文字数和逗号数给父元素加分，祖父元素加一半
+            is_paragraph = tag in PARAGRAPH_TAGS or (tag in CONTAINER_TAGS and not block.has_blocks)
+            if is_paragraph and block.text_chars - block.link_chars >= 25:
+                score = 1 + block.commas + min((block.text_chars - block.link_chars) / 100, 3)
+                if block.parent > 0:
+                    blocks[block.parent].score += score
+                    grandparent = blocks[block.parent].parent
+                    if grandparent > 0:
+                        blocks[grandparent].score += score / 2
+
+    best = _best_block(blocks)
+    if best is None:
+        content = _normalize(chunks)
+    else:
+        content = _assemble(blocks, best, chunks, owners)
+    if limit is not None:
+        content = content[:limit].strip()
+
+    return ExtractedArticle(
+        title=_pick_title(meta, ''.join(title_text), headings),
+        content=content,
+        published_at=_pick_date(meta, date_candidates, ''.join(date_element_text), chunks, heading_end_chunk)
+    )
+
+def _best_block(blocks: List[_Block]) -> Optional[int]:
+    best, best_score = None, MIN_CANDIDATE_SCORE
+    for index, block in enumerate(blocks):
+        if block.score <= 0:
+            continue
+        final = (block.score + TAG_WEIGHTS.get(block.tag, 0) + block.weight) * (1 - block.link_density)
+        if final > best_score:
+            best, best_score = index, final
+    return best
+
+def _is_pruned(block: _Block) -> bool:
+    if block.tag in PRUNE_TAGS or block.weight < 0:
+        return True
+    if block.text_chars == 0:
+        return False
+    # 链接为主的块（相关阅读、标签云）和文字稀疏的碎片块（分享按钮、面包屑）
+    if block.link_density > 0.5 and block.text_chars - block.link_chars < 200:
+        return True
+    return block.tag not in ('p', 'pre', 'blockquote') and block.text_chars < 50 and block.text_density < 5
+
+def _assemble(blocks: List[_Block], best: int, chunks: List[str], owners: List[int]) -> str:
+    """
+    拼接正文块内的文本，跳过被剔除的子块
+    """
+    # 每个元素是否位于被剔除的子块中（正文块本身不剔除）
+    pruned: Dict[int, bool] = {best: False}
+
+    def inside_pruned(index: int) -> bool:
+        path = []
+        while index not in pruned:
+            path.append(index)
+            index = blocks[index].parent
+        result = pruned[index]
+        for node in reversed(path):
+            result = result or _is_pruned(blocks[node])
+            pruned[node] = result
+        return result
+
+    block = blocks[best]
+    selected = [
+        chunks[i] for i in range(block.first_chunk, block.last_chunk)
+        if chunks[i] == '\n' or not inside_pruned(owners[i])
+    ]
+    return _normalize(selected)
+
+def _pick_title(meta: Dict[str, str], title: str, headings: List) -> str:
+    h1 = next((text for tag, text in headings if tag == 'h1' and text), None)
+    for name in TITLE_META_NAMES:
+        if meta.get(name):
+            return clean_title(meta[name], h1)
+    if title.strip():
+        return clean_title(title, h1)
+    if h1:
+        return h1
+    return next((text for _, text in headings if text), '')
+
+def _pick_date(meta: Dict[str, str], candidates: List[str], element_text: str, chunks: List[str],
+               heading_end_chunk: Optional[int]) -> Optional[datetime]:
+    values = [meta[name] for name in DATE_META_NAMES if meta.get(name)] + candidates + [element_text]
+    for value in values:
+        published_at = parse_date(value)
+        if published_at is not None:
+            return published_at
+    # 最后在标题之后的一小段文字里找日期，通常是 "来源：xx 2024-01-02 10:00" 这样的信息行
+    if heading_end_chunk is not None:
+        return parse_date(''.join(chunks[heading_end_chunk:heading_end_chunk + 40])[:300])
+    return None
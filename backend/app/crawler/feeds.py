@@ -0,0 +1,156 @@
+import html
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterator, List, Optional
+from urllib.parse import urljoin
+
+from app.crawler.extractor import parse_date
+from app.crawler.parser import START, ParsedPage
+
+FEED_CONTENT_TYPES = ('application/rss+xml', 'application/atom+xml', 'application/rdf+xml', 'application/xml', 'text/xml')
+# 不在<link rel="alternate">里声明feed的网站，依次尝试这些常见地址
+SITEMAP_PATHS = ('/sitemap.xml',)
+# 条目元素：RSS的item、Atom的entry、sitemap的url、sitemap索引的sitemap
+ENTRY_TAGS = frozenset(['item', 'entry', 'url', 'sitemap'])
+TAG_PATTERN = re.compile(r'<[^>]+>')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+# 每次交给解析器的字节数
+PARSE_CHUNK = 64 * 1024
+
+class FeedItem:
+    """
+    feed或sitemap中的一个条目；sitemap索引中的子sitemap以is_sitemap=True返回
+    """
+
+    def __init__(self, url: str, title: str = '', description: str = '', published_at: Optional[datetime] = None,
+                 is_sitemap: bool = False):
+        self.url = url
+        self.title = title
+        self.description = description
+        self.published_at = published_at
+        self.is_sitemap = is_sitemap
+
+    @property
+    def text(self) -> str:
+        """用于匹配关键词的文本"""
+        return f"{self.title}\n{self.description}"
+
+def _local(tag: str) -> str:
+    # 去掉命名空间，如 {http://www.w3.org/2005/Atom}entry -> entry
+    return tag.rpartition('}')[2]
+
+def _text(value: Optional[str]) -> str:
+    """
+    条目中的文本可能是转义后的HTML，去掉标签并合并空白
+    """
+    if not value:
+        return ''
+    return WHITESPACE_PATTERN.sub(' ', html.unescape(TAG_PATTERN.sub(' ', value))).strip()
+
+def _date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        # RSS的pubDate是RFC 822格式，如 "Tue, 02 Jan 2024 03:04:05 +0800"
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return parse_date(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _entry_item(element: ET.Element, base_url: str) -> Optional[FeedItem]:
+    tag = _local(element.tag)
+    fields = {}
+    link = None
+    for child in element.iter():
+        if child is element:
+            continue
+        name = _local(child.tag)
+        if name == 'link':
+            # Atom的链接在href属性里，只取rel为alternate或未指定rel的链接
+            href = child.get('href')
+            if href is not None:
+                if link is None and child.get('rel', 'alternate') == 'alternate':
+                    link = href
+            elif child.text and link is None:
+                link = child.text.strip()
+        elif name not in fields and (child.text or '').strip():
+            fields[name] = child.text
+
+    if tag in ('url', 'sitemap'):
+        loc = (fields.get('loc') or '').strip()
+        if not loc:
+            return None
+        # 新闻sitemap在news:news中给出标题和发布时间
+        return FeedItem(
+            urljoin(base_url, loc),
+            title=_text(fields.get('title')),
+            published_at=_date(fields.get('publication_date') or fields.get('lastmod')),
+            is_sitemap=tag == 'sitemap'
+        )
+
+    link = link or (fields.get('guid') or '').strip() or None
+    if not link:
+        return None
+    return FeedItem(
+        urljoin(base_url, link),
+        title=_text(fields.get('title')),
+        description=_text(fields.get('description') or fields.get('summary') or fields.get('encoded') or fields.get('content')),
+        published_at=_date(fields.get('pubDate') or fields.get('published') or fields.get('date') or fields.get('updated'))
+    )
+
+def iter_feed_items(content: bytes, base_url: str) -> Iterator[FeedItem]:
+    """
+    流式解析RSS 2.0、RSS 1.0(RDF)、Atom、sitemap和sitemap索引，逐个返回条目；
+    每个条目处理完后立即清空对应的元素，内存占用与条目数无关。
+    响应体被截断或XML有错误时，返回出错位置之前的条目
+    """
+    parser = ET.XMLPullParser(events=('end',))
+    try:
+        for start in range(0, len(content), PARSE_CHUNK):
+            parser.feed(content[start:start + PARSE_CHUNK])
+            yield from _drain(parser, base_url)
+        parser.close()
+        yield from _drain(parser, base_url)
+    except ET.ParseError as e:
+        print(f"Error parsing feed {base_url}: {str(e)}")
+
+def _drain(parser: ET.XMLPullParser, base_url: str) -> Iterator[FeedItem]:
+    for _, element in parser.read_events():
+        if _local(element.tag) in ENTRY_TAGS:
+            item = _entry_item(element, base_url)
+            element.clear()
+            if item is not None:
+                yield item
+
+def is_feed_content(content_type: Optional[str], content: bytes) -> bool:
+    """
+    根据Content-Type或文档开头判断响应是否为XML feed/sitemap
+    """
+    if content_type and content_type.split(';')[0].strip().lower() in FEED_CONTENT_TYPES:
+        return True
+    head = content[:512].lstrip().lower()
+    return head.startswith(b'<?xml') or head.startswith(b'<rss') or head.startswith(b'<feed') or head.startswith(b'<urlset')
+
+def discover_feed_links(page: ParsedPage, base_url: str) -> List[str]:
+    """
+    从页面<head>中的<link rel="alternate" type="application/rss+xml|atom+xml">找到feed地址，
+    遍历到<body>就停止
+    """
+    links = []
+    for event, tag, attrs in page.walk():
+        if event != START:
+            continue
+        if tag == 'body':
+            break
+        if tag != 'link':
+            continue
+        rel = attrs.get('rel') or ''
+        rel = ' '.join(rel) if isinstance(rel, list) else rel
+        if 'alternate' in rel.lower().split() and (attrs.get('type') or '').lower() in FEED_CONTENT_TYPES and attrs.get('href'):
+            links.append(urljoin(base_url, attrs['href']))
+    return links
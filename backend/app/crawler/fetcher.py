@@ -0,0 +1,166 @@
+import asyncio
+from typing import Dict, Optional
+
+import aiohttp
+
+from app.crawler.http_cache import HttpCache
+from app.crawler.politeness import FairSlots, PolitenessPolicy, host_of
+from app.utils.metrics import BYTES_DOWNLOADED, FETCH_ERRORS, FETCH_SECONDS, PAGES_FETCHED
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+class UnsupportedContentType(Exception):
+    """
+    响应不是HTML，在读取响应体之前就被拒绝
+    """
+
+class FetchResult:
+    """
+    一次HTTP抓取的结果
+    """
+
+    def __init__(self, url: str, status: int, content: bytes, headers: Dict[str, str], not_modified: bool = False,
+                 truncated: bool = False):
+        self.url = url
+        self.status = status
+        self.content = content
+        self.headers = headers
+        # 服务器返回304，content来自本地缓存
+        self.not_modified = not_modified
+        # 响应体超过字节上限，只读取了前面一部分
+        self.truncated = truncated
+
+class AsyncFetcher:
+    """
+    基于aiohttp的异步抓取器
+    同时限制全局并发数和单个主机的并发数，一个慢站点只会占用它自己的名额；
+    全局名额在主机之间轮转分配，配置了礼貌策略时按主机限速并遵守robots.txt
+    """
+
+    def __init__(self, max_concurrency: int = 20, per_host_concurrency: int = 2,
+                 timeout: float = 10, headers: Optional[Dict[str, str]] = None,
+                 cache: Optional[HttpCache] = None, politeness: Optional[PolitenessPolicy] = None):
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.timeout = timeout
+        self.headers = headers or DEFAULT_HEADERS
+        self.cache = cache
+        self.politeness = politeness
+        self._slots = FairSlots(max_concurrency)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        # 本抓取器的流量统计
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+        self.rejected = 0
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host_concurrency)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = host_of(url)
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_concurrency)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def fetch(self, url: str, max_bytes: Optional[int] = None, html_only: bool = False) -> FetchResult:
+        """
+        抓取指定URL，非2xx状态码或网络错误时抛出异常
+        配置了缓存时发送条件请求，304直接返回缓存的响应体
+        max_bytes限制读取的响应体大小，html_only时非HTML响应在读取响应体前抛出UnsupportedContentType
+        """
+        if self._session is None:
+            await self.open()
+
+        if self.politeness:
+            await self.politeness.check_robots(self._session, url)
+
+        cached = await asyncio.to_thread(self.cache.get, url) if self.cache else None
+        request_headers = cached.conditional_headers() if cached else None
+
+        # 先占主机名额、等待限速令牌，再占全局名额，避免排队中的慢主机请求占满全局并发
+        async with self._host_semaphore(url):
+            if self.politeness:
+                await self.politeness.wait_turn(url)
+            async with self._slots.slot(host_of(url)):
+                try:
+                    with FETCH_SECONDS.time():
+                        async with self._session.get(url, headers=request_headers) as response:
+                            if response.status == 304 and cached:
+                                PAGES_FETCHED.inc()
+                                return FetchResult(str(response.url), response.status, cached.content, dict(response.headers), not_modified=True)
+                            response.raise_for_status()
+
+                            if html_only and response.content_type and response.content_type not in HTML_CONTENT_TYPES:
+                                self.rejected += 1
+                                self.bytes_saved += response.content_length or 0
+                                raise UnsupportedContentType(f"{response.content_type} is not HTML")
+
+                            content, truncated = await self._read_body(response, max_bytes)
+                            result = FetchResult(str(response.url), response.status, content, dict(response.headers), truncated=truncated)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    FETCH_ERRORS.labels(host_of(url)).inc()
+                    raise
+                PAGES_FETCHED.inc()
+
+        # 被截断的响应体不完整，不写入缓存
+        if self.cache and response.status == 200 and not truncated:
+            await asyncio.to_thread(
+                self.cache.put, url, response.headers.get('ETag'), response.headers.get('Last-Modified'), content
+            )
+        return result
+
+    async def _read_body(self, response: aiohttp.ClientResponse, max_bytes: Optional[int]):
+        """
+        流式读取响应体，超过max_bytes后停止读取并关闭连接
+        """
+        if not max_bytes:
+            content = await response.read()
+            self.bytes_downloaded += len(content)
+            BYTES_DOWNLOADED.inc(len(content))
+            return content, False
+
+        chunks = []
+        size = 0
+        truncated = False
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            remaining = max_bytes - size
+            if len(chunk) >= remaining:
+                chunks.append(chunk[:remaining])
+                size += remaining
+                truncated = len(chunk) > remaining or not response.content.at_eof()
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+
+        self.bytes_downloaded += size
+        BYTES_DOWNLOADED.inc(size)
+        if truncated:
+            response.close()
+            if response.content_length:
+                self.bytes_saved += max(response.content_length - size, 0)
+        return b''.join(chunks), truncated
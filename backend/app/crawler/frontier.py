@@ -0,0 +1,203 @@
+import hashlib
+import heapq
+import json
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import ParseResult, urldefrag, urlparse
+
+# 分页链接：链接文字是页码或“下一页”，或URL带页码参数
+PAGINATION_TEXT_PATTERN = re.compile(r'^\s*(\d{1,4}|下一页|下页|后页|更多|next|more|older|»|›|>>?)\s*$', re.IGNORECASE)
+PAGINATION_URL_PATTERN = re.compile(r'[?&](page|p|pn|pageno|start|offset)=\d+|/page/\d+|/(index|list)[_-]\d+\.s?html?\?', re.IGNORECASE)
+
+class BloomFilter:
+    """
+    固定内存的布隆过滤器，内存只由容量和误判率决定
+    元素超过容量后误判率逐渐升高，但不会多占内存；误判时只是少抓一个页面
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.size = max(bits, 64)
+        self.hashes = max(1, round(self.size / max(capacity, 1) * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> List[int]:
+        # 双重哈希：由一次blake2b得到两个64位哈希，组合出k个位置
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> bool:
+        """
+        加入元素，返回加入前是否不存在
+        """
+        added = False
+        for position in self._positions(item):
+            index, mask = position >> 3, 1 << (position & 7)
+            if not self._bits[index] & mask:
+                self._bits[index] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+def normalize_url(url: str) -> str:
+    """
+    去掉#片段，协议和主机名转为小写
+    """
+    return _normalize(urlparse(urldefrag(url)[0])).geturl()
+
+def _normalize(parsed: ParseResult) -> ParseResult:
+    return parsed._replace(scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower())
+
+def _site_host(hostname: Optional[str]) -> str:
+    host = (hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+def is_pagination(parsed: ParseResult, text: str) -> bool:
+    return bool(PAGINATION_TEXT_PATTERN.match(text or '') or PAGINATION_URL_PATTERN.search(parsed.path + '?' + parsed.query))
+
+def link_priority(parsed: ParseResult, depth: int, pagination: bool) -> int:
+    """
+    链接的抓取优先级，数值越小越先抓取：先按深度，同一深度内分页链接优先，路径越短越优先
+    """
+    path_depth = parsed.path.count('/') - parsed.path.endswith('/')
+    priority = depth * 100 + min(path_depth, 9) * 10
+    if pagination:
+        priority -= 50
+    return priority
+
+class PageLinks:
+    """
+    列表页上的链接：需要跟随的链接 -> 链接文字，以及命中关键词的详情页链接
+    与页面的已处理标记一起保存在HTTP缓存中，页面返回304时不用重新解析就能扩展队列
+    """
+
+    def __init__(self, links: Dict[str, str], details: List[str]):
+        self.links = links
+        self.details = details
+
+    def to_json(self) -> str:
+        return json.dumps({'links': list(self.links.items()), 'details': self.details}, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, value: str) -> "PageLinks":
+        data = json.loads(value)
+        return cls(dict(data['links']), data['details'])
+
+class CrawlFrontier:
+    """
+    单个网站的待抓取列表页队列
+    从网站首页出发，按优先级依次抓取同域名下的分页、栏目等页面，深度不超过max_depth，
+    总页数（含首页）不超过max_pages。分页链接与所在页面同一深度，但max_depth为0时只抓取首页，分页也不跟随。已入队的URL记录在布隆过滤器中，待抓取队列只保留剩余页数以内
+    优先级最高的链接（最多max_queue个），网站有上万个链接时内存也是固定的
+    """
+
+    def __init__(self, start_url: str, max_depth: int, max_pages: int, link_pattern: Optional[str] = None,
+                 exclude_pattern: Optional[str] = None, same_domain: bool = True, capacity: int = 100000,
+                 max_queue: int = 10000):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_queue = max_queue
+        self.same_domain = same_domain
+        self.host = _site_host(urlparse(start_url).hostname)
+        self.link_pattern = re.compile(link_pattern) if link_pattern else None
+        self.exclude_pattern = re.compile(exclude_pattern, re.IGNORECASE) if exclude_pattern else None
+        self._visited = BloomFilter(capacity)
+        self._heap: List[Tuple[int, int, int, str]] = []
+        self._seq = 0
+        # 队列已满时最后一个保留链接的优先级，不比它优先的链接直接丢弃
+        self._cutoff: Optional[int] = None
+        # 首页已由调用方抓取
+        self.pages = 1
+        self.dropped = 0
+        self.add_visited(start_url)
+
+    def in_scope(self, parsed: ParseResult) -> bool:
+        if parsed.scheme not in ('http', 'https'):
+            return False
+        if self.same_domain:
+            host = _site_host(parsed.hostname)
+            if host != self.host and not host.endswith('.' + self.host):
+                return False
+        url = parsed.geturl()
+        if self.exclude_pattern and self.exclude_pattern.search(url):
+            return False
+        if self.link_pattern and not self.link_pattern.search(url):
+            return False
+        return True
+
+    def add_visited(self, url: str) -> bool:
+        """
+        记为已访问（如首页、重定向后的地址、关键词命中的详情页），返回之前是否未访问过
+        """
+        return self._visited.add(normalize_url(url))
+
+    def push(self, url: str, parent_depth: int, text: str = '') -> bool:
+        """
+        把深度为parent_depth的页面上的链接加入队列，超出深度、不在范围内或已入队过的链接被忽略
+        分页链接与所在页面同一深度，其他链接深度加一
+        """
+        remaining = self.max_pages - self.pages
+        if remaining <= 0 or self.max_depth <= 0:
+            return False
+        parsed = _normalize(urlparse(urldefrag(url)[0]))
+        pagination = is_pagination(parsed, text)
+        depth = parent_depth if pagination else parent_depth + 1
+        if depth > self.max_depth or not self.in_scope(parsed):
+            return False
+        priority = link_priority(parsed, depth, pagination)
+        # 队列中已有足够多更优先的链接，这个链接不可能被抓取
+        if self._cutoff is not None and priority >= self._cutoff:
+            self.dropped += 1
+            return False
+        url = parsed.geturl()
+        if not self._visited.add(url):
+            return False
+        if len(self._heap) >= min(remaining * 2, self.max_queue):
+            self._compact(remaining)
+        self._seq += 1
+        heapq.heappush(self._heap, (priority, self._seq, depth, url))
+        return True
+
+    def _compact(self, remaining: int):
+        # 最多还能抓取remaining个页面，只保留优先级最高的这些链接，丢弃的链接本来也不会被抓取
+        keep = heapq.nsmallest(min(remaining, self.max_queue // 2), self._heap)
+        self.dropped += len(self._heap) - len(keep)
+        # 有序列表本身就是合法的堆
+        self._heap = keep
+        if keep and len(keep) == remaining:
+            self._cutoff = keep[-1][0]
+
+    def push_page(self, page_links: PageLinks, depth: int):
+        """
+        把深度为depth的列表页上的链接加入队列；命中关键词的链接是详情页，只记为已访问
+        """
+        for url in page_links.details:
+            self.add_visited(url)
+        for url, text in page_links.links.items():
+            self.push(url, depth, text)
+
+    def pop_many(self, count: int) -> List[Tuple[str, int]]:
+        """
+        取出最多count个优先级最高的 (URL, 深度)，达到max_pages后不再返回
+        """
+        batch = []
+        while self._heap and len(batch) < count and self.pages < self.max_pages:
+            _, _, depth, url = heapq.heappop(self._heap)
+            batch.append((url, depth))
+            self.pages += 1
+        return batch
+
+    def __len__(self) -> int:
+        return len(self._heap)
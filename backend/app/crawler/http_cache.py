@@ -0,0 +1,178 @@
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+class CacheEntry:
+    """
+    缓存的响应：校验器和解压后的响应体
+    """
+
+    def __init__(self, url: str, etag: Optional[str], last_modified: Optional[str], content: bytes):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content = content
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """
+        生成条件请求头
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+class HttpCache:
+    """
+    基于SQLite的HTTP条件请求缓存
+    保存ETag/Last-Modified和zlib压缩后的响应体，按最近访问时间做LRU淘汰，总大小不超过max_bytes
+    """
+
+    def __init__(self, path: str = "http_cache.db", max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_http_cache_last_access ON http_cache (last_access)")
+        # 记录某个响应体已被哪些处理范围（如 任务+关键词集合）处理过，响应体更新时清空；
+        # links是处理时页面上的链接（zlib压缩），页面返回304时据此扩展抓取队列而不用重新解析
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache_processed (
+                url TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                links BLOB,
+                PRIMARY KEY (url, scope)
+            )
+        """)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(http_cache_processed)")]
+        if 'links' not in columns:
+            self._conn.execute("ALTER TABLE http_cache_processed ADD COLUMN links BLOB")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, body FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE http_cache SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        etag, last_modified, body = row
+        return CacheEntry(url, etag, last_modified, zlib.decompress(body))
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], content: bytes):
+        """
+        保存响应，没有校验器的响应无法做条件请求，不缓存
+        """
+        if not etag and not last_modified:
+            return
+        body = zlib.compress(content)
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM http_cache WHERE url = ?", (url,)).fetchone()
+            if row is not None:
+                self._total_bytes -= row[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache (url, etag, last_modified, body, size, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, len(body), time.time())
+            )
+            self._conn.execute("DELETE FROM http_cache_processed WHERE url = ?", (url,))
+            self._total_bytes += len(body)
+            self._evict()
+            self._conn.commit()
+
+    def is_processed(self, url: str, scope: str) -> bool:
+        """
+        当前缓存的响应体是否已在指定范围内处理过
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM http_cache_processed WHERE url = ? AND scope = ?", (url, scope)
+            ).fetchone()
+        return row is not None
+
+    def processed_links(self, url: str, scope: str) -> Tuple[bool, Optional[str]]:
+        """
+        返回 (是否已在指定范围内处理过, 处理时记录的链接)；没有记录链接时为None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT links FROM http_cache_processed WHERE url = ? AND scope = ?", (url, scope)
+            ).fetchone()
+        if row is None:
+            return False, None
+        return True, zlib.decompress(row[0]).decode('utf-8') if row[0] is not None else None
+
+    def mark_processed(self, url: str, scope: str, links: Optional[str] = None):
+        """
+        记为已处理；给出links时一并保存，覆盖之前没有记录链接的标记
+        """
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM http_cache WHERE url = ?", (url,)).fetchone() is None:
+                return
+            if links is None:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO http_cache_processed (url, scope) VALUES (?, ?)", (url, scope)
+                )
+            else:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO http_cache_processed (url, scope, links) VALUES (?, ?, ?)",
+                    (url, scope, zlib.compress(links.encode('utf-8')))
+                )
+            self._conn.commit()
+
+    def _evict(self):
+        # 按最近访问时间从旧到新淘汰，直到总大小回到上限以内
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT url, size FROM http_cache ORDER BY last_access LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for url, size in rows:
+                self._conn.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+                self._conn.execute("DELETE FROM http_cache_processed WHERE url = ?", (url,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_http_cache: Optional[HttpCache] = None
+_http_cache_lock = threading.Lock()
+
+def get_http_cache(path: str, max_bytes: int) -> HttpCache:
+    """
+    获取进程内共享的HTTP缓存实例
+    """
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HttpCache(path, max_bytes)
+        return _http_cache
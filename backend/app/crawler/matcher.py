@@ -0,0 +1,117 @@
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+from app.models import Keyword
+
+class KeywordMatcher:
+    """
+    基于Aho-Corasick自动机的多关键词匹配器
+    关键词按字面量匹配（不再作为正则表达式），一次线性扫描即可找出文本中出现的所有关键词；
+    匹配前统一做casefold，英文不区分大小写，中文等字符不受影响
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[int, str]]):
+        # 每个状态的转移表、失败指针和输出（命中的关键词ID）
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        self.keyword_ids: Set[int] = set()
+        self.signature = ''
+
+        keywords_list = list(keywords)
+        outputs: List[Set[int]] = [set()]
+        for keyword_id, text in keywords_list:
+            pattern = (text or '').strip().casefold()
+            if not pattern:
+                continue
+            self.keyword_ids.add(keyword_id)
+            state = 0
+            for ch in pattern:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(keyword_id)
+
+        # 广度优先构建失败指针，并把失败链上的输出合并到当前状态
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail_target = self._goto[fail].get(ch, 0)
+                self._fail[next_state] = fail_target if fail_target != next_state else 0
+                outputs[next_state] |= outputs[self._fail[next_state]]
+
+        self._output = [tuple(sorted(ids)) for ids in outputs]
+        # 关键词集合的指纹，关键词变化时随之变化
+        digest = hashlib.sha1()
+        for keyword_id, text in sorted(keywords_list):
+            digest.update(f"{keyword_id}\x00{text}\x00".encode('utf-8'))
+        self.signature = digest.hexdigest()
+
+    def find(self, text: str) -> Set[int]:
+        """
+        返回文本中出现的关键词ID集合
+        """
+        found: Set[int] = set()
+        if not self.keyword_ids or not text:
+            return found
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        total = len(self.keyword_ids)
+        state = 0
+        for ch in text.casefold():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+                # 所有关键词都已命中，无需继续扫描
+                if len(found) == total:
+                    break
+        return found
+
+class MatcherCache:
+    """
+    关键词匹配器缓存，以关键词集合为键，关键词未变化时复用已构建的自动机
+    """
+
+    def __init__(self, max_size: int = 64):
+        self.max_size = max_size
+        self._matchers: "OrderedDict[Tuple[Tuple[int, str], ...], KeywordMatcher]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, keywords: List[Keyword]) -> KeywordMatcher:
+        signature = tuple(sorted((keyword.id, keyword.keyword) for keyword in keywords))
+        with self._lock:
+            matcher = self._matchers.get(signature)
+            if matcher is not None:
+                self._matchers.move_to_end(signature)
+                return matcher
+
+        matcher = KeywordMatcher(signature)
+        with self._lock:
+            self._matchers[signature] = matcher
+            self._matchers.move_to_end(signature)
+            while len(self._matchers) > self.max_size:
+                self._matchers.popitem(last=False)
+        return matcher
+
+    def clear(self):
+        with self._lock:
+            self._matchers.clear()
+
+# 全局实例
+matcher_cache = MatcherCache()
@@ -0,0 +1,251 @@
+import re
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, UnicodeDammit
+from bs4.element import PreformattedString, Tag
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    # selectolax 1.0起推荐使用lexbor引擎，旧版本回退到modest引擎
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+        HAS_SELECTOLAX = True
+    except ImportError:
+        HAS_SELECTOLAX = False
+
+DATE_CLASS_PATTERN = re.compile(r'date|time|published', re.IGNORECASE)
+
+# walk()产生的事件类型
+START, TEXT, END = 0, 1, 2
+# (事件类型, 标签名或文本, 属性)，属性只在START事件中给出
+WalkEvent = Tuple[int, str, Optional[Dict[str, Any]]]
+
+# 自动选择时的优先顺序，html.parser为纯Python实现，总是可用
+BACKEND_PRIORITY = ['selectolax', 'lxml', 'html.parser']
+
+class ParsedPage:
+    """
+    解析后的页面，屏蔽不同解析后端的API差异
+    """
+
+    backend = ''
+
+    def text_links(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        按文档顺序返回 (文本节点, 所在链接的href)，不在链接内的文本href为None
+        """
+        raise NotImplementedError
+
+    def title(self) -> str:
+        """
+        第一个 h1/h2/h3/title 元素的文本
+        """
+        raise NotImplementedError
+
+    def published_text(self) -> Optional[str]:
+        """
+        第一个class包含 date/time/published 的 time/span 元素的文本
+        """
+        raise NotImplementedError
+
+    def body_text(self, limit: Optional[int] = None) -> str:
+        """
+        body内的文本，指定limit时收集到足够字符后立即停止遍历
+        """
+        raise NotImplementedError
+
+    def walk(self, skip: FrozenSet[str] = frozenset()) -> Iterator[WalkEvent]:
+        """
+        按文档顺序遍历整棵树，产生 START/TEXT/END 事件；skip中的标签连同整个子树直接跳过，
+        不会进入也不会产生任何事件。注释、doctype等非文本节点不产生事件
+        """
+        raise NotImplementedError
+
+class SoupPage(ParsedPage):
+    """
+    BeautifulSoup后端，features可以是 html.parser 或 lxml
+    """
+
+    def __init__(self, content: bytes, features: str = 'html.parser'):
+        self.backend = features
+        self.soup = BeautifulSoup(content, features)
+
+    def text_links(self) -> Iterator[Tuple[str, Optional[str]]]:
+        for element in self.soup.find_all(string=True):
+            parent_link = element.find_parent('a', href=True)
+            yield element, parent_link['href'] if parent_link else None
+
+    def title(self) -> str:
+        title_elem = self.soup.find(['h1', 'h2', 'h3', 'title'])
+        return title_elem.get_text().strip() if title_elem else ''
+
+    def published_text(self) -> Optional[str]:
+        date_elem = self.soup.find(['time', 'span'], class_=DATE_CLASS_PATTERN)
+        return date_elem.get_text().strip() if date_elem else None
+
+    def body_text(self, limit: Optional[int] = None) -> str:
+        content_elem = self.soup.find('body')
+        if content_elem is None:
+            return ''
+        if limit is None:
+            return content_elem.get_text().strip()
+        return collect_text(content_elem.strings, limit)
+
+    def walk(self, skip: FrozenSet[str] = frozenset()) -> Iterator[WalkEvent]:
+        stack = [iter(self.soup.contents)]
+        open_tags = []
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                if open_tags:
+                    yield END, open_tags.pop(), None
+            elif isinstance(node, Tag):
+                if node.name in skip:
+                    continue
+                yield START, node.name, node.attrs
+                stack.append(iter(node.contents))
+                open_tags.append(node.name)
+            elif not isinstance(node, PreformattedString):
+                # 注释、CDATA、doctype等都是PreformattedString的子类
+                yield TEXT, node, None
+
+class SelectolaxPage(ParsedPage):
+    """
+    selectolax后端（基于C实现的HTML解析器）
+    """
+
+    backend = 'selectolax'
+
+    def __init__(self, content: bytes):
+        self.tree = HTMLParser(decode_html(content))
+
+    def text_links(self) -> Iterator[Tuple[str, Optional[str]]]:
+        root = self.tree.root
+        if root is None:
+            return
+        for node in root.traverse(include_text=True):
+            if node.tag != '-text':
+                continue
+            text = node.text_content
+            if not text:
+                continue
+            href = None
+            parent = node.parent
+            while parent is not None:
+                if parent.tag == 'a' and parent.attributes.get('href'):
+                    href = parent.attributes['href']
+                    break
+                parent = parent.parent
+            yield text, href
+
+    def title(self) -> str:
+        title_elem = self.tree.css_first('h1, h2, h3, title')
+        return title_elem.text().strip() if title_elem else ''
+
+    def published_text(self) -> Optional[str]:
+        for node in self.tree.css('time, span'):
+            if DATE_CLASS_PATTERN.search(node.attributes.get('class') or ''):
+                return node.text().strip()
+        return None
+
+    def body_text(self, limit: Optional[int] = None) -> str:
+        body = self.tree.body
+        if body is None:
+            return ''
+        if limit is None:
+            return body.text(separator='').strip()
+        return collect_text(
+            (node.text_content or '' for node in body.traverse(include_text=True) if node.tag == '-text'),
+            limit
+        )
+
+    def walk(self, skip: FrozenSet[str] = frozenset()) -> Iterator[WalkEvent]:
+        node = self.tree.root
+        parents = []
+        while node is not None:
+            tag = node.tag
+            if tag == '-text':
+                text = node.text_content
+                if text:
+                    yield TEXT, text, None
+            elif tag[0] not in '-_!' and tag not in skip:
+                yield START, tag, node.attributes
+                if node.child is not None:
+                    parents.append(node)
+                    node = node.child
+                    continue
+                yield END, tag, None
+            # 没有下一个兄弟节点时逐层回到父节点
+            following = node.next
+            while following is None and parents:
+                node = parents.pop()
+                yield END, node.tag, None
+                following = node.next
+            node = following
+
+def collect_text(strings: Iterable[str], limit: int) -> str:
+    """
+    拼接文本片段，去掉首尾空白，收集满limit个字符后不再继续读取
+    """
+    parts = []
+    size = 0
+    for text in strings:
+        if not parts:
+            text = text.lstrip()
+            if not text:
+                continue
+        parts.append(text)
+        size += len(text)
+        if size >= limit:
+            break
+    return ''.join(parts)[:limit].strip()
+
+def decode_html(content: bytes) -> str:
+    """
+    将响应体解码为文本，非UTF-8页面（如GBK）按meta声明或内容检测编码
+    """
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return UnicodeDammit(content, is_html=True).unicode_markup or content.decode('utf-8', 'replace')
+
+def available_backends() -> List[str]:
+    backends = []
+    if HAS_SELECTOLAX:
+        backends.append('selectolax')
+    if HAS_LXML:
+        backends.append('lxml')
+    backends.append('html.parser')
+    return backends
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """
+    解析后端名称，auto或未安装的后端按优先顺序回退
+    """
+    available = available_backends()
+    if name and name != 'auto':
+        if name in available:
+            return name
+        print(f"Parser backend {name} is not available, falling back")
+    for backend in BACKEND_PRIORITY:
+        if backend in available:
+            return backend
+    return 'html.parser'
+
+def parse_html(content: bytes, backend: Optional[str] = None) -> ParsedPage:
+    """
+    用指定后端解析HTML
+    """
+    backend = resolve_backend(backend)
+    if backend == 'selectolax':
+        return SelectolaxPage(content)
+    return SoupPage(content, backend)
@@ -0,0 +1,88 @@
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, Optional
+
+# 多个任务并发运行时共享tracemalloc，由最后一个结束的任务停止跟踪
+_tracing_users = 0
+_tracing_started_here = False
+_tracing_lock = threading.Lock()
+
+def _start_memory_tracing() -> int:
+    global _tracing_users, _tracing_started_here
+    with _tracing_lock:
+        if _tracing_users == 0:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _tracing_started_here = True
+            tracemalloc.reset_peak()
+        _tracing_users += 1
+        return tracemalloc.get_traced_memory()[0]
+
+def _stop_memory_tracing() -> int:
+    global _tracing_users, _tracing_started_here
+    with _tracing_lock:
+        peak = tracemalloc.get_traced_memory()[1]
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_started_here:
+            tracemalloc.stop()
+            _tracing_started_here = False
+        return peak
+
+class RunStats:
+    """
+    一次任务运行的统计信息
+    峰值内存由tracemalloc统计，只用于排查内存问题：跟踪期间进程内的每次内存分配都会变慢，
+    生产环境默认关闭。tracemalloc是进程级的，多个任务的运行时间重叠时，峰值是这段时间内
+    进程的共享峰值减去本次运行开始时的内存，并不只属于本次运行
+    """
+
+    def __init__(self, task_id: int, trace_memory: bool = False):
+        self.task_id = task_id
+        self.trace_memory = trace_memory
+        self.sites = 0
+        self.sites_failed = 0
+        self.results = 0
+        self.rows_written = 0
+        self.batches = 0
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+        self.pages_rejected = 0
+        self.started_at: Optional[float] = None
+        self.elapsed = 0.0
+        self.peak_memory: Optional[int] = None
+        self._memory_baseline = 0
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        if self.trace_memory:
+            self._memory_baseline = _start_memory_tracing()
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started_at
+        if self.trace_memory:
+            self.peak_memory = max(_stop_memory_tracing() - self._memory_baseline, 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'task_id': self.task_id,
+            'sites': self.sites,
+            'sites_failed': self.sites_failed,
+            'results': self.results,
+            'rows_written': self.rows_written,
+            'batches': self.batches,
+            'bytes_downloaded': self.bytes_downloaded,
+            'bytes_saved': self.bytes_saved,
+            'pages_rejected': self.pages_rejected,
+            'elapsed': round(self.elapsed, 3),
+            'peak_memory': self.peak_memory
+        }
+
+    def report(self):
+        peak = f"{self.peak_memory / 1024 / 1024:.2f}MB" if self.peak_memory is not None else "n/a"
+        print(
+            f"Task {self.task_id} finished in {self.elapsed:.2f}s: "
+            f"{self.sites} sites ({self.sites_failed} failed), {self.results} results, {self.rows_written} rows written "
+            f"in {self.batches} batches, {self.bytes_downloaded} bytes downloaded, "
+            f"{self.bytes_saved} bytes saved, {self.pages_rejected} non-HTML pages rejected, peak memory {peak}"
+        )
@@ -0,0 +1,281 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+class TokenBucket:
+    """
+    令牌桶限速器
+    reserve预约下一个令牌并返回需要等待的秒数，令牌允许透支，排队的请求按预约顺序依次放行
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        with self._lock:
+            self._refill()
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+class RobotsCache:
+    """
+    robots.txt缓存，按主机缓存解析结果，过期后重新抓取；进程内所有任务共享
+    同一主机同时只抓取一次robots.txt，并发的请求等待同一个结果；
+    Future只能在创建它的事件循环中等待，所以按 (事件循环, 主机) 合并
+    """
+
+    def __init__(self, ttl: float = 3600, error_ttl: float = 300):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self._entries: Dict[str, tuple] = {}
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.fetches = 0
+
+    def _get_cached(self, host: str) -> Optional[RobotFileParser]:
+        with self._lock:
+            entry = self._entries.get(host)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def _store(self, host: str, parser: RobotFileParser, ttl: float):
+        with self._lock:
+            self._entries[host] = (parser, time.monotonic() + ttl)
+
+    async def get(self, session: aiohttp.ClientSession, url: str) -> RobotFileParser:
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        loop = asyncio.get_running_loop()
+        while True:
+            parser = self._get_cached(host)
+            if parser is not None:
+                return parser
+            key = (loop, host)
+            with self._lock:
+                pending = self._inflight.get(key)
+                owner = pending is None
+                if owner:
+                    pending = self._inflight[key] = loop.create_future()
+            if not owner:
+                parser = await asyncio.shield(pending)
+                if parser is not None:
+                    return parser
+                # 负责抓取的请求被取消了，重新抓取
+                continue
+            try:
+                parser = await self._fetch(session, parsed, host)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                if not pending.done():
+                    pending.set_result(parser)
+            return parser
+
+    async def _fetch(self, session: aiohttp.ClientSession, parsed, host: str) -> RobotFileParser:
+        self.fetches += 1
+        parser = RobotFileParser()
+        ttl = self.ttl
+        try:
+            async with session.get(f"{parsed.scheme}://{parsed.netloc}/robots.txt") as response:
+                if response.status in (401, 403):
+                    # 按惯例，robots.txt被拒绝访问时视为禁止抓取
+                    parser.disallow_all = True
+                elif response.status >= 400:
+                    parser.allow_all = True
+                else:
+                    text = await response.text(errors='ignore')
+                    parser.parse(text.splitlines())
+        except Exception as e:
+            print(f"Error fetching robots.txt for {host}: {str(e)}")
+            parser.allow_all = True
+            ttl = self.error_ttl
+        parser.modified()
+        self._store(host, parser, ttl)
+        return parser
+
+class FairSlots:
+    """
+    按主机公平分配的全局并发名额
+    没有空闲名额时请求按主机排队，释放的名额在有等待请求的主机之间轮转分配，大站点无法饿死其他站点
+    """
+
+    def __init__(self, capacity: int):
+        self.free = capacity
+        self._waiters: "OrderedDict[str, deque]" = OrderedDict()
+
+    async def acquire(self, host: str):
+        if self.free > 0 and not self._waiters:
+            self.free -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(host, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 名额已经转交过来但请求被取消，归还名额
+                self.release()
+            else:
+                self._remove_waiter(host, future)
+            raise
+
+    def _remove_waiter(self, host: str, future: asyncio.Future):
+        waiters = self._waiters.get(host)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            if not waiters:
+                del self._waiters[host]
+
+    def release(self):
+        while self._waiters:
+            host, waiters = next(iter(self._waiters.items()))
+            future = waiters.popleft()
+            # 该主机移到轮转队尾
+            del self._waiters[host]
+            if waiters:
+                self._waiters[host] = waiters
+            if not future.done():
+                future.set_result(None)
+                return
+        self.free += 1
+
+    def slot(self, host: str) -> "_FairSlot":
+        return _FairSlot(self, host)
+
+class _FairSlot:
+    def __init__(self, slots: FairSlots, host: str):
+        self.slots = slots
+        self.host = host
+
+    async def __aenter__(self):
+        await self.slots.acquire(self.host)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.slots.release()
+
+class RobotsDisallowed(Exception):
+    """
+    robots.txt禁止抓取该URL
+    """
+
+class PolitenessPolicy:
+    """
+    按主机的礼貌抓取策略：令牌桶限速 + robots.txt（含Crawl-delay）
+    速率优先级：网站单独配置 > 按域名配置 > 默认速率；robots.txt的Crawl-delay只会让速率更低
+    """
+
+    def __init__(self, default_rate: float = 1.0, burst: int = 2, host_rates: Optional[Dict[str, float]] = None,
+                 respect_robots: bool = True, robots_ttl: float = 3600, user_agent: str = '*'):
+        self.default_rate = default_rate
+        self.burst = burst
+        self.host_rates = {host.lower(): rate for host, rate in (host_rates or {}).items()}
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self.robots = RobotsCache(robots_ttl)
+        self._site_rates: Dict[str, float] = {}
+        self._crawl_delays: Dict[str, float] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def set_site_rate(self, url: str, rate: Optional[float]):
+        """
+        设置网站单独配置的抓取速率（每秒请求数）
+        """
+        host = host_of(url)
+        with self._lock:
+            if rate and rate > 0:
+                self._site_rates[host] = rate
+            else:
+                self._site_rates.pop(host, None)
+        self._update_bucket(host)
+
+    def rate_for(self, host: str) -> float:
+        rate = self._site_rates.get(host) or self.host_rates.get(host) or self.default_rate
+        crawl_delay = self._crawl_delays.get(host)
+        if crawl_delay:
+            rate = min(rate, 1.0 / crawl_delay)
+        return rate
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate_for(host), self.burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def _update_bucket(self, host: str):
+        with self._lock:
+            bucket = self._buckets.get(host)
+        if bucket is not None:
+            bucket.set_rate(self.rate_for(host))
+
+    async def check_robots(self, session: aiohttp.ClientSession, url: str):
+        """
+        robots.txt禁止时抛出RobotsDisallowed，同时记录Crawl-delay
+        """
+        if not self.respect_robots:
+            return
+        parser = await self.robots.get(session, url)
+        host = host_of(url)
+        crawl_delay = parser.crawl_delay(self.user_agent)
+        if crawl_delay and self._crawl_delays.get(host) != float(crawl_delay):
+            self._crawl_delays[host] = float(crawl_delay)
+            self._update_bucket(host)
+        if not parser.can_fetch(self.user_agent, url):
+            raise RobotsDisallowed(f"{url} is disallowed by robots.txt")
+
+    async def wait_turn(self, url: str):
+        """
+        等待该主机的下一个令牌
+        """
+        delay = self._bucket(host_of(url)).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+_politeness: Optional[PolitenessPolicy] = None
+_politeness_lock = threading.Lock()
+
+def get_politeness(settings) -> PolitenessPolicy:
+    """
+    获取进程内共享的礼貌抓取策略，令牌桶和robots.txt缓存在所有任务之间共享
+    robots.txt按产品标识匹配User-agent分组，而不是完整的浏览器UA（其首个token是Mozilla，会命中针对浏览器的分组）
+    """
+    global _politeness
+    with _politeness_lock:
+        if _politeness is None:
+            _politeness = PolitenessPolicy(
+                default_rate=settings.crawler_default_rate,
+                burst=settings.crawler_rate_burst,
+                host_rates=settings.crawler_host_rates,
+                respect_robots=settings.crawler_respect_robots,
+                robots_ttl=settings.robots_cache_ttl,
+                user_agent=settings.crawler_robots_user_agent
+            )
+        return _politeness
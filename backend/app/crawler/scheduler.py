@@ -1,121 +1,278 @@
 import asyncio
+import heapq
 import threading
 from datetime import datetime, timedelta
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.interval import IntervalTrigger
+from typing import Dict, List, Optional, Set, Tuple
+
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import CrawlTask
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import CrawlTask, TaskSite
 from app.crawler.core import Crawler
+from app.crawler.db_writer import get_db_writer
+from app.crawler.work_queue import InMemoryWorkQueue, WorkItem, WorkQueue, create_work_queue
+from app.crawler.worker import CrawlWorker
+from app.utils.metrics import QUEUE_DEPTH
+from app.utils.response_cache import TASKS, response_cache
 
 class TaskSchedulerService:
-    def __init__(self):
-        self.scheduler = BackgroundScheduler()
-        self.scheduler.start()
+    """
+    基于最小堆的任务调度器
+    堆中按next_run排序，调度线程在自己的事件循环上精确睡眠到最近的截止时间，
+    到期任务交给固定数量的worker协程并发执行；任务通过API变更时调用notify_task_changed重新加载
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or get_settings().scheduler_max_workers
         self.is_running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._heap: List[Tuple[datetime, int]] = []
+        # 每个任务当前有效的下次运行时间，堆中与之不一致的条目视为已失效
+        self._next_runs: Dict[int, datetime] = {}
+        self._running_tasks: Set[int] = set()
+        # 连续失败次数和失败后的最早重试时间，任务成功后清除
+        self._failures: Dict[int, int] = {}
+        self._retry_at: Dict[int, datetime] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._work_queue: Optional[WorkQueue] = None
+        # 进程内队列（memory://）只能由本进程消费，在调度循环上运行一个CrawlWorker
+        self._local_worker: Optional[asyncio.Task] = None
 
     def start_scheduler(self):
-        """启动调度器，定期检查需要运行的任务"""
-        self.scheduler.add_job(
-            func=self._check_and_run_tasks,
-            trigger=IntervalTrigger(seconds=30),  # 每30秒检查一次
-            id='task_checker',
-            name='Check and run crawl tasks',
-            replace_existing=True
-        )
+        """启动调度线程"""
+        if self.is_running:
+            return
         self.is_running = True
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name='task-scheduler', daemon=True)
+        self._thread.start()
         print("Task scheduler started")
 
     def stop_scheduler(self):
         """停止调度器"""
-        self.scheduler.shutdown()
+        if not self.is_running:
+            return
         self.is_running = False
+        self._call_in_loop(self._wake)
+        self._thread.join(timeout=10)
         print("Task scheduler stopped")
 
-    def _check_and_run_tasks(self):
-        """检查并运行需要执行的任务"""
-        print(f"Checking tasks at {datetime.now()}")
-        
-        # 获取数据库会话
-        db_gen = get_db()
-        db = next(db_gen)
-        
+    def notify_task_changed(self, task_id: int):
+        """任务被创建、修改或删除后调用，重新加载该任务的调度计划"""
+        self._call_in_loop(lambda: asyncio.ensure_future(self._reload_task(task_id)))
+
+    def _call_in_loop(self, callback, *args):
+        if self._loop is not None and self.is_running:
+            self._loop.call_soon_threadsafe(callback, *args)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._main())
+        finally:
+            self._loop.close()
+
+    async def _main(self):
+        self._wakeup = asyncio.Event()
+        self._queue = asyncio.Queue()
+        QUEUE_DEPTH.labels('scheduler').set_function(self._queue.qsize)
+        await self._load_all_tasks()
+
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.max_workers)]
+        try:
+            await self._dispatch_loop()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if self._local_worker is not None:
+                self._local_worker.cancel()
+                await asyncio.gather(self._local_worker, return_exceptions=True)
+            if self._work_queue is not None:
+                await self._work_queue.close()
+
+    async def _dispatch_loop(self):
+        """睡眠到最近的截止时间（或被任务变更唤醒），然后派发所有到期任务"""
+        while self.is_running:
+            self._wakeup.clear()
+            delay = self._seconds_until_next_run()
+            if delay is None:
+                await self._wakeup.wait()
+            elif delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            if self.is_running:
+                self._dispatch_due_tasks()
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _discard_stale_entries(self):
+        while self._heap:
+            next_run, task_id = self._heap[0]
+            if self._next_runs.get(task_id) == next_run:
+                return
+            heapq.heappop(self._heap)
+
+    def _seconds_until_next_run(self) -> Optional[float]:
+        self._discard_stale_entries()
+        if not self._heap:
+            return None
+        return (self._heap[0][0] - datetime.utcnow()).total_seconds()
+
+    def _dispatch_due_tasks(self):
+        now = datetime.utcnow()
+        while True:
+            self._discard_stale_entries()
+            if not self._heap or self._heap[0][0] > now:
+                return
+            _, task_id = heapq.heappop(self._heap)
+            del self._next_runs[task_id]
+            # 仍在运行的任务结束后会重新加载计划
+            if task_id in self._running_tasks:
+                continue
+            self._running_tasks.add(task_id)
+            self._queue.put_nowait(task_id)
+
+    def _schedule(self, task_id: int, next_run: datetime):
+        self._next_runs[task_id] = next_run
+        heapq.heappush(self._heap, (next_run, task_id))
+        self._wake()
+
+    async def _load_all_tasks(self):
+        """从数据库加载所有激活的任务，查询在线程中执行，不阻塞调度循环"""
+        schedules = await asyncio.to_thread(self._query_active_tasks)
+        now = datetime.utcnow()
+        for task_id, next_run in schedules:
+            self._schedule(task_id, next_run or now)
+        print(f"Task scheduler loaded {len(schedules)} active tasks")
+
+    async def _reload_task(self, task_id: int):
+        """重新读取单个任务的调度计划；失败退避中的任务不早于重试时间运行"""
+        if task_id in self._running_tasks:
+            return
+        active, next_run = await asyncio.to_thread(self._query_task, task_id)
+        # 查询期间任务可能已被派发
+        if task_id in self._running_tasks:
+            return
+        if not active:
+            self._next_runs.pop(task_id, None)
+            return
+        next_run = next_run or datetime.utcnow()
+        retry_at = self._retry_at.get(task_id)
+        if retry_at is not None and retry_at > next_run:
+            next_run = retry_at
+        self._schedule(task_id, next_run)
+
+    @staticmethod
+    def _query_active_tasks() -> List[Tuple[int, Optional[datetime]]]:
+        db = SessionLocal()
         try:
-            # 获取所有激活的、需要运行的任务
-            active_tasks = db.query(CrawlTask).filter(
-                CrawlTask.is_active == True
-            ).all()
-            
-            crawler = Crawler(db)
-            
-            for task in active_tasks:
-                if self._should_run_task(task):
-                    print(f"Running task: {task.name} (ID: {task.id})")
-                    # 这里我们使用同步方式调用，因为APScheduler不直接支持async
-                    asyncio.run(crawler.crawl_task(task.id))
-                    
-                    # 更新任务的下次运行时间
-                    self._update_next_run_time(db, task)
-        except Exception as e:
-            print(f"Error in task scheduler: {str(e)}")
+            return [tuple(row) for row in db.query(CrawlTask.id, CrawlTask.next_run).filter(CrawlTask.is_active == True).all()]
         finally:
             db.close()
 
-    def _should_run_task(self, task: CrawlTask) -> bool:
-        """判断任务是否应该运行"""
-        if not task.next_run:
-            return True
-        return datetime.utcnow() >= task.next_run
+    @staticmethod
+    def _query_task(task_id: int) -> Tuple[bool, Optional[datetime]]:
+        db = SessionLocal()
+        try:
+            row = db.query(CrawlTask.is_active, CrawlTask.next_run).filter(CrawlTask.id == task_id).first()
+            if row is None:
+                return False, None
+            return bool(row.is_active), row.next_run
+        finally:
+            db.close()
+
+    async def _worker(self):
+        while True:
+            task_id = await self._queue.get()
+            try:
+                await self._run_task(task_id)
+                self._failures.pop(task_id, None)
+                self._retry_at.pop(task_id, None)
+            except Exception as e:
+                delay = self._record_failure(task_id)
+                print(f"Error running task {task_id}: {str(e)}, retrying in {delay:.0f}s")
+            finally:
+                self._running_tasks.discard(task_id)
+                try:
+                    await self._reload_task(task_id)
+                except Exception as e:
+                    print(f"Error reloading task {task_id}: {str(e)}")
 
-    def _update_next_run_time(self, db: Session, task: CrawlTask):
-        """更新任务的下次运行时间"""
-        # 解析任务的频率设置并更新下次运行时间
-        # 这里简化处理，假设频率是以秒为单位的字符串
+    def _record_failure(self, task_id: int) -> float:
+        """
+        运行失败时next_run没有更新，按连续失败次数指数退避，上限为scheduler_retry_max秒
+        """
+        settings = get_settings()
+        failures = self._failures.get(task_id, 0) + 1
+        self._failures[task_id] = failures
+        delay = min(settings.scheduler_retry_base * 2 ** (failures - 1), settings.scheduler_retry_max)
+        self._retry_at[task_id] = datetime.utcnow() + timedelta(seconds=delay)
+        return delay
+
+    async def _run_task(self, task_id: int):
+        """
+        运行任务并更新下次运行时间
+        同步的数据库查询都放到线程中执行：写入线程持有SQLite锁时一次查询最多等待busy_timeout，
+        在调度循环上执行会卡住其他正在运行的任务和截止时间的睡眠
+        """
+        started_at = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            task = await asyncio.to_thread(db.query(CrawlTask).filter(CrawlTask.id == task_id).first)
+            if task is None:
+                return
+            if get_settings().crawl_mode == 'distributed':
+                await self._publish_task(db, task)
+            else:
+                print(f"Running task: {task.name} (ID: {task.id})")
+                crawler = Crawler(db)
+                await crawler.crawl_task(task_id)
+            await self._update_next_run_time(db, task, started_at)
+        finally:
+            db.close()
+
+    async def _publish_task(self, db: Session, task: CrawlTask):
+        """分布式模式：按网站拆分任务，发布到工作队列"""
+        if self._work_queue is None:
+            settings = get_settings()
+            self._work_queue = create_work_queue(settings)
+            if isinstance(self._work_queue, InMemoryWorkQueue):
+                worker = CrawlWorker(self._work_queue, concurrency=settings.worker_concurrency)
+                self._local_worker = asyncio.create_task(worker.run())
+                print(f"Started in-process crawl worker for {settings.redis_url} work queue")
+        rows = await asyncio.to_thread(db.query(TaskSite.site_id).filter(TaskSite.task_id == task.id).all)
+        site_ids = [row.site_id for row in rows]
+        for site_id in site_ids:
+            await self._work_queue.publish(WorkItem(task.id, site_id))
+        print(f"Published task: {task.name} (ID: {task.id}) as {len(site_ids)} work items")
+
+    def _get_interval(self, task: CrawlTask) -> timedelta:
+        """解析任务的运行频率，无法解析时默认1小时"""
+        if isinstance(task.frequency, timedelta) and task.frequency.total_seconds() > 0:
+            return task.frequency
+        # 兼容ISO 8601格式的间隔字符串
         import isodate
         try:
-            # 使用ISO 8601格式解析间隔
-            interval = isodate.parse_duration(task.frequency)
-            task.next_run = datetime.utcnow() + interval
+            return isodate.parse_duration(task.frequency)
         except:
-            # 如果解析失败，使用默认值（1小时）
-            task.next_run = datetime.utcnow() + timedelta(hours=1)
-        
-        db.commit()
-
-    def add_task_to_schedule(self, task_id: int, interval_seconds: int):
-        """将特定任务添加到调度中"""
-        job_id = f'crawl_task_{task_id}'
-        
-        # 移除可能已存在的相同任务
-        if self.scheduler.get_job(job_id):
-            self.scheduler.remove_job(job_id)
-        
-        # 添加新任务
-        self.scheduler.add_job(
-            func=self._run_specific_task,
-            trigger=IntervalTrigger(seconds=interval_seconds),
-            id=job_id,
-            name=f'Crawl task {task_id}',
-            args=[task_id],
-            replace_existing=True
+            return timedelta(hours=1)
+
+    async def _update_next_run_time(self, db: Session, task: CrawlTask, started_at: datetime):
+        """更新任务的下次运行时间，按本次开始时间计算，避免运行耗时导致计划漂移；写入交给写入线程"""
+        await asyncio.to_thread(db.refresh, task)
+        next_run = max(started_at + self._get_interval(task), datetime.utcnow())
+        await get_db_writer().run(
+            lambda writer_db: writer_db.query(CrawlTask).filter(CrawlTask.id == task.id).update({CrawlTask.next_run: next_run})
         )
-        print(f"Task {task_id} added to scheduler with {interval_seconds}s interval")
-
-    def _run_specific_task(self, task_id: int):
-        """运行特定任务"""
-        print(f"Running specific task {task_id}")
-        
-        db_gen = get_db()
-        db = next(db_gen)
-        
-        try:
-            crawler = Crawler(db)
-            asyncio.run(crawler.crawl_task(task_id))
-        except Exception as e:
-            print(f"Error running task {task_id}: {str(e)}")
-        finally:
-            db.close()
+        response_cache.invalidate(task.user_id, TASKS)
 
 # 全局调度器实例
-scheduler_service = TaskSchedulerService()
\ No newline at end of file
+scheduler_service = TaskSchedulerService()
@@ -0,0 +1,247 @@
+import asyncio
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, List, Optional
+
+class WorkItem:
+    """
+    分布式抓取的工作项：一个任务中的一个网站
+    """
+
+    def __init__(self, task_id: int, site_id: int, attempts: int = 0, item_id: Optional[str] = None):
+        self.task_id = task_id
+        self.site_id = site_id
+        self.attempts = attempts
+        self.item_id = item_id or uuid.uuid4().hex
+        # 出队时的原始序列化内容，确认/重试时用于定位处理中的条目
+        self.raw: Optional[str] = None
+
+    def dumps(self) -> str:
+        return json.dumps({
+            'id': self.item_id,
+            'task_id': self.task_id,
+            'site_id': self.site_id,
+            'attempts': self.attempts
+        })
+
+    @classmethod
+    def loads(cls, raw: str) -> "WorkItem":
+        data = json.loads(raw)
+        item = cls(data['task_id'], data['site_id'], data.get('attempts', 0), data.get('id'))
+        item.raw = raw
+        return item
+
+    def retry(self) -> "WorkItem":
+        return WorkItem(self.task_id, self.site_id, self.attempts + 1, self.item_id)
+
+class WorkQueue(ABC):
+    """
+    可靠工作队列接口
+    reserve取出的工作项在可见性超时内必须ack，否则会被requeue_expired重新放回队列；
+    nack或超时都会增加重试次数，超过max_attempts后转入死信队列
+    """
+
+    def __init__(self, visibility_timeout: float = 300, max_attempts: int = 3):
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    async def publish(self, item: WorkItem):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def reserve(self, timeout: float = 5) -> Optional[WorkItem]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def ack(self, item: WorkItem):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def nack(self, item: WorkItem):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def touch(self, item: WorkItem):
+        """延长工作项的可见性超时（心跳）"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def requeue_expired(self) -> int:
+        """把超时未确认的工作项放回队列，返回处理的数量"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def size(self) -> int:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+class RedisWorkQueue(WorkQueue):
+    """
+    基于Redis的工作队列
+    {name}:pending 为待处理列表，{name}:processing 为有序集合（成员为工作项，分数为租约到期时间），
+    {name}:dead 为死信列表；出队和登记租约、移出处理中集合和重新入队（或转入死信）各在一个Lua脚本中原子完成
+    """
+
+    RESERVE_SCRIPT = """
+    local raw = redis.call('RPOP', KEYS[1])
+    if not raw then
+        return false
+    end
+    redis.call('ZADD', KEYS[2], ARGV[1], raw)
+    return raw
+    """
+
+    # 只有成功移出处理中集合的一方负责重新入队，避免nack与超时回收重复入队；
+    # 两步在同一脚本中完成，进程在中间崩溃也不会丢失工作项
+    RELEASE_SCRIPT = """
+    if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+        return 0
+    end
+    redis.call('LPUSH', KEYS[2], ARGV[2])
+    return 1
+    """
+
+    def __init__(self, redis_client, name: str = "crawler:work", visibility_timeout: float = 300,
+                 max_attempts: int = 3, poll_interval: float = 0.5):
+        super().__init__(visibility_timeout, max_attempts)
+        self.redis = redis_client
+        self.pending_key = f"{name}:pending"
+        self.processing_key = f"{name}:processing"
+        self.dead_key = f"{name}:dead"
+        self.poll_interval = poll_interval
+        self._reserve = self.redis.register_script(self.RESERVE_SCRIPT)
+        self._release = self.redis.register_script(self.RELEASE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisWorkQueue":
+        import redis.asyncio as aioredis
+        return cls(aioredis.from_url(url, decode_responses=True), **kwargs)
+
+    async def publish(self, item: WorkItem):
+        await self.redis.lpush(self.pending_key, item.dumps())
+
+    async def reserve(self, timeout: float = 5) -> Optional[WorkItem]:
+        deadline = time.monotonic() + timeout
+        while True:
+            raw = await self._reserve(
+                keys=[self.pending_key, self.processing_key],
+                args=[time.time() + self.visibility_timeout]
+            )
+            if raw:
+                return WorkItem.loads(raw)
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(self.poll_interval)
+
+    async def ack(self, item: WorkItem):
+        await self.redis.zrem(self.processing_key, item.raw)
+
+    async def nack(self, item: WorkItem):
+        await self._retry_or_bury(item.raw)
+
+    async def touch(self, item: WorkItem):
+        await self.redis.zadd(self.processing_key, {item.raw: time.time() + self.visibility_timeout}, xx=True)
+
+    async def requeue_expired(self) -> int:
+        expired = await self.redis.zrangebyscore(self.processing_key, '-inf', time.time(), start=0, num=100)
+        count = 0
+        for raw in expired:
+            if await self._retry_or_bury(raw):
+                count += 1
+        return count
+
+    async def _retry_or_bury(self, raw: str) -> bool:
+        retry = WorkItem.loads(raw).retry()
+        target = self.dead_key if retry.attempts >= self.max_attempts else self.pending_key
+        released = await self._release(keys=[self.processing_key, target], args=[raw, retry.dumps()])
+        return bool(released)
+
+    async def size(self) -> int:
+        return await self.redis.llen(self.pending_key)
+
+    async def close(self):
+        await self.redis.close()
+
+class InMemoryWorkQueue(WorkQueue):
+    """
+    进程内工作队列，语义与RedisWorkQueue一致，用于单机运行和测试
+    """
+
+    def __init__(self, visibility_timeout: float = 300, max_attempts: int = 3):
+        super().__init__(visibility_timeout, max_attempts)
+        self.pending = deque()
+        self.processing: Dict[str, float] = {}
+        self.dead: List[str] = []
+        self._available: Optional[asyncio.Event] = None
+
+    def _event(self) -> asyncio.Event:
+        if self._available is None:
+            self._available = asyncio.Event()
+        return self._available
+
+    async def publish(self, item: WorkItem):
+        self.pending.appendleft(item.dumps())
+        self._event().set()
+
+    async def reserve(self, timeout: float = 5) -> Optional[WorkItem]:
+        deadline = time.monotonic() + timeout
+        while not self.pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self._event().clear()
+            try:
+                await asyncio.wait_for(self._event().wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return None
+        raw = self.pending.pop()
+        self.processing[raw] = time.time() + self.visibility_timeout
+        return WorkItem.loads(raw)
+
+    async def ack(self, item: WorkItem):
+        self.processing.pop(item.raw, None)
+
+    async def nack(self, item: WorkItem):
+        if self.processing.pop(item.raw, None) is not None:
+            await self._retry_or_bury(item)
+
+    async def touch(self, item: WorkItem):
+        if item.raw in self.processing:
+            self.processing[item.raw] = time.time() + self.visibility_timeout
+
+    async def requeue_expired(self) -> int:
+        now = time.time()
+        expired = [raw for raw, deadline in self.processing.items() if deadline <= now]
+        for raw in expired:
+            del self.processing[raw]
+            await self._retry_or_bury(WorkItem.loads(raw))
+        return len(expired)
+
+    async def _retry_or_bury(self, item: WorkItem):
+        retry = item.retry()
+        if retry.attempts >= self.max_attempts:
+            self.dead.append(retry.dumps())
+        else:
+            await self.publish(retry)
+
+    async def size(self) -> int:
+        return len(self.pending)
+
+def create_work_queue(settings) -> WorkQueue:
+    """
+    按配置创建工作队列，redis_url为 memory:// 时使用进程内队列，只能由同一进程内的CrawlWorker消费
+    """
+    if settings.redis_url.startswith('memory://'):
+        return InMemoryWorkQueue(settings.work_visibility_timeout, settings.work_max_attempts)
+    return RedisWorkQueue.from_url(
+        settings.redis_url,
+        name=settings.work_queue_name,
+        visibility_timeout=settings.work_visibility_timeout,
+        max_attempts=settings.work_max_attempts
+    )
@@ -0,0 +1,108 @@
+import asyncio
+from typing import Optional
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.crawler.db_writer import get_db_writer
+from app.crawler.core import Crawler
+from app.crawler.work_queue import InMemoryWorkQueue, WorkItem, WorkQueue, create_work_queue
+
+class CrawlWorker:
+    """
+    分布式抓取工作进程：从工作队列取出 任务×网站 工作项并执行
+    可以在任意多个进程或节点上运行，吞吐量随worker数量线性扩展
+    """
+
+    def __init__(self, queue: WorkQueue, concurrency: int = 4):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.processed = 0
+        self.failed = 0
+        self._stopping = False
+
+    async def run(self, max_items: Optional[int] = None):
+        """
+        启动concurrency个消费协程和一个超时回收协程，处理完max_items个工作项后返回（不指定则一直运行）
+        """
+        self._stopping = False
+        self._max_items = max_items
+        reaper = asyncio.create_task(self._reap_expired())
+        try:
+            await asyncio.gather(*[self._consume() for _ in range(self.concurrency)])
+        finally:
+            reaper.cancel()
+            await asyncio.gather(reaper, return_exceptions=True)
+
+    def stop(self):
+        self._stopping = True
+
+    def _done(self) -> bool:
+        if self._stopping:
+            return True
+        return self._max_items is not None and self.processed + self.failed >= self._max_items
+
+    async def _consume(self):
+        while not self._done():
+            item = await self.queue.reserve(timeout=1)
+            if item is None:
+                continue
+            await self._process(item)
+
+    async def _process(self, item: WorkItem):
+        heartbeat = asyncio.create_task(self._heartbeat(item))
+        try:
+            stats = await self.crawl(item)
+            if stats and stats.get('sites_failed'):
+                raise RuntimeError(f"site {item.site_id} failed")
+            await self.queue.ack(item)
+            self.processed += 1
+        except Exception as e:
+            print(f"Error processing task {item.task_id} site {item.site_id} (attempt {item.attempts + 1}): {str(e)}")
+            await self.queue.nack(item)
+            self.failed += 1
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+    async def crawl(self, item: WorkItem):
+        db = SessionLocal()
+        try:
+            crawler = Crawler(db)
+            return await crawler.crawl_task(item.task_id, site_ids=[item.site_id], export_excel=False)
+        finally:
+            db.close()
+
+    async def _heartbeat(self, item: WorkItem):
+        # 处理耗时较长时定期续租，避免被其他worker当作超时任务回收
+        interval = max(self.queue.visibility_timeout / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            await self.queue.touch(item)
+
+    async def _reap_expired(self):
+        interval = max(min(self.queue.visibility_timeout / 2, 30), 1)
+        while True:
+            try:
+                requeued = await self.queue.requeue_expired()
+                if requeued:
+                    print(f"Requeued {requeued} expired work items")
+            except Exception as e:
+                print(f"Error requeuing expired work items: {str(e)}")
+            await asyncio.sleep(interval)
+
+async def main():
+    settings = get_settings()
+    queue = create_work_queue(settings)
+    if isinstance(queue, InMemoryWorkQueue):
+        # 进程内队列收不到调度进程发布的工作项，worker会一直空转
+        raise SystemExit("REDIS_URL=memory:// is only usable inside the API process; set a redis:// URL for crawl workers")
+    worker = CrawlWorker(queue, concurrency=settings.worker_concurrency)
+    print(f"Crawl worker started with concurrency {settings.worker_concurrency}")
+    try:
+        await worker.run()
+    finally:
+        await queue.close()
+        get_db_writer().stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
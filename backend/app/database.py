@@ -1,20 +1,113 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from app.utils import get_settings
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.config import get_settings
+
+# 同步驱动对应的异步驱动
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def async_database_url(url: str) -> str:
+    """
+    把同步数据库地址换成异步驱动的地址，如 sqlite:///x.db -> sqlite+aiosqlite:///x.db
+    """
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
 
 # 获取数据库配置
 settings = get_settings()
 
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def _is_memory_sqlite(url: str) -> bool:
+    return _is_sqlite(url) and (url.split("://", 1)[1] in ("", "/") or ":memory:" in url)
+
+def configure_sqlite(engine: Engine, read_only: bool = False):
+    """
+    为SQLite连接开启WAL：读不阻塞写、写也不阻塞读；写锁冲突时等待busy_timeout而不是立即报database is locked
+    read_only的连接设置query_only，误写时直接报错；同时注册全文检索二元组索引触发器用到的函数
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout}")
+        # WAL模式下NORMAL只在检查点时同步磁盘，断电最多丢失最近的事务，不会损坏数据库
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+        # app.utils依赖models，不能在模块顶层导入
+        from app.utils.bigrams import register_bigram_function
+        register_bigram_function(dbapi_connection)
+
 # 创建数据库引擎
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False}  # 仅适用于SQLite
+    connect_args={"check_same_thread": False} if _is_sqlite(settings.database_url) else {}
 )
+configure_sqlite(engine)
 
 # 创建会话
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# API读请求使用独立的只读连接池，不和写操作争用连接；可以配置为只读副本的地址
+read_database_url = settings.database_read_url or settings.database_url
+if _is_memory_sqlite(read_database_url):
+    # 内存数据库无法被另一个连接池打开
+    read_engine = engine
+else:
+    read_engine = create_engine(
+        read_database_url,
+        connect_args={"check_same_thread": False} if _is_sqlite(read_database_url) else {},
+        pool_size=settings.read_pool_size,
+        max_overflow=settings.read_pool_size
+    )
+    configure_sqlite(read_engine, read_only=True)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# 异步引擎和会话，供/api/v2的异步路由使用，与同步路径共用同一个数据库
+# aiosqlite默认不复用连接，每个请求都要新建连接和它的后台线程，这里统一使用连接池
+async_engine = create_async_engine(
+    settings.async_database_url or async_database_url(settings.database_url),
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.async_pool_size,
+    max_overflow=settings.async_pool_size
+)
+configure_sqlite(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# /api/v2的读请求使用独立的异步只读连接池，与同步路径的read_engine对应
+if settings.async_database_read_url:
+    async_read_database_url = settings.async_database_read_url
+elif settings.database_read_url or not settings.async_database_url:
+    async_read_database_url = async_database_url(read_database_url)
+else:
+    async_read_database_url = settings.async_database_url
+if _is_memory_sqlite(async_read_database_url):
+    async_read_engine = async_engine
+else:
+    async_read_engine = create_async_engine(
+        async_read_database_url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.async_pool_size,
+        max_overflow=settings.async_pool_size
+    )
+    configure_sqlite(async_read_engine.sync_engine, read_only=True)
+AsyncReadSessionLocal = async_sessionmaker(
+    async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # 创建基础模型
 Base = declarative_base()
 
@@ -24,4 +117,22 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# 获取只读数据库会话的依赖函数，用于只查询不写入的接口
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# 获取异步数据库会话的依赖函数
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# 获取异步只读数据库会话的依赖函数，用于/api/v2只查询不写入的接口
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -1,13 +1,64 @@
-from sqlalchemy import create_engine
+from sqlalchemy import UniqueConstraint, create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 from app.database import Base
-from app.utils import get_settings
+from app import models  # 导入模型以注册所有数据表
+from app.config import get_settings
+from app.utils.search_index import create_search_index
+
+def upgrade_schema(engine):
+    """
+    create_all不会修改已存在的表，这里为旧数据库补上模型中新增的列和索引
+    新增的列必须可为空或带有数据库默认值
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                if column.server_default is not None:
+                    ddl += f" DEFAULT '{column.server_default.arg}'"
+                if not column.nullable:
+                    ddl += " NOT NULL"
+                conn.execute(text(ddl))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+            _add_unique_constraints(conn, inspector, table)
+
+def _add_unique_constraints(conn, inspector, table):
+    """
+    为旧表补上模型中的唯一约束：先删除重复行（保留id最小的一行），再创建同名唯一索引
+    INSERT ... ON CONFLICT 需要与冲突列对应的唯一约束或唯一索引
+    """
+    existing = {constraint["name"] for constraint in inspector.get_unique_constraints(table.name)}
+    existing |= {index["name"] for index in inspector.get_indexes(table.name) if index.get("unique")}
+    primary_key = table.primary_key.columns.values()[0].name
+    for constraint in table.constraints:
+        if not isinstance(constraint, UniqueConstraint) or constraint.name in existing:
+            continue
+        columns = [column.name for column in constraint.columns]
+        # 任一列为NULL的行不受唯一约束限制，保留
+        not_null = " AND ".join(f"{column} IS NOT NULL" for column in columns)
+        conn.execute(text(
+            f"DELETE FROM {table.name} WHERE {not_null} AND {primary_key} NOT IN "
+            f"(SELECT MIN({primary_key}) FROM {table.name} GROUP BY {', '.join(columns)})"
+        ))
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {constraint.name} ON {table.name} ({', '.join(columns)})"
+        ))
 
 def init_db():
     settings = get_settings()
     engine = create_engine(settings.database_url)
+    upgrade_schema(engine)
     Base.metadata.create_all(bind=engine)
+    # 结果的全文索引，SQLite之外的数据库会跳过
+    create_search_index(engine)
 
 if __name__ == "__main__":
     init_db()
-    print("Database tables created successfully!")
\ No newline at end of file
+    print("Database tables created successfully!")
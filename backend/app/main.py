@@ -1,6 +1,15 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from starlette.routing import Route
 from app.api import routes
+from app.api.v2 import routes as routes_v2
+from app.crawler.scheduler import scheduler_service
+from app.crawler.db_writer import get_db_writer
+from app.crawler.enrichment import get_summary_enricher
+from app.config import get_settings
+from app.utils.metrics import HTTP_REQUEST_SECONDS, registry
 import uvicorn
 
 app = FastAPI(
@@ -16,10 +25,56 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 结果列表的下一页游标和导出文件名放在响应头里，需要暴露给前端
+    expose_headers=["X-Next-Cursor", "Content-Disposition"],
 )
 
 # 包含API路由
 app.include_router(routes.router, prefix="/api/v1")
+app.include_router(routes_v2.router, prefix="/api/v2")
+
+# 路由处理函数 -> 路径模板，指标按模板而不是实际路径分组，如 /api/v1/sites/{site_id}
+_route_paths = {}
+
+def _route_path(request: Request) -> str:
+    endpoint = request.scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    path = _route_paths.get(endpoint)
+    if path is None:
+        _route_paths.update({route.endpoint: route.path for route in app.routes if isinstance(route, Route)})
+        path = _route_paths.get(endpoint, "unmatched")
+    return path
+
+if get_settings().metrics_enabled:
+    @app.middleware("http")
+    async def record_request_latency(request: Request, call_next):
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            HTTP_REQUEST_SECONDS.labels(request.method, _route_path(request), status).observe(time.perf_counter() - started)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.on_event("startup")
+def start_scheduler():
+    scheduler_service.start_scheduler()
+    # 分布式worker写入的pending结果也由这里的后台摘要工作池按poll_interval扫描处理
+    if get_settings().summary_enrich_enabled:
+        get_summary_enricher().start()
+
+@app.on_event("shutdown")
+def stop_scheduler():
+    scheduler_service.stop_scheduler()
+    get_summary_enricher().stop()
+    # 调度器和摘要工作池停止后再停止写入线程，排队中的写操作会先提交
+    get_db_writer().stop()
 
 @app.get("/")
 def read_root():
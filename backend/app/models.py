@@ -1,7 +1,21 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Text, Interval
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, Float, String, DateTime, Text, Interval, UniqueConstraint, Index, text
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
 from app.database import Base
 
+# SQLite的CURRENT_TIMESTAMP写入的时间不带微秒，而DateTime默认按带微秒的字符串绑定参数，
+# 两种格式混在一起按字符串比较时顺序会错，这里统一成不带微秒的格式
+Timestamp = DateTime().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite"
+)
+
+# 结果的摘要状态：入库时为pending，由后台摘要工作池生成摘要后改为done；
+# 多次处理失败的结果改为failed，摘要为本地启发式摘要；关闭后台摘要时直接以done入库
+SUMMARY_PENDING = "pending"
+SUMMARY_DONE = "done"
+SUMMARY_FAILED = "failed"
+
 class User(Base):
     __tablename__ = "users"
 
@@ -19,6 +33,13 @@ class MonitoredSite(Base):
     name = Column(String, index=True, nullable=False)
     url = Column(String, nullable=False)
     site_type = Column(String, default="general")  # 如: news, forum, blog 等
+    parser_backend = Column(String)  # HTML解析后端：selectolax, lxml, html.parser，为空时使用全局配置
+    crawl_rate = Column(Float)  # 每秒请求数，为空时使用按域名或全局配置
+    crawl_mode = Column(String)  # 抓取方式：html, feed, auto，为空时使用全局配置
+    feed_url = Column(String)  # RSS/Atom/sitemap地址，auto模式发现feed后自动填写
+    max_depth = Column(Integer)  # 跟随链接的最大深度，0 只抓取首页（分页也不跟随），为空时使用全局配置
+    max_pages = Column(Integer)  # 最多抓取的列表页数，为空时使用全局配置
+    link_pattern = Column(String)  # 只跟随URL匹配该正则的链接，为空时不限制
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -52,14 +73,28 @@ class CrawlTask(Base):
 
 class CrawlResult(Base):
     __tablename__ = "crawl_results"
+    __table_args__ = (
+        # 同一任务下同一文章、同一关键词只保存一条
+        UniqueConstraint("task_id", "url", "keyword_matched", name="uq_crawl_results_task_url_keyword"),
+        # 结果列表按(crawled_at, id)做游标分页，每种筛选条件各有一个以user_id开头的组合索引
+        Index("ix_crawl_results_user_crawled", "user_id", "crawled_at", "id"),
+        Index("ix_crawl_results_user_keyword_crawled", "user_id", "keyword_matched", "crawled_at", "id"),
+        Index("ix_crawl_results_user_site_crawled", "user_id", "site_id", "crawled_at", "id"),
+        Index("ix_crawl_results_user_task_crawled", "user_id", "task_id", "crawled_at", "id"),
+        # 只索引等待摘要的结果，后台摘要工作池按id顺序领取
+        Index("ix_crawl_results_summary_pending", "id",
+              sqlite_where=text("summary_status = 'pending'"), postgresql_where=text("summary_status = 'pending'")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     url = Column(String, nullable=False)
     content = Column(Text)
     summary = Column(String)
+    # 加入此列之前保存的结果都已生成摘要，所以数据库默认值是done
+    summary_status = Column(String, nullable=False, default=SUMMARY_PENDING, server_default=SUMMARY_DONE)
     published_at = Column(DateTime)
-    crawled_at = Column(DateTime, default=func.now())
+    crawled_at = Column(Timestamp, default=func.now(), nullable=False)
     keyword_matched = Column(String, index=True)
     site_id = Column(Integer, ForeignKey("monitored_sites.id"))
     task_id = Column(Integer, ForeignKey("crawl_tasks.id"))
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Optional
 
 # User schemas
@@ -26,6 +26,13 @@ class MonitoredSiteBase(BaseModel):
     name: str
     url: str
     site_type: Optional[str] = "general"
+    parser_backend: Optional[str] = None
+    crawl_rate: Optional[float] = None
+    crawl_mode: Optional[str] = None
+    feed_url: Optional[str] = None
+    max_depth: Optional[int] = None
+    max_pages: Optional[int] = None
+    link_pattern: Optional[str] = None
     is_active: Optional[bool] = True
 
 class MonitoredSiteCreate(MonitoredSiteBase):
@@ -35,6 +42,13 @@ class MonitoredSiteUpdate(MonitoredSiteBase):
     name: Optional[str] = None
     url: Optional[str] = None
     site_type: Optional[str] = None
+    parser_backend: Optional[str] = None
+    crawl_rate: Optional[float] = None
+    crawl_mode: Optional[str] = None
+    feed_url: Optional[str] = None
+    max_depth: Optional[int] = None
+    max_pages: Optional[int] = None
+    link_pattern: Optional[str] = None
     is_active: Optional[bool] = None
 
 class MonitoredSiteResponse(MonitoredSiteBase):
@@ -75,7 +89,7 @@ class KeywordResponse(KeywordBase):
 class CrawlTaskBase(BaseModel):
     name: str
     description: Optional[str] = None
-    frequency: str  # 使用ISO 8601时间间隔格式，如 "PT1H" 表示1小时
+    frequency: timedelta  # 使用ISO 8601时间间隔格式，如 "PT1H" 表示1小时
     is_active: Optional[bool] = True
 
 class CrawlTaskCreate(CrawlTaskBase):
@@ -85,7 +99,7 @@ class CrawlTaskCreate(CrawlTaskBase):
 class CrawlTaskUpdate(CrawlTaskBase):
     name: Optional[str] = None
     description: Optional[str] = None
-    frequency: Optional[str] = None
+    frequency: Optional[timedelta] = None
     is_active: Optional[bool] = None
     site_ids: Optional[List[int]] = None
     keyword_ids: Optional[List[int]] = None
@@ -122,6 +136,37 @@ class CrawlResultResponse(CrawlResultBase):
     id: int
     crawled_at: datetime
     user_id: int
+    # pending 表示摘要还在后台生成中
+    summary_status: Optional[str] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# 列表接口按fields=返回部分字段，未选择的字段不出现在响应中
+class CrawlResultListItem(BaseModel):
+    id: int
+    crawled_at: datetime
+    title: Optional[str] = None
+    url: Optional[str] = None
+    content: Optional[str] = None
+    summary: Optional[str] = None
+    published_at: Optional[datetime] = None
+    keyword_matched: Optional[str] = None
+    site_id: Optional[int] = None
+    task_id: Optional[int] = None
+    user_id: Optional[int] = None
+    summary_status: Optional[str] = None
+
+class CrawlResultSearchHit(BaseModel):
+    id: int
+    title: str
+    url: str
+    summary: Optional[str] = None
+    keyword_matched: Optional[str] = None
+    site_id: Optional[int] = None
+    task_id: Optional[int] = None
+    published_at: Optional[datetime] = None
+    crawled_at: datetime
+    snippet: Optional[str] = None
+    # bm25得分，越小越相关；短词退回LIKE查询时为空
+    rank: Optional[float] = None
\ No newline at end of file
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from jose import JWTError, jwt
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from passlib.context import CryptContext
+from pydantic import BaseModel
+
+from app.config import Settings, get_settings
+from app.models import User
+from app.database import AsyncReadSessionLocal, ReadSessionLocal, get_db
+from app.utils.token_cache import token_cache
+
+# 密码加密上下文
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# JWT配置
+SECRET_KEY = "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7"
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+def verify_password(plain_password, hashed_password):
+    return pwd_context.verify(plain_password, hashed_password)
+
+def get_password_hash(password):
+    return pwd_context.hash(password)
+
+def authenticate_user(db: Session, email: str, password: str):
+    user = db.query(User).filter(User.email == email).first()
+    if not user or not verify_password(password, user.hashed_password):
+        return False
+    return user
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    to_encode = data.copy()
+    if expires_delta:
+        expire = datetime.utcnow() + expires_delta
+    else:
+        expire = datetime.utcnow() + timedelta(minutes=15)
+    to_encode.update({"exp": expire})
+    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return encoded_jwt
+
+from fastapi.security import OAuth2PasswordBearer
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _decode_token(token: str) -> dict:
+    """
+    解码访问令牌，返回载荷；令牌无效或缺少sub时抛出401
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+def _cache_user(token: str, payload: dict, user: Optional[User]) -> User:
+    # 已停用的用户不能再访问接口
+    if user is None or not user.is_active:
+        raise _credentials_exception()
+    token_cache.put(token, user, payload.get("exp"))
+    return user
+
+def get_current_user(token: str = Depends(oauth2_scheme)):
+    """
+    校验访问令牌并返回当前用户
+    命中令牌缓存时既不解码JWT也不打开数据库会话；未命中时查询用户并放入缓存
+    """
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+
+    payload = _decode_token(token)
+    db = ReadSessionLocal()
+    try:
+        user = db.query(User).filter(User.email == payload["sub"]).first()
+        # 分离出会话，缓存的对象在之后的请求里只读取已加载的属性
+        if user is not None:
+            db.expunge(user)
+    finally:
+        db.close()
+    return _cache_user(token, payload, user)
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme)):
+    """
+    get_current_user的异步版本，供异步路由使用，未命中缓存时通过异步会话查询用户
+    """
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+
+    payload = _decode_token(token)
+    async with AsyncReadSessionLocal() as db:
+        user = (await db.execute(select(User).where(User.email == payload["sub"]))).scalars().first()
+        if user is not None:
+            db.expunge(user)
+    return _cache_user(token, payload, user)
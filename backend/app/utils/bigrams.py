@@ -0,0 +1,30 @@
+import re
+from typing import Optional
+
+# 结果二元组索引使用的SQLite函数名，触发器中调用，每个连接建立时注册
+BIGRAM_FUNCTION = "search_bigrams"
+
+# 连续的字母数字（含中文）片段；下划线和标点与FTS5 unicode61分词器一样视为分隔符
+WORD_RUN_PATTERN = re.compile(r"[^\W_]+")
+
+def text_bigrams(*texts: Optional[str]) -> str:
+    """
+    把文本切成相邻两个字符组成的二元组，去重后用空格连接，供FTS5 unicode61分词器建立索引
+    trigram分词器查不了的两字词（如“中文”“AI”）可以在二元组索引中按整词匹配
+    """
+    bigrams = {}
+    for value in texts:
+        if not value:
+            continue
+        for run in WORD_RUN_PATTERN.findall(value.lower()):
+            for i in range(len(run) - 1):
+                bigrams[run[i:i + 2]] = None
+    return " ".join(bigrams)
+
+def register_bigram_function(dbapi_connection):
+    """
+    在SQLite连接上注册二元组函数，同步驱动和aiosqlite的连接都支持create_function
+    """
+    create_function = getattr(dbapi_connection, "create_function", None)
+    if create_function is not None:
+        create_function(BIGRAM_FUNCTION, -1, text_bigrams, deterministic=True)
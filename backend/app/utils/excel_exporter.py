@@ -1 +1,223 @@
-import pandas as pd\nfrom datetime import datetime\nimport os\nfrom typing import List, Dict, Any\n\nclass ExcelExporter:\n    \"\"\"\n    Excel文件导出工具类\n    用于将爬取结果保存到Excel文件\n    \"\"\"\n    \n    def __init__(self, output_dir: str = \"exports\"):\n        self.output_dir = output_dir\n        # 确保输出目录存在\n        os.makedirs(output_dir, exist_ok=True)\n    \n    def export_crawl_results(self, results: List[Dict[str, Any]], filename: str = None, keyword: str = None) -> str:\n        \"\"\"\n        将爬取结果导出到Excel文件\n        \n        Args:\n            results: 爬取结果列表\n            filename: 输出文件名，如果不提供则自动生成\n            keyword: 关键词，用于生成文件名\n        \n        Returns:\n            导出文件的路径\n        \"\"\"\n        if not results:\n            raise ValueError(\"没有数据可导出\")\n        \n        # 如果没有提供文件名，则生成一个\n        if not filename:\n            timestamp = datetime.now().strftime(\"%Y%m%d_%H%M%S\")\n            keyword_part = f\"_{keyword}\" if keyword else \"\"\n            filename = f\"crawl_results{keyword_part}_{timestamp}.xlsx\"\n        \n        # 确保文件名安全\n        filename = self._sanitize_filename(filename)\n        filepath = os.path.join(self.output_dir, filename)\n        \n        # 准备数据\n        df_data = []\n        for result in results:\n            df_data.append({\n                '标题': result.get('title', '')[:500],  # 限制长度\n                '网址': result.get('url', ''),\n                '发布时间': result.get('published_at', ''),\n                '抓取时间': result.get('crawled_at', ''),\n                '关键词': result.get('keyword_matched', ''),\n                '内容摘要': result.get('summary', '')[:200],  # 限制长度\n                '完整内容': result.get('content', '')[:1000]  # 限制长度\n            })\n        \n        # 创建DataFrame\n        df = pd.DataFrame(df_data)\n        \n        # 保存到Excel文件\n        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:\n            df.to_excel(writer, sheet_name='爬取结果', index=False)\n            \n            # 获取工作表对象以调整列宽\n            worksheet = writer.sheets['爬取结果']\n            \n            # 自动调整列宽\n            for column in worksheet.columns:\n                max_length = 0\n                column_letter = column[0].column_letter\n                \n                for cell in column:\n                    try:\n                        if len(str(cell.value)) > max_length:\n                            max_length = len(str(cell.value))\n                    except:\n                        pass\n                \n                adjusted_width = min(max_length + 2, 50)  # 限制最大宽度\n                worksheet.column_dimensions[column_letter].width = adjusted_width\n        \n        return filepath\n    \n    def export_multiple_keywords_results(self, results_by_keyword: Dict[str, List[Dict[str, Any]]], base_filename: str = \"crawl_results\") -> List[str]:\n        \"\"\"\n        将多个关键词的结果分别导出到不同的Excel文件\n        \n        Args:\n            results_by_keyword: 按关键词分组的结果字典\n            base_filename: 基础文件名\n        \n        Returns:\n            导出文件路径列表\n        \"\"\"\n        exported_files = []\n        \n        for keyword, results in results_by_keyword.items():\n            if results:  # 只有当结果不为空时才导出\n                filename = f\"{base_filename}_{keyword}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx\"\n                filepath = self.export_crawl_results(results, filename, keyword)\n                exported_files.append(filepath)\n        \n        return exported_files\n    \n    def _sanitize_filename(self, filename: str) -> str:\n        \"\"\"\n        清理文件名，移除不安全字符\n        \"\"\"\n        # 替换不安全的字符\n        unsafe_chars = '<>:\"/\\\\|?*'\n        for char in unsafe_chars:\n            filename = filename.replace(char, '_')\n        \n        # 确保文件名不以空格或点开头或结尾\n        filename = filename.strip('. ')\n        \n        # 限制文件名长度\n        name, ext = os.path.splitext(filename)\n        if len(name) > 100:  # 限制文件名部分长度\n            name = name[:100]\n        if len(ext) > 10:  # 限制扩展名长度\n            ext = ext[:10]\n        \n        return name + ext\n
\ No newline at end of file
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+# (字段, 表头, 最大长度)
+ExportColumn = Tuple[str, str, Optional[int]]
+
+# 导出文件里单元格内容的长度限制沿用原来的导出格式
+EXCEL_FILE_COLUMNS: List[ExportColumn] = [
+    ('title', '标题', 500),
+    ('url', '网址', None),
+    ('published_at', '发布时间', None),
+    ('crawled_at', '抓取时间', None),
+    ('keyword_matched', '关键词', None),
+    ('summary', '内容摘要', 200),
+    ('content', '完整内容', 1000),
+]
+
+# 接口导出保留完整内容，只受Excel单元格32767字符的上限约束
+EXCEL_CELL_MAX_CHARS = 32767
+EXPORT_COLUMNS: List[ExportColumn] = [
+    ('id', 'ID', None),
+    ('title', '标题', None),
+    ('url', '网址', None),
+    ('published_at', '发布时间', None),
+    ('crawled_at', '抓取时间', None),
+    ('keyword_matched', '关键词', None),
+    ('site_id', '网站ID', None),
+    ('task_id', '任务ID', None),
+    ('summary', '内容摘要', None),
+    ('content', '完整内容', None),
+]
+
+COLUMN_MAX_WIDTH = 50
+# 累积这么多行再交给响应发送一次
+ROWS_PER_CHUNK = 500
+FILE_CHUNK_SIZE = 64 * 1024
+
+def _format_value(value: Any, max_length: Optional[int]) -> Any:
+    if value is None:
+        return ''
+    if isinstance(value, str) and max_length:
+        return value[:max_length]
+    return value
+
+def _xlsx_value(value: Any, max_length: Optional[int]) -> Any:
+    """
+    网页正文里可能带有XML不允许的控制字符，openpyxl遇到会直接报错
+    """
+    value = _format_value(value, min(max_length or EXCEL_CELL_MAX_CHARS, EXCEL_CELL_MAX_CHARS))
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub('', value)
+    return value
+
+def iter_csv(rows: Iterable[Dict[str, Any]], columns: List[ExportColumn] = EXPORT_COLUMNS) -> Iterator[bytes]:
+    """
+    逐行生成CSV，带BOM方便Excel识别UTF-8；先发送表头，之后每ROWS_PER_CHUNK行发送一次
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for _, header, _ in columns])
+    yield ('\ufeff' + buffer.getvalue()).encode('utf-8')
+    buffer.seek(0)
+    buffer.truncate()
+
+    count = 0
+    for row in rows:
+        writer.writerow([_format_value(row.get(field), max_length) for field, _, max_length in columns])
+        count += 1
+        if count % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]], columns: List[ExportColumn] = EXPORT_COLUMNS) -> Iterator[bytes]:
+    """
+    每行一个JSON对象，键为字段名
+    """
+    lines = []
+    for row in rows:
+        record = {field: row.get(field) for field, _, _ in columns}
+        lines.append(json.dumps(record, ensure_ascii=False, default=_json_default))
+        if len(lines) >= ROWS_PER_CHUNK:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+def write_xlsx(rows: Iterable[Dict[str, Any]], output: BinaryIO, columns: List[ExportColumn] = EXPORT_COLUMNS) -> int:
+    """
+    用openpyxl的只写模式写入XLSX，行数据直接落到临时文件，内存占用不随行数增长
+    返回写入的行数
+    """
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('爬取结果')
+    # 只写模式下列宽必须在写入数据前设置，按表头和长度限制估算
+    for index, (_, header, max_length) in enumerate(columns):
+        letter = chr(ord('A') + index)
+        worksheet.column_dimensions[letter].width = min(max(len(header) * 2, max_length or 20) + 2, COLUMN_MAX_WIDTH)
+    worksheet.append([header for _, header, _ in columns])
+
+    count = 0
+    for row in rows:
+        worksheet.append([_xlsx_value(row.get(field), max_length) for field, _, max_length in columns])
+        count += 1
+    workbook.save(output)
+    return count
+
+def iter_xlsx(rows: Iterable[Dict[str, Any]], columns: List[ExportColumn] = EXPORT_COLUMNS) -> Iterator[bytes]:
+    """
+    XLSX是zip格式，文件末尾的目录写完之前无法发送，先写到临时文件再分块读出
+    """
+    with tempfile.TemporaryFile() as output:
+        write_xlsx(rows, output, columns)
+        output.seek(0)
+        while True:
+            chunk = output.read(FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+# 导出格式 -> (生成器, 媒体类型, 扩展名)
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv', 'csv'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson', 'ndjson'),
+    'xlsx': (iter_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+
+class ExcelExporter:
+    """
+    Excel文件导出工具类
+    用于将爬取结果保存到Excel文件
+    """
+    
+    def __init__(self, output_dir: str = "exports"):
+        self.output_dir = output_dir
+        # 确保输出目录存在
+        os.makedirs(output_dir, exist_ok=True)
+    
+    def export_crawl_results(self, results: List[Dict[str, Any]], filename: str = None, keyword: str = None) -> str:
+        """
+        将爬取结果导出到Excel文件
+        
+        Args:
+            results: 爬取结果列表
+            filename: 输出文件名，如果不提供则自动生成
+            keyword: 关键词，用于生成文件名
+        
+        Returns:
+            导出文件的路径
+        """
+        if not results:
+            raise ValueError("没有数据可导出")
+        
+        # 如果没有提供文件名，则生成一个
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            keyword_part = f"_{keyword}" if keyword else ""
+            filename = f"crawl_results{keyword_part}_{timestamp}.xlsx"
+        
+        # 确保文件名安全
+        filename = self._sanitize_filename(filename)
+        filepath = os.path.join(self.output_dir, filename)
+        
+        with open(filepath, 'wb') as output:
+            write_xlsx(results, output, EXCEL_FILE_COLUMNS)
+        return filepath
+    
+    def export_multiple_keywords_results(self, results_by_keyword: Dict[str, List[Dict[str, Any]]], base_filename: str = "crawl_results") -> List[str]:
+        """
+        将多个关键词的结果分别导出到不同的Excel文件
+        
+        Args:
+            results_by_keyword: 按关键词分组的结果字典
+            base_filename: 基础文件名
+        
+        Returns:
+            导出文件路径列表
+        """
+        exported_files = []
+        
+        for keyword, results in results_by_keyword.items():
+            if results:  # 只有当结果不为空时才导出
+                filename = f"{base_filename}_{keyword}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+                filepath = self.export_crawl_results(results, filename, keyword)
+                exported_files.append(filepath)
+        
+        return exported_files
+    
+    def _sanitize_filename(self, filename: str) -> str:
+        """
+        清理文件名，移除不安全字符
+        """
+        # 替换不安全的字符
+        unsafe_chars = '<>:"/\\|?*'
+        for char in unsafe_chars:
+            filename = filename.replace(char, '_')
+        
+        # 确保文件名不以空格或点开头或结尾
+        filename = filename.strip('. ')
+        
+        # 限制文件名长度
+        name, ext = os.path.splitext(filename)
+        if len(name) > 100:  # 限制文件名部分长度
+            name = name[:100]
+        if len(ext) > 10:  # 限制扩展名长度
+            ext = ext[:10]
+        
+        return name + ext
@@ -0,0 +1,262 @@
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# 每个指标最多保留的标签组合数，超出的组合合并到 "other"，避免按主机等标签无限增长
+MAX_SERIES = 1000
+OVERFLOW_LABEL = "other"
+
+# 网络请求（秒）与本地计算（秒）的默认分桶
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CPU_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class _Timer:
+    """
+    with metric.time(): 计时并记录到直方图
+    """
+
+    def __init__(self, histogram: "_HistogramChild"):
+        self.histogram = histogram
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+class _CounterChild:
+    def __init__(self, lock: threading.Lock):
+        self._lock = lock
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+class _GaugeChild(_CounterChild):
+    def __init__(self, lock: threading.Lock):
+        super().__init__(lock)
+        self.function: Optional[Callable[[], float]] = None
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """采集时才调用function取值，适合队列长度等随时可读的状态"""
+        self.function = function
+
+    def get(self) -> float:
+        if self.function is not None:
+            try:
+                return float(self.function())
+            except Exception:
+                return math.nan
+        return self.value
+
+class _HistogramChild:
+    def __init__(self, lock: threading.Lock, buckets: Tuple[float, ...]):
+        self._lock = lock
+        self.buckets = buckets
+        # 每个桶单独计数（不累加），最后一个是+Inf，输出时再累加
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+class _Metric:
+    """
+    指标族：名称、说明和一组标签；每个标签取值组合对应一个子指标
+    """
+    type = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._default = self._new_child()
+            self._children[()] = self._default
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is not None:
+            return child
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                if len(self._children) >= MAX_SERIES:
+                    key = (OVERFLOW_LABEL,) * len(self.labelnames)
+                    child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def _new_child(self):
+        return _CounterChild(self._lock)
+
+    def inc(self, amount: float = 1):
+        self._default.inc(amount)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild(self._lock)
+
+    def dec(self, amount: float = 1):
+        self._default.dec(amount)
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default.set_function(function)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"
+            for key, child in list(self._children.items())
+        ]
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self._lock, self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self) -> _Timer:
+        return self._default.time()
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, child in list(self._children.items()):
+            with self._lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """
+    进程内的指标注册表，按Prometheus文本格式（0.0.4）输出
+    记录指标只是在锁内做几次加法，可以在生产环境中一直开启
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+registry = MetricsRegistry()
+
+# 抓取各阶段耗时
+FETCH_SECONDS = registry.histogram('crawler_fetch_seconds', 'HTTP fetch latency, excluding rate-limit and concurrency waits')
+PARSE_SECONDS = registry.histogram('crawler_parse_seconds', 'HTML and feed parse time', buckets=CPU_BUCKETS)
+MATCH_SECONDS = registry.histogram('crawler_match_seconds', 'Keyword matching time per page or feed', buckets=CPU_BUCKETS)
+SUMMARIZE_SECONDS = registry.histogram('crawler_summarize_seconds', 'Summary generation time per enrichment batch')
+DB_WRITE_SECONDS = registry.histogram('crawler_db_write_seconds', 'Database writer time per group commit', buckets=CPU_BUCKETS)
+EXPORT_SECONDS = registry.histogram('crawler_export_seconds', 'Excel export time per task run')
+
+# 抓取计数
+PAGES_FETCHED = registry.counter('crawler_pages_fetched_total', 'Pages fetched, including 304 responses')
+BYTES_DOWNLOADED = registry.counter('crawler_bytes_downloaded_total', 'Response body bytes downloaded')
+FETCH_ERRORS = registry.counter('crawler_fetch_errors_total', 'HTTP and network errors by host', ['host'])
+RESULTS_SAVED = registry.counter('crawler_results_saved_total', 'New crawl results written to the database')
+
+# 运行状态
+RUNNING_TASKS = registry.gauge('crawler_running_tasks', 'Crawl tasks currently running in this process')
+QUEUE_DEPTH = registry.gauge('crawler_queue_depth', 'Items waiting in internal queues', ['queue'])
+
+# API
+HTTP_REQUEST_SECONDS = registry.histogram(
+    'http_request_duration_seconds', 'API request latency by route template', ['method', 'route', 'status']
+)
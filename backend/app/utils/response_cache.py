@@ -0,0 +1,219 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from fastapi import Request, Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.config import Settings, get_settings
+
+# 缓存按用户和资源划分，资源名与路由一一对应
+SITES = "sites"
+KEYWORDS = "keywords"
+TASKS = "tasks"
+RESULTS = "results"
+
+# 随响应一起缓存的响应头
+CACHED_HEADERS = ("X-Next-Cursor",)
+
+class CachedResponse:
+    """
+    一条缓存的响应：ETag、媒体类型、需要保留的响应头和响应体
+    """
+
+    def __init__(self, etag: str, media_type: str, headers: Dict[str, str], body: bytes):
+        self.etag = etag
+        self.media_type = media_type
+        self.headers = headers
+        self.body = body
+
+    def dumps(self) -> bytes:
+        meta = json.dumps({"etag": self.etag, "media_type": self.media_type, "headers": self.headers})
+        return meta.encode() + b"\n" + self.body
+
+    @classmethod
+    def loads(cls, data: bytes) -> "CachedResponse":
+        meta, body = data.split(b"\n", 1)
+        fields = json.loads(meta)
+        return cls(fields["etag"], fields["media_type"], fields["headers"], body)
+
+class MemoryCacheBackend:
+    """
+    进程内LRU，条目数有上限；每个(用户, 资源)有一个版本号，失效时加一，旧版本的条目随LRU淘汰
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def version(self, scope: str) -> int:
+        with self._lock:
+            return self._versions.get(scope, 0)
+
+    def bump(self, scope: str):
+        with self._lock:
+            self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def set(self, key: str, data: bytes, ttl: int):
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class RedisCacheBackend:
+    """
+    Redis后端，多个API进程和分布式worker共享同一份版本号，worker写入结果后所有进程的缓存同时失效
+    """
+
+    def __init__(self, client, prefix: str = "respcache"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        import redis
+        return cls(redis.Redis.from_url(url))
+
+    def version(self, scope: str) -> int:
+        return int(self.client.get(f"{self.prefix}:ver:{scope}") or 0)
+
+    def bump(self, scope: str):
+        self.client.incr(f"{self.prefix}:ver:{scope}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(f"{self.prefix}:{key}")
+
+    def set(self, key: str, data: bytes, ttl: int):
+        self.client.set(f"{self.prefix}:{key}", data, ex=ttl)
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+_adapters: Dict[Type[BaseModel], TypeAdapter] = {}
+
+def model_list_response(schema: Type[BaseModel], objects: Iterable) -> Response:
+    """
+    按响应模型把ORM对象列表序列化成JSON响应
+    """
+    adapter = _adapters.get(schema)
+    if adapter is None:
+        adapter = _adapters[schema] = TypeAdapter(List[schema])
+    items = adapter.validate_python(list(objects), from_attributes=True)
+    return Response(adapter.dump_json(items), media_type="application/json")
+
+class ResponseCache:
+    """
+    按用户缓存GET列表接口的响应，支持ETag/If-None-Match
+    写操作按(用户, 资源)精确失效，其他用户和其他资源的缓存不受影响；ttl兜底其他进程写入造成的不一致
+    """
+
+    def __init__(self, backend, ttl: int = 300, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+
+    def _scope(self, user_id: int, resource: str) -> str:
+        return f"{user_id}:{resource}"
+
+    def invalidate(self, user_id: int, *resources: str):
+        for resource in resources:
+            try:
+                self.backend.bump(self._scope(user_id, resource))
+            except Exception as e:
+                print(f"Error invalidating response cache: {str(e)}")
+
+    def respond(self, request: Request, user_id: int, resource: str, build: Callable[[], Response]) -> Response:
+        """
+        命中缓存时直接返回缓存的响应体，客户端的If-None-Match与ETag一致时返回304；
+        未命中时调用build生成响应并缓存，只缓存200响应
+        """
+        if not self.enabled:
+            return build()
+
+        entry, key = self._lookup(user_id, resource, request)
+        if entry is None:
+            response = build()
+            if response.status_code != 200:
+                return response
+            entry = self._store(key, response)
+        return self._respond_with(request, entry)
+
+    async def respond_async(self, request: Request, user_id: int, resource: str,
+                            build: Callable[[], Awaitable[Response]]) -> Response:
+        """
+        respond的异步版本，build是生成响应的协程函数
+        """
+        if not self.enabled:
+            return await build()
+
+        entry, key = self._lookup(user_id, resource, request)
+        if entry is None:
+            response = await build()
+            if response.status_code != 200:
+                return response
+            entry = self._store(key, response)
+        return self._respond_with(request, entry)
+
+    def _respond_with(self, request: Request, entry: CachedResponse) -> Response:
+        headers = dict(entry.headers, ETag=entry.etag)
+        headers["Cache-Control"] = "private, no-cache"
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(entry.body, media_type=entry.media_type, headers=headers)
+
+    def _lookup(self, user_id: int, resource: str, request: Request) -> Tuple[Optional[CachedResponse], Optional[str]]:
+        try:
+            version = self.backend.version(self._scope(user_id, resource))
+            key = f"{self._scope(user_id, resource)}:{version}:{request.url.path}?{request.url.query}"
+            data = self.backend.get(key)
+            return (CachedResponse.loads(data) if data is not None else None), key
+        except Exception as e:
+            # 缓存不可用时直接查询数据库
+            print(f"Error reading response cache: {str(e)}")
+            return None, None
+
+    def _store(self, key: Optional[str], response: Response) -> CachedResponse:
+        entry = CachedResponse(
+            _etag(response.body),
+            response.media_type or "application/json",
+            {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers},
+            response.body
+        )
+        if key is not None:
+            try:
+                self.backend.set(key, entry.dumps(), self.ttl)
+            except Exception as e:
+                print(f"Error writing response cache: {str(e)}")
+        return entry
+
+def create_response_cache(settings: Settings) -> ResponseCache:
+    """
+    根据配置创建响应缓存，response_cache_backend为off时不缓存
+    """
+    backend_name = settings.response_cache_backend
+    if backend_name == "redis":
+        backend = RedisCacheBackend.from_url(settings.redis_url)
+    else:
+        backend = MemoryCacheBackend(settings.response_cache_max_entries)
+    return ResponseCache(backend, ttl=settings.response_cache_ttl, enabled=backend_name != "off")
+
+# 全局响应缓存实例
+response_cache = create_response_cache(get_settings())
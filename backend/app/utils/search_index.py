@@ -0,0 +1,266 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import CrawlResult
+from app.utils.bigrams import BIGRAM_FUNCTION, WORD_RUN_PATTERN, register_bigram_function
+
+FTS_TABLE = "crawl_results_fts"
+# trigram索引查不了不足3个字符的词，两个字的词（中文词很常见）另建一个二元组索引；
+# 只存倒排索引（content=''、detail=none），不存正文和词位置
+BIGRAM_TABLE = "crawl_results_bigrams"
+BIGRAM_CHARS = 2
+# 命中超过这么多条结果的两字词太常见，按抓取时间倒序逐条LIKE很快就能凑够一页，不查二元组索引
+BIGRAM_MAX_CANDIDATES = 2000
+
+# trigram分词器不依赖空格切词，中文也能按子串检索；SQLite 3.34之前没有它，退回unicode61
+TRIGRAM_MIN_SQLITE = (3, 34, 0)
+TRIGRAM_MIN_CHARS = 3
+
+# 标题命中的权重高于正文
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+SNIPPET_TOKENS = 16
+SNIPPET_CHARS = 60
+
+TRIGGERS = (
+    f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON crawl_results BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END""",
+    f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON crawl_results BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        END""",
+    # 只在标题或正文变化时同步，更新摘要等字段不会触碰全文索引
+    f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, content ON crawl_results BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END""",
+)
+
+BIGRAM_TRIGGERS = (
+    f"""
+        CREATE TRIGGER IF NOT EXISTS {BIGRAM_TABLE}_ai AFTER INSERT ON crawl_results BEGIN
+            INSERT INTO {BIGRAM_TABLE}(rowid, terms) VALUES (new.id, {BIGRAM_FUNCTION}(new.title, new.content));
+        END""",
+    # 不存内容的FTS5表删除时要提供原来的分词内容，二元组由旧的标题和正文重新计算
+    f"""
+        CREATE TRIGGER IF NOT EXISTS {BIGRAM_TABLE}_ad AFTER DELETE ON crawl_results BEGIN
+            INSERT INTO {BIGRAM_TABLE}({BIGRAM_TABLE}, rowid, terms)
+                VALUES ('delete', old.id, {BIGRAM_FUNCTION}(old.title, old.content));
+        END""",
+    f"""
+        CREATE TRIGGER IF NOT EXISTS {BIGRAM_TABLE}_au AFTER UPDATE OF title, content ON crawl_results BEGIN
+            INSERT INTO {BIGRAM_TABLE}({BIGRAM_TABLE}, rowid, terms)
+                VALUES ('delete', old.id, {BIGRAM_FUNCTION}(old.title, old.content));
+            INSERT INTO {BIGRAM_TABLE}(rowid, terms) VALUES (new.id, {BIGRAM_FUNCTION}(new.title, new.content));
+        END""",
+)
+
+def _sqlite_version(connection) -> tuple:
+    version = connection.execute(text("SELECT sqlite_version()")).scalar()
+    return tuple(int(part) for part in version.split("."))
+
+def _tokenizer(connection) -> str:
+    return "trigram" if _sqlite_version(connection) >= TRIGRAM_MIN_SQLITE else "unicode61"
+
+def create_search_index(engine: Engine) -> bool:
+    """
+    创建crawl_results的FTS5外部内容索引和同步触发器，可以重复调用
+    新建索引时从已有数据重建；非SQLite数据库直接跳过，返回是否可用
+    trigram分词时再建两字词的二元组索引，它的触发器调用search_bigrams函数，
+    所以引擎的每个连接都要注册该函数（configure_sqlite配置过的引擎已经注册）
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    if not event.contains(engine, "connect", _register_functions):
+        event.listen(engine, "connect", _register_functions)
+
+    with engine.begin() as connection:
+        register_bigram_function(connection.connection.dbapi_connection)
+        tables = _search_tables(connection)
+        if FTS_TABLE not in tables:
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                f"title, content, content='crawl_results', content_rowid='id', tokenize='{_tokenizer(connection)}')"
+            ))
+        for trigger in TRIGGERS:
+            connection.execute(text(trigger))
+        if FTS_TABLE not in tables:
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+        if _fts_tokenizer(_search_tables(connection)) != "trigram":
+            return True
+        if BIGRAM_TABLE not in tables:
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE {BIGRAM_TABLE} USING fts5("
+                f"terms, content='', detail=none, tokenize='unicode61 remove_diacritics 0')"
+            ))
+        for trigger in BIGRAM_TRIGGERS:
+            connection.execute(text(trigger))
+        if BIGRAM_TABLE not in tables:
+            connection.execute(text(
+                f"INSERT INTO {BIGRAM_TABLE}(rowid, terms) "
+                f"SELECT id, {BIGRAM_FUNCTION}(title, content) FROM crawl_results"
+            ))
+    return True
+
+def _register_functions(dbapi_connection, connection_record):
+    register_bigram_function(dbapi_connection)
+
+def _search_tables(db) -> Dict[str, str]:
+    """
+    已创建的检索表及其建表语句
+    """
+    rows = db.execute(
+        text("SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name IN (:fts, :bigrams)"),
+        {"fts": FTS_TABLE, "bigrams": BIGRAM_TABLE}
+    ).all()
+    return {row.name: row.sql or "" for row in rows}
+
+def _fts_tokenizer(tables: Dict[str, str]) -> str:
+    return "trigram" if "trigram" in tables.get(FTS_TABLE, "") else "unicode61"
+
+def _terms(query: str) -> List[str]:
+    return [term for term in re.split(r"\s+", query.strip()) if term]
+
+def _match_expression(terms: List[str]) -> str:
+    """
+    每个词都作为短语加引号，用户输入里的FTS5语法字符不会被解释
+    """
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+def _make_snippet(content: Optional[str], terms: List[str]) -> Optional[str]:
+    """
+    LIKE查询没有snippet()可用，在第一个命中的词附近截一段正文
+    """
+    if not content:
+        return None
+    lowered = content.lower()
+    positions = [lowered.find(term.lower()) for term in terms]
+    positions = [position for position in positions if position >= 0]
+    if not positions:
+        return content[:SNIPPET_CHARS * 2]
+    start = max(min(positions) - SNIPPET_CHARS, 0)
+    snippet = content[start:start + SNIPPET_CHARS * 2]
+    for term in terms:
+        snippet = re.sub(re.escape(term), lambda m: f"{SNIPPET_START}{m.group(0)}{SNIPPET_END}", snippet, flags=re.IGNORECASE)
+    return ("…" if start else "") + snippet
+
+SEARCH_HIT_COLUMNS = ("id", "title", "url", "summary", "keyword_matched", "site_id", "task_id", "published_at", "crawled_at")
+
+RESULT_COLUMNS = """
+    r.id, r.title, r.url, r.summary, r.keyword_matched, r.site_id, r.task_id, r.published_at, r.crawled_at
+"""
+
+def search_results(
+    db: Session,
+    user_id: int,
+    query: str,
+    limit: int = 20,
+    task_id: Optional[int] = None,
+    site_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    在当前用户的结果中全文检索标题和正文，按bm25相关度排序并返回命中片段
+    trigram分词下不足3个字符的词查不了trigram索引：不常见的两字词先在二元组索引中取出候选结果，
+    常见的两字词、单个字或带标点的短词用LIKE过滤；全是短词时按抓取时间倒序返回
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+    if db.get_bind().dialect.name != "sqlite":
+        return _search_like(db, user_id, terms, limit, task_id, site_id)
+
+    filters = ""
+    params: Dict[str, Any] = {"user_id": user_id, "limit": limit}
+    if task_id is not None:
+        filters += " AND r.task_id = :task_id"
+        params["task_id"] = task_id
+    if site_id is not None:
+        filters += " AND r.site_id = :site_id"
+        params["site_id"] = site_id
+
+    match_terms = terms
+    user_filter = "r.user_id = :user_id"
+    tables = _search_tables(db)
+    if _fts_tokenizer(tables) == "trigram":
+        match_terms = [term for term in terms if len(term) >= TRIGRAM_MIN_CHARS]
+        short_terms = [term for term in terms if len(term) < TRIGRAM_MIN_CHARS]
+        bigram_terms = [term for term in short_terms if BIGRAM_TABLE in tables and _is_selective_bigram(db, term)]
+        if bigram_terms:
+            params["bigrams"] = _match_expression(bigram_terms)
+            filters += f" AND r.id IN (SELECT rowid FROM {BIGRAM_TABLE} WHERE {BIGRAM_TABLE} MATCH :bigrams)"
+            if not match_terms:
+                # 候选结果不多，按主键逐条读取后排序；+号让SQLite不去遍历该用户的索引
+                user_filter = "+r.user_id = :user_id"
+        for i, term in enumerate(term for term in short_terms if term not in bigram_terms):
+            params[f"term{i}"] = f"%{term}%"
+            filters += f" AND (r.title LIKE :term{i} OR r.content LIKE :term{i})"
+
+    if not match_terms:
+        rows = db.execute(text(f"""
+            SELECT {RESULT_COLUMNS}, r.content AS content, NULL AS rank
+            FROM crawl_results r
+            WHERE {user_filter}{filters}
+            ORDER BY r.crawled_at DESC, r.id DESC
+            LIMIT :limit
+        """), params).mappings().all()
+        return [_hit(row, _make_snippet(row["content"], terms)) for row in rows]
+
+    params["match"] = _match_expression(match_terms)
+    rows = db.execute(text(f"""
+        SELECT {RESULT_COLUMNS},
+            snippet({FTS_TABLE}, 1, '{SNIPPET_START}', '{SNIPPET_END}', '…', {SNIPPET_TOKENS}) AS snippet,
+            bm25({FTS_TABLE}, {TITLE_WEIGHT}, {CONTENT_WEIGHT}) AS rank
+        FROM {FTS_TABLE} JOIN crawl_results r ON r.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH :match AND r.user_id = :user_id{filters}
+        ORDER BY rank
+        LIMIT :limit
+    """), params).mappings().all()
+    return [_hit(row, row["snippet"]) for row in rows]
+
+def _is_selective_bigram(db: Session, term: str) -> bool:
+    """
+    两字词是否适合查二元组索引：只数到BIGRAM_MAX_CANDIDATES+1条为止，常见词也很快返回
+    """
+    if len(term) != BIGRAM_CHARS or not WORD_RUN_PATTERN.fullmatch(term):
+        return False
+    count = db.execute(text(f"""
+        SELECT count(*) FROM (
+            SELECT 1 FROM {BIGRAM_TABLE} WHERE {BIGRAM_TABLE} MATCH :term LIMIT :limit
+        )
+    """), {"term": _match_expression([term]), "limit": BIGRAM_MAX_CANDIDATES + 1}).scalar()
+    return count <= BIGRAM_MAX_CANDIDATES
+
+def _search_like(db: Session, user_id: int, terms: List[str], limit: int,
+                 task_id: Optional[int], site_id: Optional[int]) -> List[Dict[str, Any]]:
+    """
+    其他数据库没有FTS5，用ILIKE查询保证接口可用
+    """
+    query = db.query(CrawlResult).filter(CrawlResult.user_id == user_id)
+    if task_id is not None:
+        query = query.filter(CrawlResult.task_id == task_id)
+    if site_id is not None:
+        query = query.filter(CrawlResult.site_id == site_id)
+    for term in terms:
+        query = query.filter(CrawlResult.title.ilike(f"%{term}%") | CrawlResult.content.ilike(f"%{term}%"))
+    results = query.order_by(CrawlResult.crawled_at.desc(), CrawlResult.id.desc()).limit(limit).all()
+    return [
+        _hit({column: getattr(result, column) for column in SEARCH_HIT_COLUMNS}, _make_snippet(result.content, terms))
+        for result in results
+    ]
+
+def _hit(row, snippet: Optional[str]) -> Dict[str, Any]:
+    hit = {column: row[column] for column in SEARCH_HIT_COLUMNS}
+    hit["snippet"] = snippet
+    hit["rank"] = row.get("rank")
+    return hit
@@ -1,82 +1,420 @@
-import requests
+import asyncio
+import hashlib
+import json
 import os
-from typing import Optional
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import aiohttp
+import requests
+
+from app.config import get_settings
+
+SYSTEM_PROMPT = "你是一个文本摘要助手，能够用一句话简洁地总结文本内容。"
+# 送给模型的正文长度上限
+INPUT_CHARS = 1000
+# 短于此长度的文本不调用模型，直接作为摘要
+MIN_SUMMARY_INPUT = 50
+# 这些状态码视为暂时性错误，退避后重试
+RETRY_STATUSES = (408, 409, 429, 500, 502, 503, 504)
+
+def single_prompt(text: str, max_length: int) -> str:
+    return f"请用一句话总结以下内容，不超过{max_length}个字符：\n\n{text[:INPUT_CHARS]}"
+
+def batch_prompt(texts: Sequence[str], max_length: int) -> str:
+    """
+    一次请求总结多段文本：文本以JSON数组给出，要求模型按相同顺序返回JSON字符串数组
+    """
+    payload = json.dumps([text[:INPUT_CHARS] for text in texts], ensure_ascii=False)
+    return (
+        f"下面的JSON数组包含{len(texts)}段文本。请分别用一句话总结每段文本，每条摘要不超过{max_length}个字符，"
+        f"只返回一个与输入顺序相同、长度相同的JSON字符串数组，不要输出其他内容：\n\n{payload}"
+    )
+
+def parse_batch_reply(content: str, count: int) -> List[str]:
+    """
+    解析批量摘要的回复，格式不对时抛出ValueError
+    """
+    content = content.strip()
+    # 模型有时会用代码块包住JSON
+    if content.startswith("```"):
+        content = content.strip("`")
+        if content.startswith("json"):
+            content = content[4:]
+    summaries = json.loads(content)
+    if not isinstance(summaries, list) or len(summaries) != count:
+        raise ValueError(f"expected a JSON array of {count} summaries")
+    return [str(summary).strip() for summary in summaries]
 
 class TextSummarizer:
-    \"\"\"
+    """
     文本摘要生成器
     使用本地或远程AI模型生成一句话摘要
-    \"\"\"
-    
+    """
+
     def __init__(self):
         # 尝试使用环境变量中的API密钥，或使用本地模型
-        self.api_key = os.getenv(\"OPENAI_API_KEY\")  # 支持OpenAI API
-        self.base_url = os.getenv(\"OPENAI_BASE_URL\", \"https://api.openai.com/v1\")
-    
+        self.api_key = os.getenv("OPENAI_API_KEY")  # 支持OpenAI API
+        self.base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+        # 复用连接，避免每次调用都重新建立TCP/TLS连接
+        self._session = requests.Session()
+
     def summarize_text(self, text: str, max_length: int = 100) -> Optional[str]:
-        \"\"\"
+        """
         对文本进行摘要
-        \"\"\"
-        if len(text) < 50:
+        """
+        if len(text) < MIN_SUMMARY_INPUT:
             # 如果文本太短，直接返回
             return text[:max_length]
-        
+
         # 截取文本的前1000个字符作为摘要输入
-        input_text = text[:1000]
-        
+        input_text = text[:INPUT_CHARS]
+
         try:
             # 这里我们使用简单的启发式方法作为占位符
             # 在实际部署中，可以替换为真实的AI模型调用
             sentences = input_text.split('。')
             if len(sentences) > 1:
-                return sentences[0].strip() + \"。\" if sentences[0].strip().endswith('。') else sentences[0].strip() + \"...\"
-            
+                return sentences[0].strip() + "。" if sentences[0].strip().endswith('。') else sentences[0].strip() + "..."
+
             # 如果没有句号，按逗号分割
             sentences = input_text.split('，')
             if len(sentences) > 1:
-                return sentences[0].strip() + \"...\"
-            
+                return sentences[0].strip() + "..."
+
             # 如果都没有，返回前50个字符
-            return input_text[:50] + \"...\" if len(input_text) > 50 else input_text
+            return input_text[:50] + "..." if len(input_text) > 50 else input_text
         except Exception as e:
-            print(f\"Error summarizing text: {str(e)}\")
-            return input_text[:50] + \"...\" if len(input_text) > 50 else input_text
+            print(f"Error summarizing text: {str(e)}")
+            return input_text[:50] + "..." if len(input_text) > 50 else input_text
 
     def summarize_with_openai(self, text: str, max_length: int = 100) -> Optional[str]:
-        \"\"\"
+        """
         使用OpenAI API进行摘要（如果配置了API密钥）
-        \"\"\"
+        """
         if not self.api_key:
             return self.summarize_text(text, max_length)
-        
+
+        settings = get_settings()
         try:
             headers = {
-                \"Content-Type\": \"application/json\",
-                \"Authorization\": f\"Bearer {self.api_key}\"
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.api_key}"
             }
-            
-            prompt = f\"请用一句话总结以下内容，不超过{max_length}个字符：\\n\\n{text[:1000]}\"
-            
+
             data = {
-                \"model\": \"gpt-3.5-turbo\",
-                \"messages\": [
-                    {\"role\": \"system\", \"content\": \"你是一个文本摘要助手，能够用一句话简洁地总结文本内容。\"},
-                    {\"role\": \"user\", \"content\": prompt}
+                "model": settings.summary_model,
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": single_prompt(text, max_length)}
                 ],
-                \"max_tokens\": 100,
-                \"temperature\": 0.3
+                "max_tokens": 100,
+                "temperature": 0.3
             }
-            
-            response = requests.post(f\"{self.base_url}/chat/completions\", headers=headers, json=data)
+
+            response = self._session.post(f"{self.base_url}/chat/completions", headers=headers, json=data,
+                                          timeout=settings.summary_timeout)
             response.raise_for_status()
-            
+
             result = response.json()
             summary = result['choices'][0]['message']['content'].strip()
             return summary
         except Exception as e:
-            print(f\"Error calling OpenAI API: {str(e)}\")
+            print(f"Error calling OpenAI API: {str(e)}")
             # 如果API调用失败，回退到本地方法
             return self.summarize_text(text, max_length)
 
 # 全局实例
-summarizer = TextSummarizer()
\ No newline at end of file
+summarizer = TextSummarizer()
+
+class SummaryCache:
+    """
+    基于SQLite的摘要缓存
+    以 模型+长度上限+正文 的哈希为键，不同网站转载的同一篇文章、多次运行抓到的同一篇文章只调用一次模型
+    """
+
+    def __init__(self, path: str = "summary_cache.db", max_entries: int = 100000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS summary_cache (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_summary_cache_created_at ON summary_cache (created_at)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM summary_cache").fetchone()[0]
+
+    @staticmethod
+    def key(text: str, max_length: int, model: str) -> str:
+        digest = hashlib.sha256(f"{model}\0{max_length}\0{text[:INPUT_CHARS]}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, str]:
+        found = {}
+        with self._lock:
+            # 分批查询，避免超过SQLite的参数个数上限
+            for start in range(0, len(keys), 500):
+                chunk = list(keys[start:start + 500])
+                placeholders = ",".join("?" * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT key, summary FROM summary_cache WHERE key IN ({placeholders})", chunk
+                ).fetchall())
+        return found
+
+    def put_many(self, items: Dict[str, str]):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO summary_cache (key, summary, created_at) VALUES (?, ?, ?)",
+                [(key, summary, now) for key, summary in items.items()]
+            )
+            self._count += self._conn.total_changes - before
+            if self._count > self.max_entries:
+                # 淘汰最早写入的条目
+                self._conn.execute(
+                    "DELETE FROM summary_cache WHERE key IN "
+                    "(SELECT key FROM summary_cache ORDER BY created_at LIMIT ?)",
+                    (self._count - self.max_entries,)
+                )
+                self._count = self.max_entries
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_summary_cache: Optional[SummaryCache] = None
+_summary_cache_lock = threading.Lock()
+
+def get_summary_cache(path: str, max_entries: int) -> SummaryCache:
+    """
+    获取进程内共享的摘要缓存实例
+    """
+    global _summary_cache
+    with _summary_cache_lock:
+        if _summary_cache is None:
+            _summary_cache = SummaryCache(path, max_entries)
+        return _summary_cache
+
+class SummaryService:
+    """
+    异步摘要服务
+    复用aiohttp连接池并限制同时进行的请求数；多段文本合并成一次请求，暂时性错误按指数退避重试，
+    结果写入摘要缓存。没有配置API密钥或请求最终失败时回退到本地启发式摘要（不写入缓存）。
+    与AsyncFetcher一样在一次运行的事件循环内使用：async with SummaryService(...) as service
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://api.openai.com/v1",
+                 model: str = "gpt-3.5-turbo", max_concurrency: int = 4, batch_size: int = 8,
+                 timeout: float = 30, max_retries: int = 3, backoff: float = 0.5,
+                 cache: Optional[SummaryCache] = None, local: TextSummarizer = summarizer):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.cache = cache
+        self.local = local
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+        # 正在生成的摘要，并发的相同文本等待同一个结果
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 统计
+        self.requests = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.failures = 0
+
+    @classmethod
+    def from_settings(cls, settings=None) -> "SummaryService":
+        settings = settings or get_settings()
+        cache = None
+        if settings.summary_cache_enabled:
+            cache = get_summary_cache(settings.summary_cache_path, settings.summary_cache_max_entries)
+        return cls(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            model=settings.summary_model,
+            max_concurrency=settings.summary_max_concurrency,
+            batch_size=settings.summary_batch_size,
+            timeout=settings.summary_timeout,
+            max_retries=settings.summary_max_retries,
+            cache=cache
+        )
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        if self._session is None and self.api_key:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def summarize(self, text: str, max_length: int = 100) -> str:
+        return (await self.summarize_many([text], max_length))[0]
+
+    async def summarize_many(self, texts: Sequence[str], max_length: int = 100,
+                             fallback: bool = True) -> List[Optional[str]]:
+        """
+        为一组文本生成摘要，返回顺序与输入相同
+        接口调用失败的文本默认回退到本地摘要；fallback=False时对应位置返回None，由调用方决定是否稍后重试
+        """
+        if not self.api_key:
+            return [self.local.summarize_text(text, max_length) for text in texts]
+
+        summaries: List[Optional[str]] = [None] * len(texts)
+        keys: Dict[int, str] = {}
+        for i, text in enumerate(texts):
+            if len(text) < MIN_SUMMARY_INPUT:
+                summaries[i] = text[:max_length]
+            else:
+                keys[i] = SummaryCache.key(text, max_length, self.model)
+
+        # SQLite缓存的读写在线程池中执行，不阻塞事件循环
+        cached = await asyncio.to_thread(self.cache.get_many, list(set(keys.values()))) if self.cache and keys else {}
+        waiting: Dict[str, asyncio.Future] = {}
+        owned: Dict[str, str] = {}
+        for i, key in keys.items():
+            if key in cached:
+                self.cache_hits += 1
+            elif key in self._inflight:
+                waiting[key] = self._inflight[key]
+            elif key not in owned:
+                owned[key] = texts[i]
+                self._inflight[key] = asyncio.get_running_loop().create_future()
+
+        owned_keys = list(owned)
+        batches = [owned_keys[start:start + self.batch_size] for start in range(0, len(owned_keys), self.batch_size)]
+        results = dict(cached)
+        try:
+            await asyncio.gather(*[
+                self._summarize_batch(batch, [owned[key] for key in batch], max_length) for batch in batches
+            ])
+        finally:
+            for key in owned_keys:
+                future = self._inflight.pop(key)
+                # 出现意外异常时也不能让等待者一直挂起
+                if not future.done():
+                    future.set_result(None)
+                results[key] = future.result()
+        for key, future in waiting.items():
+            results[key] = await future
+
+        for i, key in keys.items():
+            summary = results.get(key)
+            if summary is None and fallback:
+                summary = self.local.summarize_text(texts[i], max_length)
+            summaries[i] = summary
+        return summaries
+
+    async def _summarize_batch(self, keys: List[str], texts: List[str], max_length: int):
+        """
+        一次请求总结一批文本；回复无法按数组解析时拆成单条请求
+        """
+        summaries: Optional[List[str]] = None
+        try:
+            if len(texts) == 1:
+                summaries = [await self._complete(single_prompt(texts[0], max_length), max_tokens=100)]
+            else:
+                reply = await self._complete(batch_prompt(texts, max_length), max_tokens=100 * len(texts))
+                try:
+                    summaries = parse_batch_reply(reply, len(texts))
+                except ValueError as e:
+                    print(f"Unexpected batch summary reply, retrying one by one: {str(e)}")
+                    await asyncio.gather(*[
+                        self._summarize_batch([key], [text], max_length) for key, text in zip(keys, texts)
+                    ])
+                    return
+        except Exception as e:
+            self.failures += len(texts)
+            print(f"Error calling summary API: {str(e)}")
+
+        for i, key in enumerate(keys):
+            future = self._inflight.get(key)
+            if future is not None and not future.done():
+                future.set_result(summaries[i] if summaries is not None else None)
+        if summaries is not None and self.cache is not None:
+            try:
+                await asyncio.to_thread(self.cache.put_many, dict(zip(keys, summaries)))
+            except Exception as e:
+                # 缓存写入失败不影响本次摘要
+                print(f"Error writing summary cache: {str(e)}")
+
+    async def _complete(self, prompt: str, max_tokens: int) -> str:
+        """
+        调用chat/completions接口，暂时性错误按指数退避加随机抖动重试，服务端给出Retry-After时按其等待
+        """
+        data = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": max_tokens,
+            "temperature": 0.3
+        }
+        attempt = 0
+        while True:
+            retry_after: Optional[float] = None
+            try:
+                async with self._semaphore:
+                    self.requests += 1
+                    async with self._session.post(f"{self.base_url}/chat/completions", json=data) as response:
+                        if response.status not in RETRY_STATUSES:
+                            response.raise_for_status()
+                            result = await response.json(content_type=None)
+                            return result['choices'][0]['message']['content'].strip()
+                        error = f"HTTP {response.status}"
+                        retry_after = _retry_after(response.headers.get("Retry-After"))
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                error = f"{type(e).__name__}: {e}"
+            if attempt >= self.max_retries:
+                raise RuntimeError(f"summary request failed after {attempt + 1} attempts: {error}")
+            delay = retry_after if retry_after is not None else self.backoff * (2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, self.backoff))
+            attempt += 1
+            self.retries += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "failures": self.failures
+        }
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return min(float(value), 60.0) if value else None
+    except ValueError:
+        return None
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.config import get_settings
+from app.models import User
+
+class TokenCache:
+    """
+    已验证的访问令牌到用户的缓存，条目数有上限并按LRU淘汰
+    条目在ttl和令牌本身的过期时间中较早的一个到期，用户被修改或删除时按用户ID失效
+    缓存的User对象已从会话中分离，只能读取属性
+    """
+
+    def __init__(self, ttl: float = 60, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= time.time():
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+            return user
+
+    def put(self, token: str, user: User, token_expires_at: Optional[float] = None):
+        if self.max_entries <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = (user, expires_at)
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry[0].id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry[0].id]
+
+settings = get_settings()
+token_cache = TokenCache(ttl=settings.auth_cache_ttl, max_entries=settings.auth_cache_max_entries)
+
+# 用户在会话中被修改或删除时先记下ID，提交后再失效，避免提交前有请求把旧数据重新放进缓存
+_PENDING_KEY = "token_cache_invalidate"
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _remember_changed_user(mapper, connection, target: User):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+    else:
+        token_cache.invalidate_user(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        token_cache.invalidate_user(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,55 @@
+"""
+认证开销基准测试：对比每个请求解码JWT并查询用户，与命中令牌缓存时get_current_user的耗时
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.bench_auth --requests 5000
+使用临时SQLite数据库，不影响配置中的数据库。
+"""
+import argparse
+import os
+import tempfile
+import time
+
+def measure(name: str, func, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        func()
+    elapsed = (time.perf_counter() - started) / requests
+    print(f"{name:<16} {elapsed * 1e6:10.1f} us/请求")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="认证开销基准测试")
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    # 数据库引擎在导入时创建，必须先设置好数据库地址
+    directory = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'bench_auth.db')}"
+    from datetime import timedelta
+
+    from app.database import SessionLocal
+    from app.database_init import init_db
+    from app.models import User
+    from app.utils import create_access_token, get_current_user
+    from app.utils.token_cache import token_cache
+
+    init_db()
+    db = SessionLocal()
+    db.add(User(email='bench@example.com', hashed_password='x'))
+    db.commit()
+    db.close()
+    token = create_access_token({"sub": 'bench@example.com'}, expires_delta=timedelta(minutes=30))
+
+    def uncached():
+        token_cache.clear()
+        get_current_user(token)
+
+    print(f"{args.requests} 次认证")
+    miss = measure('未命中缓存', uncached, args.requests)
+    get_current_user(token)
+    hit = measure('命中缓存', lambda: get_current_user(token), args.requests)
+    print(f"命中缓存时的耗时为未命中的 {hit / miss:.1%}")
+
+if __name__ == "__main__":
+    main()
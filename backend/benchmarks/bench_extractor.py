@@ -0,0 +1,102 @@
+"""
+正文提取基准测试：对比整个body的文本(body)和正文块提取(readability)的提取耗时、每篇文章保存的字节数
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.bench_extractor --corpus /path/to/saved/pages
+    python -m benchmarks.bench_extractor --pages 200
+不指定 --corpus 时生成一组带导航、侧栏、相关阅读、评论和页脚的模拟新闻页面，
+这时已知每篇文章的正文段落，还会给出保存内容中正文之外的文字占比。
+保存字节数按 crawler_content_max_chars 截断后的UTF-8字节计算，与实际入库的内容一致。
+"""
+import argparse
+import random
+import time
+from typing import List, Optional, Tuple
+
+from app.config import get_settings
+from app.crawler.extractor import extract_article
+from app.crawler.parser import available_backends, parse_html
+from benchmarks.bench_parser import load_corpus
+
+WORDS = ['经济', '科技', '政策', '市场', '发布', '数据', '增长', '企业', '投资', '消费', 'python', 'AI']
+
+def sentence(rng: random.Random, words: int) -> str:
+    return '，'.join(''.join(rng.choice(WORDS) for _ in range(5)) for _ in range(words // 5)) + '。'
+
+def build_corpus(count: int, seed: int = 0) -> List[Tuple[bytes, List[str]]]:
+    """
+    生成模拟新闻页面，返回 (页面, 正文段落列表)
+    """
+    rng = random.Random(seed)
+    pages = []
+    for i in range(count):
+        paragraphs = [sentence(rng, rng.randint(20, 80)) for _ in range(rng.randint(3, 12))]
+        nav = ''.join(f'<li><a href="/c/{j}">栏目{j}</a></li>' for j in range(40))
+        sidebar = ''.join(f'<li><a href="/hot/{j}">{sentence(rng, 10)}</a></li>' for j in range(20))
+        related = ''.join(f'<li><a href="/r/{j}">{sentence(rng, 10)}</a></li>' for j in range(10))
+        comments = ''.join(f'<div class="comment"><span>网友{j}</span><p>{sentence(rng, 15)}</p></div>' for j in range(8))
+        body = ''.join(f'<p>{paragraph}</p>' for paragraph in paragraphs)
+        html = (
+            f'<html><head><title>文章{i}_财经_示例网</title><script>var x = {i};</script>'
+            f'<style>.a{{color:red}}</style></head><body>'
+            f'<div class="top-bar"><a href="/">首页</a> | <a href="/login">登录</a></div>'
+            f'<nav><ul>{nav}</ul></nav><div class="container"><div class="main">'
+            f'<h1>文章{i}</h1><div class="meta">来源：示例网 2024-0{i % 9 + 1}-1{i % 10} 08:00</div>'
+            f'<div class="article-body">{body}<div class="share">分享到：<a>微博</a><a>微信</a></div></div>'
+            f'<div class="related"><h3>相关阅读</h3><ul>{related}</ul></div>'
+            f'<div class="comments">{comments}</div></div>'
+            f'<div class="sidebar"><h3>热门</h3><ul>{sidebar}</ul></div></div>'
+            f'<div class="footer">关于我们 | 联系方式 | 版权所有 © 示例网</div></body></html>'
+        )
+        pages.append((html.encode('utf-8'), paragraphs))
+    return pages
+
+def extract(content: bytes, backend: str, extractor: str, limit: int) -> str:
+    page = parse_html(content, backend)
+    if extractor == 'readability':
+        return extract_article(page, limit=limit).content
+    page.title()
+    page.published_text()
+    return page.body_text(limit=limit)
+
+def run(pages: List[Tuple[bytes, Optional[List[str]]]], backend: str, extractor: str, limit: int, repeat: int):
+    elapsed = 0.0
+    stored = 0
+    boilerplate_chars = 0
+    total_chars = 0
+    for _ in range(repeat):
+        for content, paragraphs in pages:
+            start = time.perf_counter()
+            text = extract(content, backend, extractor, limit)
+            elapsed += time.perf_counter() - start
+            stored += len(text.encode('utf-8'))
+            if paragraphs is not None:
+                article_chars = sum(len(paragraph) for paragraph in paragraphs if paragraph in text)
+                total_chars += len(text)
+                boilerplate_chars += max(len(text) - article_chars, 0)
+    count = len(pages) * repeat
+    boilerplate = boilerplate_chars / total_chars * 100 if total_chars else None
+    return elapsed / count * 1000, stored / count, boilerplate
+
+def main():
+    parser = argparse.ArgumentParser(description='正文提取基准测试')
+    parser.add_argument('--corpus', help='保存的HTML页面目录')
+    parser.add_argument('--pages', type=int, default=100, help='生成的模拟页面数')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--limit', type=int, default=get_settings().crawler_content_max_chars)
+    args = parser.parse_args()
+
+    if args.corpus:
+        pages = [(content, None) for content in load_corpus(args.corpus)]
+    else:
+        pages = build_corpus(args.pages)
+    print(f"pages={len(pages)} bytes={sum(len(content) for content, _ in pages)} limit={args.limit} repeat={args.repeat}")
+    print(f"{'backend':<12} {'extractor':<12} {'ms/page':>8} {'bytes/article':>14} {'boilerplate %':>14}")
+    for backend in available_backends():
+        for extractor in ('body', 'readability'):
+            ms, stored, boilerplate = run(pages, backend, extractor, args.limit, args.repeat)
+            share = f"{boilerplate:.1f}" if boilerplate is not None else 'n/a'
+            print(f"{backend:<12} {extractor:<12} {ms:>8.2f} {stored:>14.0f} {share:>14}")
+
+if __name__ == '__main__':
+    main()
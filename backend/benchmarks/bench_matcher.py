@@ -0,0 +1,79 @@
+"""
+关键词匹配基准测试：逐关键词 re.compile + find_all 与 Aho-Corasick 单次扫描对比
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.bench_matcher --keywords 50 --nodes 2000
+"""
+import argparse
+import random
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+from app.crawler.matcher import KeywordMatcher
+
+WORDS = ['python', 'crawler', 'monitor', 'news', 'report', 'market', 'policy', 'data',
+         '经济', '科技', '政策', '市场', '新闻', '发布', '数据', '报告']
+
+def build_page(nodes: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    items = []
+    for i in range(nodes):
+        text = ' '.join(rng.choice(WORDS) for _ in range(8))
+        items.append(f'<li><a href="/article/{i}"><span>{text}</span></a></li>')
+    return '<html><body><ul>' + ''.join(items) + '</ul></body></html>'
+
+def build_keywords(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    keywords = []
+    for i in range(count):
+        keywords.append((i, rng.choice(WORDS) + rng.choice(['', ' ', '']) + rng.choice(WORDS)))
+    return keywords
+
+def bench_regex(soup, keywords):
+    """原实现：每个关键词编译一次正则并完整遍历一次解析树"""
+    hits = 0
+    for _, keyword in keywords:
+        hits += len(soup.find_all(string=re.compile(keyword, re.IGNORECASE)))
+    return hits
+
+def bench_automaton(soup, matcher):
+    """新实现：遍历一次文本节点，自动机一次扫描找出所有关键词"""
+    hits = 0
+    for element in soup.find_all(string=True):
+        hits += len(matcher.find(element))
+    return hits
+
+def timed(func, *args, repeat: int = 3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description='关键词匹配基准测试')
+    parser.add_argument('--keywords', type=int, default=50)
+    parser.add_argument('--nodes', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    soup = BeautifulSoup(build_page(args.nodes), 'html.parser')
+    keywords = build_keywords(args.keywords)
+
+    build_time, matcher = timed(KeywordMatcher, keywords, repeat=1)
+    regex_time, regex_hits = timed(bench_regex, soup, keywords, repeat=args.repeat)
+    automaton_time, automaton_hits = timed(bench_automaton, soup, matcher, repeat=args.repeat)
+
+    print(f"keywords={args.keywords} text_nodes={args.nodes}")
+    print(f"automaton build:     {build_time * 1000:8.2f} ms")
+    print(f"regex per keyword:   {regex_time * 1000:8.2f} ms  hits={regex_hits}")
+    print(f"aho-corasick:        {automaton_time * 1000:8.2f} ms  hits={automaton_hits}")
+    print(f"speedup:             {regex_time / automaton_time:8.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+HTML解析后端基准测试：对比各后端的解析耗时、正文提取耗时和峰值内存
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.bench_parser --corpus /path/to/saved/pages
+不指定 --corpus 时生成一组模拟新闻页面。每个后端在独立子进程中运行，
+峰值内存取子进程的最大常驻内存（RSS）增量，包含C扩展分配的内存。
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import random
+import resource
+import time
+from typing import List
+
+from app.crawler.parser import available_backends, parse_html
+
+def build_corpus(count: int = 50, seed: int = 0) -> List[bytes]:
+    rng = random.Random(seed)
+    words = ['经济', '科技', '政策', '市场', 'python', 'crawler', 'news', 'report', '发布', '数据']
+    pages = []
+    for i in range(count):
+        nav = ''.join(f'<li><a href="/c/{j}">栏目{j}</a></li>' for j in range(50))
+        paragraphs = ''.join(
+            '<p>' + ''.join(rng.choice(words) for _ in range(200)) + '</p>' for _ in range(30)
+        )
+        pages.append((
+            f'<html><head><title>文章{i}</title><script>var x = {i};</script></head>'
+            f'<body><nav><ul>{nav}</ul></nav><article><h1>标题{i}</h1>'
+            f'<span class="pub-date">2024-01-0{i % 9 + 1}</span>{paragraphs}</article>'
+            f'<footer>版权所有</footer></body></html>'
+        ).encode('utf-8'))
+    return pages
+
+def load_corpus(path: str) -> List[bytes]:
+    pages = []
+    for filename in sorted(glob.glob(os.path.join(path, '**', '*.htm*'), recursive=True)):
+        with open(filename, 'rb') as f:
+            pages.append(f.read())
+    return pages
+
+def run_backend(backend: str, pages: List[bytes], repeat: int, queue):
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    parse_time = 0.0
+    extract_time = 0.0
+    chars = 0
+    for _ in range(repeat):
+        for content in pages:
+            start = time.perf_counter()
+            page = parse_html(content, backend)
+            parsed = time.perf_counter()
+            chars += len(page.body_text())
+            page.title()
+            page.published_text()
+            for _text, _href in page.text_links():
+                pass
+            extract_time += time.perf_counter() - parsed
+            parse_time += parsed - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((backend, parse_time, extract_time, chars, rss_after - rss_before))
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML解析后端基准测试')
+    parser.add_argument('--corpus', help='保存的HTML页面目录')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus) if args.corpus else build_corpus()
+    total_bytes = sum(len(page) for page in pages)
+    print(f"pages={len(pages)} bytes={total_bytes} repeat={args.repeat}")
+    print(f"{'backend':<12} {'parse ms':>10} {'extract ms':>11} {'MB/s':>8} {'peak RSS KB':>12}")
+
+    context = multiprocessing.get_context('spawn')
+    for backend in available_backends():
+        queue = context.Queue()
+        process = context.Process(target=run_backend, args=(backend, pages, args.repeat, queue))
+        process.start()
+        name, parse_time, extract_time, _chars, rss = queue.get()
+        process.join()
+        throughput = total_bytes * args.repeat / (parse_time + extract_time) / 1024 / 1024
+        print(f"{name:<12} {parse_time * 1000:>10.1f} {extract_time * 1000:>11.1f} {throughput:>8.2f} {rss:>12}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+结果列表接口基准测试：对比加载完整ORM对象并经过响应模型校验的旧写法，
+与按fields=只查询需要的列、直接生成JSON的新写法，在每页耗时和响应体大小上的差异
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.bench_results_api --rows 20000 --limit 100
+数据写入内存中的SQLite数据库，正文长度与抓取时的上限一致。
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models, schemas
+from app.api.results import list_results, result_filters
+from app.config import get_settings
+from app.database import Base
+
+def build_session(rows: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    content_chars = get_settings().crawler_content_max_chars
+    start = datetime(2024, 1, 1)
+    session.bulk_insert_mappings(models.CrawlResult, [
+        {
+            'title': f'标题{i}', 'url': f'https://example.com/{i}', 'content': '正文' * (content_chars // 2),
+            'summary': '摘要' * 50, 'keyword_matched': 'python', 'site_id': 1, 'task_id': 1, 'user_id': 1,
+            'crawled_at': start + timedelta(seconds=i)
+        }
+        for i in range(rows)
+    ])
+    session.commit()
+    return session
+
+def full_objects(session, limit: int) -> bytes:
+    """
+    旧写法：完整ORM对象 -> 响应模型校验 -> JSON
+    """
+    results = session.query(models.CrawlResult).filter(*result_filters(1)).order_by(
+        models.CrawlResult.crawled_at.desc(), models.CrawlResult.id.desc()
+    ).limit(limit).all()
+    validated = [schemas.CrawlResultResponse.model_validate(result) for result in results]
+    session.expunge_all()
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False).encode('utf-8')
+
+def projected(session, limit: int, fields) -> bytes:
+    response = list_results(session, result_filters(1), None, limit, fields)
+    return response.body
+
+def measure(name: str, func, repeat: int):
+    body = func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{name:<28} {elapsed * 1000:8.2f} ms/页 {len(body) / 1024:10.1f} KB")
+    return elapsed, len(body)
+
+def main():
+    parser = argparse.ArgumentParser(description="结果列表字段投影基准测试")
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    session = build_session(args.rows)
+    print(f"{args.rows} 行，每页 {args.limit} 条，重复 {args.repeat} 次")
+    base_time, base_size = measure('完整对象+响应模型', lambda: full_objects(session, args.limit), args.repeat)
+    for name, fields in [('默认字段(不含content)', None), ('fields=title,url,summary', 'title,url,summary'),
+                         ('全部字段', ','.join(schemas.CrawlResultResponse.model_fields))]:
+        elapsed, size = measure(name, lambda: projected(session, args.limit, fields), args.repeat)
+        print(f"{'':<28} 耗时 {elapsed / base_time:6.1%}  大小 {size / base_size:6.1%}")
+
+if __name__ == "__main__":
+    main()
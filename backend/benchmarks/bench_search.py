@@ -0,0 +1,96 @@
+"""
+全文检索短词基准测试：trigram分词下不足3个字符的词（如两个字的中文词）无法走全文索引
+对比原实现（连接全文索引表，逐条检查当前用户的结果做LIKE）与新实现（不常见的两字词查二元组索引，
+常见的两字词仍按抓取时间倒序LIKE）在多用户数据上的每次查询耗时，以及从已有数据补建二元组索引的耗时
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.bench_search --users 10 --rows 3000
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import Base
+from app.utils.search_index import BIGRAM_TABLE, FTS_TABLE, RESULT_COLUMNS, create_search_index, search_results
+
+WORDS = ['经济', '科技', '政策', '市场', '新闻', '发布', '数据', '报告', '城市', '交通', '教育', '医疗']
+
+def build_session(path: str, users: int, rows: int, seed: int = 0):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    create_search_index(engine)
+    session = sessionmaker(bind=engine)()
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for user_id in range(1, users + 1):
+        session.bulk_insert_mappings(models.CrawlResult, [
+            {
+                'title': ''.join(rng.choice(WORDS) for _ in range(4)), 'url': f'https://example.com/{user_id}/{i}',
+                # 罕见词“量子”约千分之一的结果包含
+                'content': ''.join(rng.choice(WORDS) for _ in range(200)) + ('量子' if rng.random() < 0.001 else ''),
+                'keyword_matched': 'k', 'site_id': 1, 'task_id': 1, 'user_id': user_id,
+                'crawled_at': start + timedelta(seconds=i)
+            }
+            for i in range(rows)
+        ])
+    session.commit()
+    return session
+
+def old_short_search(session, user_id: int, query: str, limit: int):
+    """原实现：连接全文索引表，对每一行做LIKE"""
+    terms = query.split()
+    params = {'user_id': user_id, 'limit': limit}
+    conditions = []
+    for i, term in enumerate(terms):
+        params[f'term{i}'] = f'%{term}%'
+        conditions.append(f"({FTS_TABLE}.title LIKE :term{i} OR {FTS_TABLE}.content LIKE :term{i})")
+    return session.execute(text(f"""
+        SELECT {RESULT_COLUMNS}, {FTS_TABLE}.content AS content, NULL AS rank
+        FROM {FTS_TABLE} JOIN crawl_results r ON r.id = {FTS_TABLE}.rowid
+        WHERE {' AND '.join(conditions)} AND r.user_id = :user_id
+        ORDER BY r.crawled_at DESC, r.id DESC
+        LIMIT :limit
+    """), params).all()
+
+def timed(func, repeat: int):
+    result = func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat, len(result)
+
+def main():
+    parser = argparse.ArgumentParser(description='全文检索短词基准测试')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--rows', type=int, default=3000, help='每个用户的结果数')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--db', default='/tmp/bench_search.db')
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    session = build_session(args.db, args.users, args.rows)
+    size = os.path.getsize(args.db)
+    # 删掉二元组索引后重新创建，测量从已有数据补建的耗时
+    session.execute(text(f"DROP TABLE {BIGRAM_TABLE}"))
+    session.commit()
+    started = time.perf_counter()
+    create_search_index(session.get_bind())
+    print(f"二元组索引补建 {time.perf_counter() - started:.2f} s，数据库 {size / 1024 / 1024:.1f} MB")
+    print(f"{args.users} 个用户，每个用户 {args.rows} 条结果，每页 {args.limit} 条")
+    user_id = args.users // 2
+    for query in ['科技', '量子', '量子 科技', '科技 政策']:
+        old = timed(lambda: old_short_search(session, user_id, query, args.limit), args.repeat)
+        new = timed(lambda: search_results(session, user_id, query, args.limit), args.repeat)
+        print(f"{query!r:<12} 原实现 {old[0] * 1000:8.2f} ms ({old[1]} 条)  "
+              f"新实现 {new[0] * 1000:8.2f} ms ({new[1]} 条)  加速 {old[0] / new[0]:5.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+摘要基准测试：对比逐条同步调用(summarize_with_openai)与异步摘要服务(SummaryService)的耗时和请求数
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.bench_summarizer --texts 200 --duplicates 0.3 --latency 0.2
+使用本地摘要接口替身(benchmarks.mock_summary_server)，每个请求固定延迟 --latency 秒，
+按 --failure-rate 的概率返回503。异步服务依次在空缓存和已有缓存上运行。
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import List
+
+from app.utils.text_summarizer import SummaryCache, SummaryService, TextSummarizer
+from benchmarks.mock_summary_server import MockSummaryServer
+
+def build_texts(count: int, duplicates: float, seed: int = 0) -> List[str]:
+    """
+    生成文章正文，其中约duplicates比例是重复的文章（模拟多个网站转载同一篇文章）
+    """
+    rng = random.Random(seed)
+    words = ['经济', '科技', '政策', '市场', 'python', 'crawler', '发布', '数据', '报告', '增长']
+    texts: List[str] = []
+    for i in range(count):
+        if texts and rng.random() < duplicates:
+            texts.append(rng.choice(texts))
+        else:
+            texts.append(f"文章{i}：" + ''.join(rng.choice(words) for _ in range(300)) + "。")
+    return texts
+
+def run_sync(base_url: str, texts: List[str]) -> float:
+    summarizer = TextSummarizer()
+    summarizer.api_key = "bench"
+    summarizer.base_url = base_url
+    started = time.perf_counter()
+    for text in texts:
+        summarizer.summarize_with_openai(text)
+    return time.perf_counter() - started
+
+async def run_async(base_url: str, texts: List[str], cache: SummaryCache, args) -> SummaryService:
+    service = SummaryService(
+        api_key="bench", base_url=base_url, max_concurrency=args.concurrency, batch_size=args.batch_size,
+        backoff=0.05, cache=cache
+    )
+    async with service:
+        await service.summarize_many(texts)
+    return service
+
+def main():
+    parser = argparse.ArgumentParser(description="摘要基准测试")
+    parser.add_argument("--texts", type=int, default=200)
+    parser.add_argument("--duplicates", type=float, default=0.3, help="重复文章比例")
+    parser.add_argument("--latency", type=float, default=0.2, help="替身接口每个请求的延迟（秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--skip-sync", action="store_true", help="不运行逐条同步调用")
+    args = parser.parse_args()
+
+    texts = build_texts(args.texts, args.duplicates)
+    server = MockSummaryServer(latency=args.latency, failure_rate=args.failure_rate, seed=0)
+    base_url = server.start_in_thread()
+    print(f"{len(texts)} 篇文章（{len(set(texts))} 篇不重复），接口延迟 {args.latency}s，失败率 {args.failure_rate}")
+    print(f"{'方式':<24} {'耗时(s)':>10} {'请求数':>8} {'缓存命中':>8}")
+
+    if not args.skip_sync:
+        requests_before = server.requests
+        elapsed = run_sync(base_url, texts)
+        print(f"{'逐条同步':<24} {elapsed:10.2f} {server.requests - requests_before:8d} {0:8d}")
+
+    cache = SummaryCache(os.path.join(tempfile.mkdtemp(), "summary_cache.db"))
+    for label in ("异步批量（空缓存）", "异步批量（已缓存）"):
+        requests_before = server.requests
+        started = time.perf_counter()
+        service = asyncio.run(run_async(base_url, texts, cache, args))
+        elapsed = time.perf_counter() - started
+        print(f"{label:<24} {elapsed:10.2f} {server.requests - requests_before:8d} {service.cache_hits:8d}")
+    cache.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+API压测：对同一个接口的同步版本(/api/v1)和异步版本(/api/v2)施加相同的并发负载，对比吞吐量和延迟分位数
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.load_test --requests 2000 --concurrency 64
+    python -m benchmarks.load_test --url http://localhost:8000 --email a@b.c --password pw
+不指定 --url 时在临时SQLite数据库上启动一个uvicorn进程并写入测试数据，
+并关闭响应缓存，让每个请求都真正查询数据库。
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import aiohttp
+
+PATHS = ["/results/?limit=50", "/sites/", "/tasks/"]
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def seed_database(database_url: str, rows: int):
+    """
+    在临时数据库里写入一个用户、网站、任务和一批结果
+    """
+    from app.database_init import init_db
+    from app.database import SessionLocal
+    from app import models
+    from app.utils import get_password_hash
+
+    init_db()
+    db = SessionLocal()
+    user = models.User(email="load@example.com", hashed_password=get_password_hash("load"))
+    db.add(user)
+    db.flush()
+    db.add_all([models.MonitoredSite(name=f"site{i}", url=f"https://example.com/{i}", user_id=user.id) for i in range(20)])
+    db.add(models.CrawlTask(name="load", frequency=timedelta(hours=1), user_id=user.id))
+    start = datetime(2024, 1, 1)
+    db.bulk_insert_mappings(models.CrawlResult, [
+        {
+            "title": f"标题{i}", "url": f"https://example.com/a/{i}", "content": "正文" * 500, "summary": "摘要",
+            "keyword_matched": "python", "site_id": 1, "task_id": 1, "user_id": user.id,
+            "crawled_at": start + timedelta(seconds=i)
+        }
+        for i in range(rows)
+    ])
+    db.commit()
+    db.close()
+
+def start_server(rows: int, workers: int):
+    directory = tempfile.mkdtemp()
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'load.db')}"
+    env["HTTP_CACHE_PATH"] = os.path.join(directory, "http_cache.db")
+    env["RESPONSE_CACHE_BACKEND"] = "off"
+    os.environ.update(env)
+    seed_database(env["DATABASE_URL"], rows)
+
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        env=env
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+async def wait_ready(session: aiohttp.ClientSession, url: str, timeout: float = 30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            async with session.get(url + "/") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+async def login(session: aiohttp.ClientSession, url: str, email: str, password: str) -> str:
+    async with session.post(url + "/api/v1/auth/login", data={"username": email, "password": password}) as response:
+        response.raise_for_status()
+        return (await response.json())["access_token"]
+
+async def run_load(session: aiohttp.ClientSession, url: str, token: str, requests: int, concurrency: int):
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def client():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                async with session.get(url + PATHS[i % len(PATHS)], headers=headers) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    return latencies, errors, time.perf_counter() - started
+
+async def main_async(args, url: str):
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await wait_ready(session, url)
+        token = await login(session, url, args.email, args.password)
+        print(f"{args.requests} 个请求，并发 {args.concurrency}，接口 {', '.join(PATHS)}")
+        print(f"{'版本':<8} {'请求/秒':>10} {'p50(ms)':>10} {'p99(ms)':>10} {'错误':>6}")
+        for version in ("v1", "v2"):
+            # 预热，避免首次连接和导入的开销计入结果
+            await run_load(session, f"{url}/api/{version}", token, args.concurrency, args.concurrency)
+            latencies, errors, elapsed = await run_load(
+                session, f"{url}/api/{version}", token, args.requests, args.concurrency
+            )
+            print(f"{version:<8} {len(latencies) / elapsed:10.1f} {percentile(latencies, 0.5) * 1000:10.1f} "
+                  f"{percentile(latencies, 0.99) * 1000:10.1f} {errors:6d}")
+
+def main():
+    parser = argparse.ArgumentParser(description="同步与异步API压测")
+    parser.add_argument("--url", help="已运行的服务地址，不指定时启动临时服务")
+    parser.add_argument("--email", default="load@example.com")
+    parser.add_argument("--password", default="load")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--rows", type=int, default=20000, help="临时服务写入的结果数")
+    parser.add_argument("--workers", type=int, default=1, help="临时服务的uvicorn进程数")
+    args = parser.parse_args()
+
+    process: Optional[subprocess.Popen] = None
+    url = args.url
+    if not url:
+        process, url = start_server(args.rows, args.workers)
+    try:
+        asyncio.run(main_async(args, url))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+本地摘要接口替身：实现 POST /chat/completions，用于在没有真实模型的情况下测试和压测摘要服务
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.mock_summary_server --port 8010 --latency 0.2 --failure-rate 0.1
+然后设置 OPENAI_API_KEY=test OPENAI_BASE_URL=http://127.0.0.1:8010 运行爬虫。
+批量请求（提示词末尾是JSON数组）返回等长的JSON字符串数组，单条请求返回一句摘要；
+按 --failure-rate 的概率返回503，可用来验证重试和退避。
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+from typing import Optional
+
+from aiohttp import web
+
+def fake_summary(text: str) -> str:
+    return text.strip()[:20] + "..."
+
+def reply_for(prompt: str) -> str:
+    # 批量提示词在空行之后给出JSON数组
+    _, _, tail = prompt.rpartition("\n\n")
+    if tail.startswith("["):
+        try:
+            texts = json.loads(tail)
+            return json.dumps([fake_summary(text) for text in texts], ensure_ascii=False)
+        except ValueError:
+            pass
+    return fake_summary(tail)
+
+class MockSummaryServer:
+    """
+    模拟的chat/completions服务，统计收到的请求数和摘要的文本数
+    """
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+        self.app = web.Application()
+        self.app.router.add_post("/chat/completions", self.handle)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        data = await request.json()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.random.random() < self.failure_rate:
+            self.failures += 1
+            return web.json_response({"error": {"message": "overloaded"}}, status=503, headers={"Retry-After": "0"})
+        prompt = data["messages"][-1]["content"]
+        return web.json_response({
+            "model": data.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply_for(prompt)}}]
+        })
+
+    def start_in_thread(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        在后台线程的事件循环中启动服务，返回基础地址
+        """
+        started = threading.Event()
+        address = {}
+
+        async def serve():
+            runner = web.AppRunner(self.app)
+            await runner.setup()
+            site = web.TCPSite(runner, host, port)
+            await site.start()
+            address["port"] = site._server.sockets[0].getsockname()[1]
+            started.set()
+            await asyncio.Event().wait()
+
+        threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+        started.wait()
+        return f"http://{host}:{address['port']}"
+
+def main():
+    parser = argparse.ArgumentParser(description="本地摘要接口替身")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--latency", type=float, default=0.2, help="每个请求的模拟延迟（秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="返回503的概率")
+    args = parser.parse_args()
+
+    server = MockSummaryServer(latency=args.latency, failure_rate=args.failure_rate)
+    web.run_app(server.app, host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# 在导入app之前把数据库和各类缓存指向临时目录，测试不会碰到开发环境的数据
+_tmp = tempfile.mkdtemp(prefix="crawler-monitor-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/test.db")
+os.environ.setdefault("HTTP_CACHE_PATH", f"{_tmp}/http_cache.db")
+os.environ.setdefault("SUMMARY_CACHE_PATH", f"{_tmp}/summary_cache.db")
+os.environ.setdefault("SUMMARY_ENRICH_ENABLED", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,111 @@
+import asyncio
+import sqlite3
+from collections import Counter
+
+from aiohttp import web
+
+from app import models
+from app.crawler.core import Crawler
+from app.crawler.fetcher import AsyncFetcher
+from app.crawler.http_cache import HttpCache
+
+PAGES = {
+    "/": '<html><body><a href="/a1">Python news</a><a href="/page2">下一页</a><a href="/news/">新闻</a></body></html>',
+    "/page2": '<html><body><a href="/a2">More python</a></body></html>',
+    "/news/": '<html><body><a href="/news/world/">国际</a><a href="/a3">other</a></body></html>',
+    "/news/world/": '<html><body><a href="/a4">Python world</a></body></html>',
+    "/a1": "<html><body><h1>Article one</h1><p>Python article body.</p></body></html>",
+    "/a2": "<html><body><h1>Article two</h1><p>Python article body.</p></body></html>",
+    "/a3": "<html><body><h1>Article three</h1><p>Nothing here.</p></body></html>",
+    "/a4": "<html><body><h1>Article four</h1><p>Python article body.</p></body></html>",
+}
+
+async def _serve(hits: Counter):
+    async def page(request):
+        body = PAGES.get(request.path)
+        if body is None:
+            raise web.HTTPNotFound()
+        etag = f'"{hash(body)}"'
+        if request.headers.get("If-None-Match") == etag:
+            hits[(request.path, 304)] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        hits[(request.path, 200)] += 1
+        return web.Response(text=body, content_type="text/html", headers={"ETag": etag})
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+def test_unchanged_list_pages_are_not_parsed_again(tmp_path, monkeypatch):
+    parsed = []
+    parse_page = Crawler._parse_page
+
+    def counting_parse_page(content, parser_backend):
+        parsed.append(content)
+        return parse_page(content, parser_backend)
+
+    monkeypatch.setattr(Crawler, "_parse_page", staticmethod(counting_parse_page))
+    cache = HttpCache(str(tmp_path / "http_cache.db"))
+    keywords = [models.Keyword(id=1, keyword="python")]
+
+    async def scenario():
+        hits = Counter()
+        runner, base_url = await _serve(hits)
+        site = models.MonitoredSite(id=1, url=f"{base_url}/", max_depth=2)
+
+        async def crawl():
+            hits.clear()
+            parsed.clear()
+            async with AsyncFetcher(cache=cache) as fetcher:
+                results = await Crawler(None).crawl_site(fetcher, site, keywords, task_id=1)
+            return sorted(result["url"].rsplit("/", 1)[-1] for result in results), len(parsed), dict(hits)
+
+        try:
+            runs = [await crawl(), await crawl()]
+            # 旧版本缓存中没有记录链接
+            cache._conn.execute("UPDATE http_cache_processed SET links = NULL")
+            cache._conn.commit()
+            runs += [await crawl(), await crawl()]
+        finally:
+            await runner.cleanup()
+        return runs
+
+    runs = asyncio.run(scenario())
+    cache.close()
+    # /a3没有命中关键词，作为深度2的列表页抓取
+    list_pages = ("/", "/page2", "/news/", "/news/world/", "/a3")
+
+    results, parses, hits = runs[0]
+    assert results == ["a1", "a2", "a4"]
+    # 5个列表页和3个详情页
+    assert parses == 5 + 3
+
+    # 内容未变：所有列表页都是304，用记录的链接扩展队列，一次解析也没有，也不再抓取详情页
+    results, parses, hits = runs[1]
+    assert results == [] and parses == 0
+    assert hits == {(path, 304): 1 for path in list_pages}
+
+    # 没有记录链接的旧缓存：解析一次并补记链接，之后不再解析
+    assert runs[2][:2] == ([], 5)
+    assert runs[3][:2] == ([], 0)
+    assert runs[3][2] == {(path, 304): 1 for path in list_pages}
+
+def test_existing_http_cache_gains_links_column(tmp_path):
+    path = str(tmp_path / "old_cache.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE http_cache_processed (url TEXT NOT NULL, scope TEXT NOT NULL, PRIMARY KEY (url, scope))")
+    conn.execute("INSERT INTO http_cache_processed (url, scope) VALUES ('http://ex.com/', 'task:1')")
+    conn.commit()
+    conn.close()
+
+    cache = HttpCache(path)
+    try:
+        assert cache.processed_links("http://ex.com/", "task:1") == (True, None)
+        assert cache.processed_links("http://ex.com/", "task:2") == (False, None)
+    finally:
+        cache.close()
@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.database import AsyncReadSessionLocal, AsyncSessionLocal, async_engine, async_read_engine
+from app.database_init import init_db
+
+def test_async_read_engine_is_query_only():
+    init_db()
+    assert async_read_engine is not async_engine
+
+    async def scenario():
+        async with AsyncReadSessionLocal() as db:
+            assert (await db.execute(text("PRAGMA query_only"))).scalar() == 1
+            assert (await db.execute(text("SELECT COUNT(*) FROM users"))).scalar() is not None
+            with pytest.raises(OperationalError):
+                await db.execute(text("INSERT INTO users (email, hashed_password) VALUES ('x@y.z', 'x')"))
+        async with AsyncSessionLocal() as db:
+            assert (await db.execute(text("PRAGMA query_only"))).scalar() == 0
+        await async_read_engine.dispose()
+        await async_engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.crawler.dedup import insert_results_ignore_duplicates
+from app.database_init import upgrade_schema
+from app.models import CrawlResult
+
+# 本系列改动之前的crawl_results表结构，没有唯一约束
+BASELINE_CRAWL_RESULTS = """
+CREATE TABLE crawl_results (
+    id INTEGER NOT NULL PRIMARY KEY,
+    title VARCHAR NOT NULL,
+    url VARCHAR NOT NULL,
+    content TEXT,
+    summary VARCHAR,
+    published_at DATETIME,
+    crawled_at DATETIME,
+    keyword_matched VARCHAR,
+    site_id INTEGER,
+    task_id INTEGER,
+    user_id INTEGER
+)
+"""
+
+def _row(url, keyword="python", task_id=1):
+    return {
+        "title": url, "url": url, "content": "c", "summary": None, "summary_status": "pending",
+        "published_at": None, "keyword_matched": keyword, "site_id": 1, "task_id": task_id, "user_id": 1
+    }
+
+def test_upgrade_baseline_db_dedupes_and_adds_unique_index(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/baseline.db")
+    with engine.begin() as conn:
+        conn.execute(text(BASELINE_CRAWL_RESULTS))
+        for url in ("http://a/1", "http://a/1", "http://a/1", "http://a/2"):
+            conn.execute(
+                text("INSERT INTO crawl_results (title, url, keyword_matched, task_id, user_id, crawled_at) "
+                     "VALUES (:url, :url, 'python', 1, 1, :now)"),
+                {"url": url, "now": datetime(2024, 1, 1)}
+            )
+        # 任一列为NULL的行不受唯一约束限制，不应被删除
+        for _ in range(2):
+            conn.execute(text("INSERT INTO crawl_results (title, url, keyword_matched, task_id) "
+                              "VALUES ('n', 'http://a/n', NULL, 1)"))
+
+    upgrade_schema(engine)
+
+    indexes = {index["name"]: index for index in inspect(engine).get_indexes("crawl_results")}
+    assert indexes["uq_crawl_results_task_url_keyword"]["unique"]
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, url FROM crawl_results ORDER BY id")).all()
+    # 重复行只保留id最小的一行
+    assert [row.url for row in rows] == ["http://a/1", "http://a/2", "http://a/n", "http://a/n"]
+    assert rows[0].id == 1
+
+    db = sessionmaker(bind=engine)()
+    try:
+        inserted = insert_results_ignore_duplicates(db, [_row("http://a/1"), _row("http://a/3"), _row("http://a/3")])
+        db.commit()
+        assert inserted == 1
+        assert db.query(CrawlResult).filter(CrawlResult.url == "http://a/3").count() == 1
+        # 再次升级不做任何改动
+        upgrade_schema(engine)
+        assert db.query(CrawlResult).count() == 5
+    finally:
+        db.close()
@@ -0,0 +1,117 @@
+import time
+
+import pytest
+
+from app import models
+from app.database import SessionLocal
+from app.database_init import init_db
+from app.crawler.enrichment import SummaryEnricher
+from app.utils.text_summarizer import SummaryService, summarizer
+from benchmarks.mock_summary_server import MockSummaryServer, fake_summary
+
+def _insert_pending(count):
+    init_db()
+    db = SessionLocal()
+    try:
+        rows = [
+            models.CrawlResult(title=f"t{i}", url=f"http://enrich/{time.time_ns()}/{i}", content="正文内容。" * 20,
+                               keyword_matched="k", task_id=1, user_id=1, summary_status=models.SUMMARY_PENDING)
+            for i in range(count)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return [row.id for row in rows]
+    finally:
+        db.close()
+
+def _statuses(ids):
+    db = SessionLocal()
+    try:
+        return {row.id: (row.summary_status, row.summary)
+                for row in db.query(models.CrawlResult).filter(models.CrawlResult.id.in_(ids))}
+    finally:
+        db.close()
+
+def _wait_until(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+def test_failed_batches_back_off_and_are_marked_failed():
+    ids = _insert_pending(3)
+    enricher = SummaryEnricher(batch_size=10, poll_interval=0.01, max_attempts=3, retry_base=0.3, retry_max=1)
+    attempts = []
+
+    async def failing_summarize(service, rows):
+        attempts.append((time.monotonic(), [row[0] for row in rows]))
+        raise RuntimeError("summary backend down")
+
+    enricher._summarize = failing_summarize
+    enricher.start()
+    try:
+        assert _wait_until(lambda: all(status == models.SUMMARY_FAILED for status, _ in _statuses(ids).values()))
+        # 再给一段时间，确认不会继续重试
+        time.sleep(0.3)
+    finally:
+        enricher.stop()
+
+    assert [batch for _, batch in attempts] == [ids] * 3
+    # 两次重试分别等待约0.3秒和0.6秒，而不是立即重新领取
+    gaps = [later[0] - earlier[0] for earlier, later in zip(attempts, attempts[1:])]
+    assert gaps[0] >= 0.25 and gaps[1] >= 0.5
+    assert all(summary for _, summary in _statuses(ids).values())
+    assert enricher.stats.failed == 3 and not enricher._attempts and not enricher._retry_at
+
+@pytest.fixture
+def server():
+    server = MockSummaryServer(seed=7)
+    server.base_url = server.start_in_thread()
+    return server
+
+def _api_enricher(server, **kwargs) -> SummaryEnricher:
+    # 不重试单个请求，接口的每次503都直接算作一次失败
+    def service_factory():
+        return SummaryService(api_key="test", base_url=server.base_url, max_retries=0, backoff=0.01)
+
+    options = {"batch_size": 10, "poll_interval": 0.01, "max_attempts": 3, "retry_base": 0.3, "retry_max": 1}
+    options.update(kwargs)
+    return SummaryEnricher(service_factory=service_factory, **options)
+
+def test_api_outage_keeps_results_pending_until_the_api_recovers(server):
+    ids = _insert_pending(3)
+    texts = {result_id: "正文内容。" * 20 for result_id in ids}
+    server.failure_rate = 1.0
+    enricher = _api_enricher(server)
+    enricher.start()
+    try:
+        assert _wait_until(lambda: server.failures >= 1)
+        # 接口返回503时不写入本地摘要，结果仍是pending，等待退避后重试
+        assert all(status == models.SUMMARY_PENDING and summary is None for status, summary in _statuses(ids).values())
+        server.failure_rate = 0.0
+        assert _wait_until(lambda: all(status == models.SUMMARY_DONE for status, _ in _statuses(ids).values()))
+    finally:
+        enricher.stop()
+
+    assert {result_id: summary for result_id, (_, summary) in _statuses(ids).items()} == {
+        result_id: fake_summary(text) for result_id, text in texts.items()
+    }
+    assert enricher.stats.errors >= 1 and enricher.stats.failed == 0
+
+def test_api_outage_marks_results_failed_after_max_attempts(server):
+    ids = _insert_pending(3)
+    server.failure_rate = 1.0
+    enricher = _api_enricher(server)
+    enricher.start()
+    try:
+        assert _wait_until(lambda: all(status == models.SUMMARY_FAILED for status, _ in _statuses(ids).values()))
+        time.sleep(0.3)
+    finally:
+        enricher.stop()
+
+    # 每次尝试是一个批量请求，失败3次后放弃，并用本地摘要兜底
+    assert server.requests == 3
+    assert all(summary == summarizer.summarize_text("正文内容。" * 20) for _, summary in _statuses(ids).values())
+    assert enricher.stats.failed == 3
@@ -0,0 +1,85 @@
+from app.crawler.frontier import BloomFilter, CrawlFrontier
+
+def test_bloom_filter_has_no_false_negatives_and_fixed_size():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    size = bloom.nbytes
+    items = [f"https://ex.com/{i}" for i in range(1000)]
+    # 加入前已被误判为存在的元素add返回False，这样的元素只占很小一部分
+    added = sum(bloom.add(item) for item in items)
+    assert added > 980 and bloom.count == added
+    assert not bloom.add(items[0])
+    assert all(item in bloom for item in items)
+    # 误判率接近配置值
+    false_positives = sum(f"https://other.com/{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+    # 超过容量后只是误判率升高，内存不变
+    for i in range(5000):
+        bloom.add(f"https://more.com/{i}")
+    assert bloom.nbytes == size
+
+def test_depth_zero_only_crawls_the_homepage():
+    frontier = CrawlFrontier("https://ex.com/", max_depth=0, max_pages=50)
+    assert not frontier.push("https://ex.com/list?page=2", 0, "2")
+    assert not frontier.push("https://ex.com/news/", 0, "新闻")
+    assert frontier.pop_many(10) == []
+
+def test_pagination_keeps_depth_and_other_links_go_one_deeper():
+    frontier = CrawlFrontier("https://ex.com/", max_depth=1, max_pages=50)
+    assert frontier.push("https://ex.com/news/", 0, "新闻")
+    assert frontier.push("https://ex.com/list?page=2", 0, "2")
+    # 深度1的页面上：分页仍是深度1，其他链接是深度2，超出范围
+    assert frontier.push("https://ex.com/news/page/2", 1, "下一页")
+    assert not frontier.push("https://ex.com/news/world/", 1, "国际")
+    assert frontier.pop_many(10) == [
+        ("https://ex.com/list?page=2", 0),
+        ("https://ex.com/news/page/2", 1),
+        ("https://ex.com/news/", 1),
+    ]
+
+def test_scope_and_deduplication():
+    frontier = CrawlFrontier("https://www.ex.com/", max_depth=2, max_pages=50,
+                             link_pattern=r"/(news|list)", exclude_pattern=r"\.pdf$")
+    # 首页已访问；#片段和主机名大小写不影响去重
+    assert not frontier.push("https://WWW.ex.com/#top", 0)
+    assert frontier.push("https://ex.com/news/1", 0)
+    assert not frontier.push("https://EX.com/news/1#comments", 0)
+    # 子域名在范围内，其他域名、非http链接、排除和不匹配link_pattern的链接都不跟随
+    assert frontier.push("https://m.ex.com/news/2", 0)
+    assert not frontier.push("https://other.com/news/3", 0)
+    assert not frontier.push("mailto:news@ex.com", 0)
+    assert not frontier.push("https://ex.com/news/report.pdf", 0)
+    assert not frontier.push("https://ex.com/about", 0)
+
+    other_domains = CrawlFrontier("https://ex.com/", max_depth=1, max_pages=50, same_domain=False)
+    assert other_domains.push("https://other.com/news/3", 0)
+
+def test_max_pages_counts_the_homepage():
+    frontier = CrawlFrontier("https://ex.com/", max_depth=2, max_pages=3)
+    for i in range(5):
+        assert frontier.push(f"https://ex.com/a{i}", 0)
+    assert len(frontier.pop_many(10)) == 2
+    assert frontier.pages == 3
+    # 已达到max_pages，不再入队也不再返回
+    assert not frontier.push("https://ex.com/b", 0)
+    assert frontier.pop_many(10) == []
+
+def test_compaction_keeps_best_links_and_drops_worse_ones():
+    frontier = CrawlFrontier("https://ex.com/", max_depth=3, max_pages=3)
+    deep = [f"https://ex.com/a/b/c/{i}" for i in range(4)]
+    for url in deep:
+        assert frontier.push(url, 0)
+    # 队列达到剩余页数的两倍，压缩到剩余页数（2个），并以保留的最差优先级作为截止线
+    assert frontier.push("https://ex.com/x", 0)
+    assert frontier.dropped == 2
+    assert frontier.push("https://ex.com/y", 0)
+    # 不比截止线优先的链接直接丢弃
+    assert not frontier.push("https://ex.com/a/b/c/9", 0)
+    assert frontier.dropped == 3
+    assert frontier.pop_many(10) == [("https://ex.com/x", 1), ("https://ex.com/y", 1)]
+
+def test_queue_length_is_bounded_by_max_queue():
+    frontier = CrawlFrontier("https://ex.com/", max_depth=3, max_pages=1000, max_queue=4)
+    for i in range(100):
+        assert frontier.push(f"https://ex.com/p{i}", 0)
+        assert len(frontier) <= 4
+    assert frontier.dropped + len(frontier) == 100
@@ -0,0 +1,96 @@
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+from app.config import get_settings
+from app.crawler.fetcher import DEFAULT_HEADERS
+from app.crawler.politeness import PolitenessPolicy, RobotsCache, RobotsDisallowed
+
+ROBOTS_TXT = """\
+User-agent: Mozilla
+Disallow: /
+
+User-agent: CrawlerMonitor
+Disallow: /private
+Crawl-delay: 2
+"""
+
+async def _serve(hits: list):
+    async def robots(request):
+        hits.append(request.path)
+        # 故意放慢响应，让并发请求都在抓取完成前到达
+        await asyncio.sleep(0.05)
+        return web.Response(text=ROBOTS_TXT)
+
+    app = web.Application()
+    app.router.add_get("/robots.txt", robots)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+def test_concurrent_lookups_fetch_robots_once():
+    async def run():
+        hits = []
+        runner, base_url = await _serve(hits)
+        cache = RobotsCache()
+        try:
+            async with aiohttp.ClientSession() as session:
+                parsers = await asyncio.gather(*(cache.get(session, f"{base_url}/page/{i}") for i in range(20)))
+        finally:
+            await runner.cleanup()
+        return hits, cache, parsers
+
+    hits, cache, parsers = asyncio.run(run())
+    assert hits == ["/robots.txt"]
+    assert cache.fetches == 1
+    assert all(parser is parsers[0] for parser in parsers)
+
+def test_cancelled_fetch_hands_over_to_waiter():
+    async def run():
+        hits = []
+        runner, base_url = await _serve(hits)
+        cache = RobotsCache()
+        try:
+            async with aiohttp.ClientSession() as session:
+                owner = asyncio.ensure_future(cache.get(session, f"{base_url}/a"))
+                waiter = asyncio.ensure_future(cache.get(session, f"{base_url}/b"))
+                await asyncio.sleep(0.01)
+                owner.cancel()
+                parser = await waiter
+        finally:
+            await runner.cleanup()
+        return cache, parser
+
+    cache, parser = asyncio.run(run())
+    # 等待方在负责抓取的请求取消后自己重新抓取，而不是拿到空结果
+    assert parser is not None
+    assert cache.fetches == 2
+
+def test_robots_groups_match_product_token():
+    assert get_settings().crawler_robots_user_agent == "CrawlerMonitor"
+
+    async def run(user_agent: str):
+        runner, base_url = await _serve([])
+        policy = PolitenessPolicy(user_agent=user_agent)
+        blocked = []
+        try:
+            async with aiohttp.ClientSession() as session:
+                for path in ("/news/1", "/private/2"):
+                    try:
+                        await policy.check_robots(session, f"{base_url}{path}")
+                    except RobotsDisallowed:
+                        blocked.append(path)
+        finally:
+            await runner.cleanup()
+        return blocked, policy.rate_for(base_url[len("http://"):])
+
+    blocked, rate = asyncio.run(run("CrawlerMonitor"))
+    assert blocked == ["/private/2"]
+    assert rate == 0.5
+    # 完整的浏览器UA会命中针对Mozilla的分组，整站都被禁止
+    blocked, _ = asyncio.run(run(DEFAULT_HEADERS["User-Agent"]))
+    assert blocked == ["/news/1", "/private/2"]
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from app import models
+from app.database import SessionLocal, engine
+from app.database_init import init_db
+from app.crawler.scheduler import TaskSchedulerService
+
+def _create_task() -> int:
+    init_db()
+    db = SessionLocal()
+    try:
+        task = models.CrawlTask(name="scheduler test", frequency=timedelta(minutes=5), user_id=1)
+        db.add(task)
+        db.commit()
+        return task.id
+    finally:
+        db.close()
+
+def test_run_task_keeps_db_queries_off_the_event_loop():
+    task_id = _create_task()
+    service = TaskSchedulerService(max_workers=1)
+    statement_threads = []
+
+    def record_thread(conn, cursor, statement, parameters, context, executemany):
+        statement_threads.append(threading.get_ident())
+
+    async def run():
+        loop_thread = threading.get_ident()
+        await service._run_task(task_id)
+        return loop_thread
+
+    event.listen(engine, "before_cursor_execute", record_thread)
+    try:
+        loop_thread = asyncio.run(run())
+    finally:
+        event.remove(engine, "before_cursor_execute", record_thread)
+
+    # 读取任务、加载网站和关键词、刷新任务、写入next_run都执行过，但没有一条语句在事件循环线程上执行
+    assert len(statement_threads) >= 5
+    assert loop_thread not in statement_threads
+
+    db = SessionLocal()
+    try:
+        task = db.query(models.CrawlTask).filter(models.CrawlTask.id == task_id).first()
+        assert task.last_run is not None and task.next_run is not None
+    finally:
+        db.close()
@@ -0,0 +1,100 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import Base
+from app.utils import search_index
+from app.utils.search_index import TRIGRAM_MIN_SQLITE, create_search_index, search_results
+
+pytestmark = pytest.mark.skipif(sqlite3.sqlite_version_info < TRIGRAM_MIN_SQLITE, reason="trigram分词需要SQLite 3.34以上")
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/search.db")
+    Base.metadata.create_all(bind=engine)
+    create_search_index(engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2024, 1, 1)
+    rows = []
+    for user_id in (1, 2):
+        for i in range(200):
+            content = "今天的中文新闻，关于数据库和 Python 爬虫。" if i % 50 == 0 else "无关的正文内容"
+            rows.append({
+                "title": f"u{user_id} 标题{i}", "url": f"https://example.com/{user_id}/{i}", "content": content,
+                "keyword_matched": "k", "site_id": user_id, "task_id": i % 2 + 1, "user_id": user_id,
+                "crawled_at": start + timedelta(minutes=i)
+            })
+    session.bulk_insert_mappings(models.CrawlResult, rows)
+    session.commit()
+    yield session
+    session.close()
+
+def _query_plans(session, run):
+    """
+    记录run执行的SQL，返回每条语句的EXPLAIN QUERY PLAN
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "sqlite_master" not in statement:
+            statements.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = run()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    connection = session.connection().connection
+    plans = [
+        " | ".join(row[-1] for row in connection.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall())
+        for statement, parameters in statements
+    ]
+    return result, plans
+
+def test_two_char_terms_use_bigram_index(session):
+    hits, plans = _query_plans(session, lambda: search_results(session, 1, "中文", limit=10))
+    assert [hit["title"] for hit in hits] == ["u1 标题150", "u1 标题100", "u1 标题50", "u1 标题0"]
+    assert "<mark>中文</mark>" in hits[0]["snippet"]
+    # 先数候选数，再按二元组索引取出的候选读取结果
+    assert len(plans) == 2
+    assert "crawl_results_bigrams VIRTUAL TABLE INDEX" in plans[-1]
+    assert "ix_crawl_results_user" not in plans[-1]
+
+    # 英文两字词同样走二元组索引，大小写不敏感；多个短词要同时命中
+    assert len(search_results(session, 1, "PY 中文", task_id=1)) == 4
+    assert search_results(session, 1, "中文 英文") == []
+
+def test_mixed_and_single_char_terms(session):
+    hits, plans = _query_plans(session, lambda: search_results(session, 2, "数据库 中文 的"))
+    assert sorted(hit["title"] for hit in hits) == ["u2 标题0", "u2 标题100", "u2 标题150", "u2 标题50"]
+    assert "crawl_results_fts VIRTUAL TABLE INDEX" in plans[-1]
+    assert "crawl_results_bigrams VIRTUAL TABLE INDEX" in plans[-1]
+    assert search_results(session, 2, "数据库 英文") == []
+    # 单个字没有索引可用，在当前用户的结果中用LIKE过滤
+    hits, plans = _query_plans(session, lambda: search_results(session, 2, "闻", limit=100))
+    assert len(hits) == 4
+    assert "USING INDEX ix_crawl_results_user_crawled" in plans[-1]
+
+def test_common_two_char_terms_scan_recent_results(session, monkeypatch):
+    # 命中的结果超过候选上限时，按用户索引倒序LIKE，凑够一页即停止
+    monkeypatch.setattr(search_index, "BIGRAM_MAX_CANDIDATES", 4)
+    hits, plans = _query_plans(session, lambda: search_results(session, 1, "中文", limit=2))
+    assert [hit["title"] for hit in hits] == ["u1 标题150", "u1 标题100"]
+    assert "USING INDEX ix_crawl_results_user_crawled" in plans[-1]
+    assert "crawl_results_bigrams" not in plans[-1]
+
+def test_bigram_index_follows_deletes_and_is_built_on_upgrade(session, tmp_path):
+    session.query(models.CrawlResult).filter(models.CrawlResult.title == "u1 标题150").delete()
+    session.commit()
+    assert [hit["title"] for hit in search_results(session, 1, "中文")] == ["u1 标题100", "u1 标题50", "u1 标题0"]
+
+    # 已有数据但还没有二元组索引的数据库，创建时从现有结果补建
+    session.execute(text("DROP TABLE crawl_results_bigrams"))
+    session.commit()
+    create_search_index(session.get_bind())
+    assert len(search_results(session, 1, "中文")) == 3
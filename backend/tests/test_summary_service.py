@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.utils.text_summarizer import SummaryCache, SummaryService
+from benchmarks.mock_summary_server import MockSummaryServer, fake_summary
+
+TEXTS = [f"第{i}篇文章的正文内容，长度超过不调用模型的下限，需要请求摘要接口生成摘要。" * 2 for i in range(10)]
+
+@pytest.fixture(scope="module")
+def server():
+    server = MockSummaryServer(seed=7)
+    server.base_url = server.start_in_thread()
+    return server
+
+@pytest.fixture(autouse=True)
+def reset(server):
+    server.requests = server.failures = 0
+    server.failure_rate = 0.0
+
+def _service(server, **kwargs) -> SummaryService:
+    options = {"api_key": "test", "base_url": server.base_url, "batch_size": 4, "backoff": 0.01}
+    options.update(kwargs)
+    return SummaryService(**options)
+
+def summarize(service: SummaryService, texts):
+    async def run():
+        async with service:
+            return await service.summarize_many(texts)
+    return asyncio.run(run())
+
+def test_texts_are_batched_and_deduplicated(server):
+    service = _service(server)
+    summaries = summarize(service, TEXTS + TEXTS[:3])
+    assert summaries == [fake_summary(text) for text in TEXTS + TEXTS[:3]]
+    # 10篇不同的文本，每批4篇
+    assert server.requests == service.requests == 3
+
+def test_transient_errors_are_retried_with_backoff(server):
+    server.failure_rate = 0.5
+    service = _service(server, max_retries=10)
+    summaries = summarize(service, TEXTS)
+    assert summaries == [fake_summary(text) for text in TEXTS]
+    assert server.failures > 0
+    assert service.retries == server.failures
+    assert service.failures == 0
+
+def test_exhausted_retries_fall_back_to_local_summary(server, tmp_path):
+    server.failure_rate = 1.0
+    cache = SummaryCache(str(tmp_path / "cache.db"))
+    service = _service(server, max_retries=2, batch_size=10, cache=cache)
+    summaries = summarize(service, TEXTS[:2])
+    assert server.requests == 3
+    assert service.failures == 2
+    assert summaries == [service.local.summarize_text(text, 100) for text in TEXTS[:2]]
+    # 回退的本地摘要不写入缓存
+    assert len(cache) == 0
+
+def test_cache_hits_skip_the_api_and_run_off_the_event_loop(server, tmp_path):
+    calls = []
+
+    class RecordingCache(SummaryCache):
+        def get_many(self, keys):
+            calls.append(threading.get_ident())
+            return super().get_many(keys)
+
+        def put_many(self, items):
+            calls.append(threading.get_ident())
+            return super().put_many(items)
+
+    cache = RecordingCache(str(tmp_path / "cache.db"))
+    first = summarize(_service(server, cache=cache), TEXTS)
+    assert server.requests == 3 and len(cache) == len(TEXTS)
+
+    service = _service(server, cache=cache)
+    assert summarize(service, TEXTS) == first
+    assert server.requests == 3
+    assert service.cache_hits == len(TEXTS) and service.requests == 0
+    # asyncio.run在当前线程运行事件循环，缓存读写都应在其他线程
+    assert calls and threading.get_ident() not in calls
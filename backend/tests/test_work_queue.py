@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from app.crawler.work_queue import InMemoryWorkQueue, RedisWorkQueue, WorkItem, WorkQueue
+from app.crawler.worker import CrawlWorker
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_work_queue_is_abstract():
+    with pytest.raises(TypeError):
+        WorkQueue()
+
+def test_expired_lease_is_reaped_and_redelivered():
+    async def scenario():
+        queue = InMemoryWorkQueue(visibility_timeout=0.05)
+        await queue.publish(WorkItem(1, 10))
+        item = await queue.reserve(timeout=0)
+        assert await queue.requeue_expired() == 0
+        await asyncio.sleep(0.1)
+        assert await queue.requeue_expired() == 1
+        redelivered = await queue.reserve(timeout=0)
+        assert (redelivered.item_id, redelivered.attempts) == (item.item_id, 1)
+
+    run(scenario())
+
+def test_touch_extends_lease():
+    async def scenario():
+        queue = InMemoryWorkQueue(visibility_timeout=0.1)
+        await queue.publish(WorkItem(1, 10))
+        item = await queue.reserve(timeout=0)
+        await asyncio.sleep(0.06)
+        await queue.touch(item)
+        await asyncio.sleep(0.06)
+        assert await queue.requeue_expired() == 0
+
+    run(scenario())
+
+def test_retries_then_dead_letters():
+    async def scenario():
+        queue = InMemoryWorkQueue(max_attempts=3)
+        await queue.publish(WorkItem(1, 10))
+        for attempt in range(3):
+            item = await queue.reserve(timeout=0)
+            assert item.attempts == attempt
+            await queue.nack(item)
+        assert await queue.size() == 0
+        assert not queue.processing
+        assert len(queue.dead) == 1
+        assert WorkItem.loads(queue.dead[0]).attempts == 3
+
+    run(scenario())
+
+def test_late_ack_and_nack_after_redelivery_are_ignored():
+    async def scenario():
+        queue = InMemoryWorkQueue(visibility_timeout=0.05)
+        await queue.publish(WorkItem(1, 10))
+        first = await queue.reserve(timeout=0)
+        await asyncio.sleep(0.1)
+        await queue.requeue_expired()
+        second = await queue.reserve(timeout=0)
+        # 第一个消费者超时后才确认或放弃，不能影响第二次投递的租约，也不能再次入队
+        await queue.ack(first)
+        await queue.nack(first)
+        assert second.raw in queue.processing
+        assert await queue.size() == 0
+        await queue.ack(second)
+        assert not queue.processing and not queue.dead
+
+    run(scenario())
+
+class FlakyWorker(CrawlWorker):
+    def __init__(self, queue, failures):
+        super().__init__(queue, concurrency=2)
+        self.failures = failures
+        self.calls = []
+
+    async def crawl(self, item):
+        self.calls.append((item.site_id, item.attempts))
+        if item.attempts < self.failures.get(item.site_id, 0):
+            raise RuntimeError("boom")
+        return {'sites_failed': 0}
+
+def test_worker_retries_failed_items_until_dead_letter():
+    async def scenario():
+        queue = InMemoryWorkQueue(max_attempts=2)
+        worker = FlakyWorker(queue, failures={10: 1, 20: 5})
+        await queue.publish(WorkItem(1, 10))
+        await queue.publish(WorkItem(1, 20))
+        await asyncio.wait_for(worker.run(max_items=4), timeout=10)
+        assert sorted(worker.calls) == [(10, 0), (10, 1), (20, 0), (20, 1)]
+        assert (worker.processed, worker.failed) == (1, 3)
+        assert [WorkItem.loads(raw).site_id for raw in queue.dead] == [20]
+
+    run(scenario())
+
+def test_redis_release_is_single_shot():
+    fakeredis = pytest.importorskip("fakeredis.aioredis")
+
+    async def scenario():
+        queue = RedisWorkQueue(fakeredis.FakeRedis(decode_responses=True), visibility_timeout=0, max_attempts=2)
+        await queue.publish(WorkItem(1, 10))
+        item = await queue.reserve(timeout=0)
+        # 租约已过期：回收和nack同时发生时只有一方重新入队
+        assert await queue.requeue_expired() == 1
+        await queue.nack(item)
+        assert await queue.size() == 1
+        retry = await queue.reserve(timeout=0)
+        assert retry.attempts == 1
+        await queue.nack(retry)
+        assert await queue.size() == 0
+        assert await queue.redis.zcard(queue.processing_key) == 0
+        assert await queue.redis.llen(queue.dead_key) == 1
+
+    run(scenario())